@@ -77,8 +77,9 @@ python -m student_tracker.cli init
 # Install systemd service
 echo -e "\n${GREEN}[5/6] Installing systemd service...${NC}"
 sudo cp deployment/student-tracker.service /etc/systemd/system/
+sudo cp deployment/student-tracker-publisher.service /etc/systemd/system/
 sudo systemctl daemon-reload
-sudo systemctl enable student-tracker
+sudo systemctl enable student-tracker student-tracker-publisher
 echo "Service installed and enabled"
 
 # Add to cloudflared tunnel
@@ -123,7 +124,7 @@ echo "   (Add the hostname entry shown above)"
 echo ""
 echo "3. Restart services:"
 echo "   sudo systemctl restart cloudflared"
-echo "   sudo systemctl start student-tracker"
+echo "   sudo systemctl start student-tracker student-tracker-publisher"
 echo ""
 echo "4. Verify:"
 echo "   sudo systemctl status student-tracker"
@@ -13,10 +13,19 @@ source venv/bin/activate
 # Load environment
 export $(grep -v '^#' /home/jamditis/.claude/.env | xargs)
 
+# Optional: write Prometheus metrics for node_exporter's textfile collector
+# export STUDENT_TRACKER_METRICS_DIR=/var/lib/node_exporter/textfile
+
 # Sync from Canvas
 python -m student_tracker.cli sync
 
 # Optional: Run evaluations on new submissions
 # python -m student_tracker.cli evaluate --limit 10
 
+# Skill assessments, adding history points for newly finalized evaluations (no LLM call)
+python -m student_tracker.cli analyze skills
+
+# Daily progress snapshot for the insights history (no LLM call)
+python -m student_tracker.cli analyze snapshot --no-insights --min-hours 20
+
 echo "$(date): Canvas sync completed" >> "$LOG_FILE"
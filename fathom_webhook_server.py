@@ -21,9 +21,6 @@ import base64
 import time
 from datetime import datetime
 from flask import Flask, request, jsonify
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 import tempfile
 
 # Configuration
@@ -208,6 +205,11 @@ def upload_to_google_drive(filename: str, content: str) -> str:
         return ""
 
     try:
+        # The Google API client is slow to import, so only load it when uploading
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+        from googleapiclient.http import MediaFileUpload
+
         # Load credentials
         credentials = service_account.Credentials.from_service_account_file(
             GOOGLE_CREDENTIALS_PATH,
@@ -11,19 +11,35 @@ Provides:
 
 import os
 import json
+import hashlib
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import Optional
-import anthropic
+from typing import TYPE_CHECKING, Callable, Optional
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import defer, joinedload, selectinload
+from . import metrics
 from .models import (
     get_session, Student, Assignment, Submission, Evaluation,
-    SkillAssessment, ProgressSnapshot, SkillLevel
+    SkillAssessment, SkillHistory, ProgressSnapshot, InsightCache, SkillLevel
 )
 
+if TYPE_CHECKING:
+    import anthropic
+
 # Anthropic configuration for generating insights
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+# Messages API endpoint override, e.g. the local fake in bench/fake_llm.py
+LLM_BASE_URL = os.environ.get("STUDENT_TRACKER_LLM_BASE_URL", "")
 HAIKU_MODEL = "claude-3-5-haiku-20241022"
 
+# Generated insights are reused while their input data is unchanged, for up to
+# this long, and at most this many are kept
+INSIGHTS_CACHE_TTL = timedelta(hours=float(os.environ.get("STUDENT_TRACKER_INSIGHTS_TTL_HOURS", "24")))
+INSIGHTS_CACHE_MAX_ENTRIES = int(os.environ.get("STUDENT_TRACKER_INSIGHTS_CACHE_SIZE", "500"))
+
+# Progress snapshots between full ones store only what changed
+FULL_SNAPSHOT_EVERY = 30
+
 # Skill level ordering for comparisons
 SKILL_LEVEL_ORDER = {
     "emerging": 1,
@@ -33,8 +49,12 @@ SKILL_LEVEL_ORDER = {
 }
 
 
-def get_client() -> anthropic.Anthropic:
-    """Get Anthropic client."""
+def get_client() -> "anthropic.Anthropic":
+    """Get Anthropic client (pointed at LLM_BASE_URL when that is set)."""
+    import anthropic  # slow to import; only commands that call the API need it
+
+    if LLM_BASE_URL:
+        return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY or "local", base_url=LLM_BASE_URL)
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY environment variable not set")
     return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
@@ -44,20 +64,38 @@ def get_client() -> anthropic.Anthropic:
 # Individual student analysis
 # ============================================================================
 
-def get_student_summary(student_id: int) -> dict:
-    """Get a summary of a student's performance and progress."""
-    session = get_session()
-
-    student = session.query(Student).get(student_id)
-    if not student:
-        session.close()
-        return {"error": f"Student {student_id} not found"}
-
-    submissions = session.query(Submission).filter_by(student_id=student_id).all()
-    assignments = session.query(Assignment).all()
-
-    # Calculate metrics
-    total_possible = sum(a.points_possible for a in assignments)
+def _student_submissions_query(session, student_id: int):
+    """Query a student's submissions with evaluations and assignments preloaded."""
+    return session.query(Submission).options(
+        selectinload(Submission.evaluations),
+        joinedload(Submission.assignment)
+    ).filter(Submission.student_id == student_id)
+
+
+def _assignment_totals(session) -> tuple[int, float]:
+    """Count assignments and sum their points in one query."""
+    count, points = session.query(
+        func.count(Assignment.id),
+        func.coalesce(func.sum(Assignment.points_possible), 0)
+    ).one()
+    return count, points
+
+
+def _final_evaluation(submission: Submission) -> Optional[Evaluation]:
+    """Return the submission's final evaluation, if any."""
+    for eval in submission.evaluations:
+        if eval.is_final:
+            return eval
+    return None
+
+
+def _build_student_summary(
+    student: Student,
+    submissions: list[Submission],
+    total_assignments: int,
+    total_possible: float
+) -> dict:
+    """Build the summary view from preloaded submissions."""
     total_earned = 0
     submission_count = 0
     on_time_count = 0
@@ -73,11 +111,7 @@ def get_student_summary(student_id: int) -> dict:
                 on_time_count += 1
 
         # Get final evaluation
-        final_eval = None
-        for eval in submission.evaluations:
-            if eval.is_final:
-                final_eval = eval
-                break
+        final_eval = _final_evaluation(submission)
 
         if final_eval and final_eval.score is not None:
             evaluated_count += 1
@@ -114,8 +148,6 @@ def get_student_summary(student_id: int) -> dict:
         if level_counts:
             current_skills[skill] = max(level_counts, key=level_counts.get)
 
-    session.close()
-
     overall_percentage = (total_earned / total_possible * 100) if total_possible > 0 else 0
 
     return {
@@ -125,7 +157,7 @@ def get_student_summary(student_id: int) -> dict:
             "email": student.email
         },
         "metrics": {
-            "total_assignments": len(assignments),
+            "total_assignments": total_assignments,
             "submissions": submission_count,
             "evaluated": evaluated_count,
             "on_time_rate": (on_time_count / submission_count * 100) if submission_count > 0 else 0,
@@ -138,20 +170,8 @@ def get_student_summary(student_id: int) -> dict:
     }
 
 
-def get_student_progression(student_id: int) -> dict:
-    """Track a student's skill progression over time."""
-    session = get_session()
-
-    student = session.query(Student).get(student_id)
-    if not student:
-        session.close()
-        return {"error": f"Student {student_id} not found"}
-
-    # Get submissions ordered by date
-    submissions = session.query(Submission).filter_by(
-        student_id=student_id
-    ).order_by(Submission.submitted_at).all()
-
+def _build_student_progression(student: Student, submissions: list[Submission]) -> dict:
+    """Build the progression view from submissions ordered by submission date."""
     progression = {
         "student": {"id": student.id, "name": student.name},
         "timeline": [],
@@ -162,12 +182,7 @@ def get_student_progression(student_id: int) -> dict:
         if not submission.submitted_at:
             continue
 
-        final_eval = None
-        for eval in submission.evaluations:
-            if eval.is_final:
-                final_eval = eval
-                break
-
+        final_eval = _final_evaluation(submission)
         if not final_eval:
             continue
 
@@ -194,25 +209,15 @@ def get_student_progression(student_id: int) -> dict:
                     "level_value": SKILL_LEVEL_ORDER.get(level, 0)
                 })
 
-    session.close()
     return progression
 
 
-def get_student_strengths_weaknesses(student_id: int) -> dict:
-    """Analyze a student's strengths and areas needing improvement."""
-    session = get_session()
-
-    student = session.query(Student).get(student_id)
-    if not student:
-        session.close()
-        return {"error": f"Student {student_id} not found"}
-
+def _build_strengths_weaknesses(student: Student, submissions: list[Submission]) -> dict:
+    """Build the strengths/weaknesses view from preloaded submissions."""
     all_strengths = []
     all_improvements = []
     skill_levels = defaultdict(list)
 
-    submissions = session.query(Submission).filter_by(student_id=student_id).all()
-
     for submission in submissions:
         for eval in submission.evaluations:
             if eval.is_final:
@@ -247,8 +252,6 @@ def get_student_strengths_weaknesses(student_id: int) -> dict:
     top_strengths = sorted(strength_counts.items(), key=lambda x: x[1], reverse=True)[:5]
     top_improvements = sorted(improvement_counts.items(), key=lambda x: x[1], reverse=True)[:5]
 
-    session.close()
-
     return {
         "student": {"id": student.id, "name": student.name},
         "recurring_strengths": [{"text": s, "count": c} for s, c in top_strengths],
@@ -257,26 +260,40 @@ def get_student_strengths_weaknesses(student_id: int) -> dict:
     }
 
 
-# ============================================================================
-# Class-wide analysis
-# ============================================================================
-
-def get_class_overview() -> dict:
-    """Get an overview of the entire class's performance."""
-    session = get_session()
-
-    students = session.query(Student).all()
-    assignments = session.query(Assignment).all()
-
-    total_students = len(students)
+def _build_submission_history(submissions: list[Submission]) -> list[dict]:
+    """List each submission with its final score, for the student page table."""
+    history = []
+    for sub in submissions:
+        final_eval = _final_evaluation(sub)
+        history.append({
+            "id": sub.id,
+            "assignment_name": sub.assignment.name,
+            "status": sub.status,
+            "score": final_eval.score if final_eval else None,
+            "max_score": sub.assignment.points_possible,
+            "canvas_score": sub.canvas_score,
+            "canvas_grade": sub.canvas_grade,
+            "submitted_at": sub.submitted_at.strftime("%Y-%m-%d") if sub.submitted_at else None
+        })
+    return history
+
+
+def _build_class_overview(
+    total_students: int,
+    assignments: list[Assignment],
+    submissions: list[Submission]
+) -> dict:
+    """Build the class overview from preloaded assignments and submissions."""
     total_assignments = len(assignments)
 
     # Submission statistics
-    submissions = session.query(Submission).all()
-    submission_rate_by_assignment = {}
+    submissions_by_assignment = defaultdict(list)
+    for submission in submissions:
+        submissions_by_assignment[submission.assignment_id].append(submission)
 
+    submission_rate_by_assignment = {}
     for assignment in assignments:
-        assignment_submissions = [s for s in submissions if s.assignment_id == assignment.id]
+        assignment_submissions = submissions_by_assignment[assignment.id]
         submitted = len([s for s in assignment_submissions if s.status in ["submitted", "late"]])
         submission_rate_by_assignment[assignment.name] = {
             "submitted": submitted,
@@ -332,8 +349,6 @@ def get_class_overview() -> dict:
                         continue
                     skill_distribution[skill][level] += 1
 
-    session.close()
-
     return {
         "summary": {
             "total_students": total_students,
@@ -348,13 +363,8 @@ def get_class_overview() -> dict:
     }
 
 
-def identify_student_groups() -> dict:
-    """Cluster students based on performance patterns."""
-    session = get_session()
-
-    students = session.query(Student).all()
-
-    # Categorize students
+def _build_student_groups(ctx: "AnalyticsContext") -> dict:
+    """Cluster the context's students using their summary and progression views."""
     groups = {
         "high_performers": [],      # Consistently scoring 90%+
         "solid_performers": [],     # Consistently scoring 80-90%
@@ -364,8 +374,8 @@ def identify_student_groups() -> dict:
         "at_risk": []              # Missing submissions or declining
     }
 
-    for student in students:
-        summary = get_student_summary(student.id)
+    for student in ctx.students():
+        summary = ctx.summary(student.id)
 
         if "error" in summary:
             continue
@@ -376,7 +386,7 @@ def identify_student_groups() -> dict:
         total = metrics["total_assignments"]
 
         # Get progression for trend analysis
-        progression = get_student_progression(student.id)
+        progression = ctx.progression(student.id)
         timeline = progression.get("timeline", [])
 
         # Calculate trend
@@ -421,23 +431,310 @@ def identify_student_groups() -> dict:
         else:
             groups["solid_performers"].append(student_info)
 
-    session.close()
     return groups
 
 
+# ============================================================================
+# Analytics context
+# ============================================================================
+
+class AnalyticsContext:
+    """
+    Data loaded once and the views derived from it, for one run.
+
+    A CLI command, snapshot or request creates one context and passes it to
+    every analysis and recommendation function it calls, so the class is
+    queried once and each summary, progression, overview and grouping is
+    computed once. Asking about a single student loads only that student
+    until something needs the whole class.
+
+    Views are cached and shared between callers, so treat them as read-only.
+    The context does not see writes made after it loaded; use a new one.
+    """
+
+    def __init__(self):
+        self._class_loaded = False
+        self._students = {}             # student id -> Student, or None if missing
+        self._submissions = {}          # student id -> [Submission] ordered by id
+        self._assignments = None        # [Assignment] ordered by id, once the class is loaded
+        self._assignment_rows = {}      # assignment id -> Assignment, or None if missing
+        self._assignment_submissions = {}   # assignment id -> [Submission]
+        self._totals = None
+        self._views = {}                # (view, key) -> dict
+
+    def _load_class(self):
+        if self._class_loaded:
+            return
+        session = get_session()
+        try:
+            students = session.query(Student).order_by(Student.id).all()
+            assignments = session.query(Assignment).order_by(Assignment.id).all()
+            submissions = session.query(Submission).options(
+                selectinload(Submission.evaluations),
+                joinedload(Submission.assignment)
+            ).order_by(Submission.id).all()
+        finally:
+            session.close()
+
+        self._students = {s.id: s for s in students}
+        self._submissions = {s.id: [] for s in students}
+        self._assignment_submissions = {a.id: [] for a in assignments}
+        for submission in submissions:
+            self._submissions.setdefault(submission.student_id, []).append(submission)
+            self._assignment_submissions.setdefault(submission.assignment_id, []).append(submission)
+        self._assignments = assignments
+        self._assignment_rows = {a.id: a for a in assignments}
+        self._totals = (len(assignments), sum(a.points_possible or 0 for a in assignments))
+        self._class_loaded = True
+
+    def _load_student(self, student_id: int):
+        session = get_session()
+        try:
+            student = session.query(Student).get(student_id)
+            self._students[student_id] = student
+            if student:
+                self._submissions[student_id] = _student_submissions_query(
+                    session, student_id
+                ).order_by(Submission.id).all()
+            if self._totals is None:
+                self._totals = _assignment_totals(session)
+        finally:
+            session.close()
+
+    def _view(self, key: tuple, build: Callable[[], dict]) -> dict:
+        if key not in self._views:
+            self._views[key] = build()
+        return self._views[key]
+
+    def students(self) -> list[Student]:
+        """Every student, ordered by id."""
+        self._load_class()
+        return list(self._students.values())
+
+    def student(self, student_id: int) -> Optional[Student]:
+        if not self._class_loaded and student_id not in self._students:
+            self._load_student(student_id)
+        return self._students.get(student_id)
+
+    def submissions(self, student_id: int) -> list[Submission]:
+        """A student's submissions with evaluations and assignments, ordered by id."""
+        if not self.student(student_id):
+            return []
+        return self._submissions.get(student_id, [])
+
+    def _load_assignment(self, assignment_id: int):
+        session = get_session()
+        try:
+            assignment = session.query(Assignment).get(assignment_id)
+            self._assignment_rows[assignment_id] = assignment
+            if assignment:
+                self._assignment_submissions[assignment_id] = session.query(Submission).options(
+                    selectinload(Submission.evaluations)
+                ).filter(Submission.assignment_id == assignment_id).order_by(Submission.id).all()
+        finally:
+            session.close()
+
+    def assignment(self, assignment_id: int) -> Optional[Assignment]:
+        if not self._class_loaded and assignment_id not in self._assignment_rows:
+            self._load_assignment(assignment_id)
+        return self._assignment_rows.get(assignment_id)
+
+    def assignment_submissions(self, assignment_id: int) -> list[Submission]:
+        """An assignment's submissions with evaluations, ordered by id."""
+        if not self.assignment(assignment_id):
+            return []
+        return self._assignment_submissions.get(assignment_id, [])
+
+    def assignment_totals(self) -> tuple[int, float]:
+        """Assignment count and total points possible."""
+        if self._totals is None:
+            session = get_session()
+            try:
+                self._totals = _assignment_totals(session)
+            finally:
+                session.close()
+        return self._totals
+
+    def summary(self, student_id: int) -> dict:
+        def build():
+            student = self.student(student_id)
+            if not student:
+                return {"error": f"Student {student_id} not found"}
+            return _build_student_summary(
+                student, self.submissions(student_id), *self.assignment_totals()
+            )
+        return self._view(("summary", student_id), build)
+
+    def progression(self, student_id: int) -> dict:
+        def build():
+            student = self.student(student_id)
+            if not student:
+                return {"error": f"Student {student_id} not found"}
+            by_date = sorted(
+                (s for s in self.submissions(student_id) if s.submitted_at),
+                key=lambda s: s.submitted_at
+            )
+            return _build_student_progression(student, by_date)
+        return self._view(("progression", student_id), build)
+
+    def strengths_weaknesses(self, student_id: int) -> dict:
+        def build():
+            student = self.student(student_id)
+            if not student:
+                return {"error": f"Student {student_id} not found"}
+            return _build_strengths_weaknesses(student, self.submissions(student_id))
+        return self._view(("strengths", student_id), build)
+
+    def profile(self, student_id: int) -> dict:
+        def build():
+            student = self.student(student_id)
+            if not student:
+                return {"error": f"Student {student_id} not found"}
+            return {
+                "student": {"id": student.id, "name": student.name, "email": student.email},
+                "summary": self.summary(student_id),
+                "progression": self.progression(student_id),
+                "strengths": self.strengths_weaknesses(student_id),
+                "submissions": _build_submission_history(self.submissions(student_id))
+            }
+        return self._view(("profile", student_id), build)
+
+    def overview(self) -> dict:
+        def build():
+            self._load_class()
+            submissions = [s for subs in self._submissions.values() for s in subs]
+            submissions.sort(key=lambda s: s.id)
+            return _build_class_overview(len(self._students), self._assignments, submissions)
+        return self._view(("overview", None), build)
+
+    def groups(self) -> dict:
+        return self._view(("groups", None), lambda: _build_student_groups(self))
+
+
+def get_student_summary(student_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
+    """Get a summary of a student's performance and progress."""
+    return (ctx or AnalyticsContext()).summary(student_id)
+
+
+def get_student_progression(student_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
+    """Track a student's skill progression over time."""
+    return (ctx or AnalyticsContext()).progression(student_id)
+
+
+def get_student_strengths_weaknesses(student_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
+    """Analyze a student's strengths and areas needing improvement."""
+    return (ctx or AnalyticsContext()).strengths_weaknesses(student_id)
+
+
+def get_student_profile(student_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
+    """
+    Get summary, progression, strengths and submission history in one pass.
+
+    Loads the student's submissions (with evaluations and assignments) once
+    and builds every view from them, instead of each view re-querying.
+    """
+    return (ctx or AnalyticsContext()).profile(student_id)
+
+
+# ============================================================================
+# Class-wide analysis
+# ============================================================================
+
+def get_class_overview(ctx: Optional[AnalyticsContext] = None) -> dict:
+    """Get an overview of the entire class's performance."""
+    return (ctx or AnalyticsContext()).overview()
+
+
+def identify_student_groups(ctx: Optional[AnalyticsContext] = None) -> dict:
+    """Cluster students based on performance patterns."""
+    return (ctx or AnalyticsContext()).groups()
+
+
 # ============================================================================
 # AI-powered insights
 # ============================================================================
 
-def generate_student_insights(student_id: int) -> dict:
-    """Generate AI-powered insights for a student."""
-    summary = get_student_summary(student_id)
-    progression = get_student_progression(student_id)
-    strengths_weaknesses = get_student_strengths_weaknesses(student_id)
+def _insights_fingerprint(*data) -> str:
+    """Hash the data an insights prompt is built from (and the model)."""
+    payload = json.dumps([HAIKU_MODEL, *data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cached_insights(scope: str, subject_id: Optional[int], fingerprint: str) -> Optional[dict]:
+    """
+    Return stored insights generated from identical data, if not expired.
+
+    Entries live for INSIGHTS_CACHE_TTL; at most INSIGHTS_CACHE_MAX_ENTRIES
+    are kept, least recently used evicted first.
+    """
+    session = get_session()
+    try:
+        entry = session.query(InsightCache).filter_by(
+            scope=scope, subject_id=subject_id, fingerprint=fingerprint
+        ).first()
+        if not entry or entry.created_at < datetime.utcnow() - INSIGHTS_CACHE_TTL:
+            return None
+
+        result = dict(entry.result, cached=True, generated_at=entry.created_at.isoformat())
+        entry.last_used_at = datetime.utcnow()
+        session.commit()
+        return result
+    finally:
+        session.close()
+
+
+def _store_insights(scope: str, subject_id: Optional[int], fingerprint: str, result: dict) -> dict:
+    """Cache freshly generated insights, replacing the subject's older entry."""
+    now = datetime.utcnow()
+    session = get_session()
+    try:
+        session.query(InsightCache).filter_by(scope=scope, subject_id=subject_id).delete()
+        session.query(InsightCache).filter(
+            InsightCache.created_at < now - INSIGHTS_CACHE_TTL
+        ).delete()
+        session.add(InsightCache(
+            scope=scope, subject_id=subject_id, fingerprint=fingerprint,
+            result=result, created_at=now, last_used_at=now
+        ))
+        session.flush()
+
+        evicted = [row.id for row in session.query(InsightCache.id).order_by(
+            InsightCache.last_used_at.desc(), InsightCache.id.desc()
+        ).offset(INSIGHTS_CACHE_MAX_ENTRIES)]
+        if evicted:
+            session.query(InsightCache).filter(InsightCache.id.in_(evicted)).delete()
+        session.commit()
+    finally:
+        session.close()
+
+    return dict(result, cached=False, generated_at=now.isoformat())
+
+
+def generate_student_insights(
+    student_id: int,
+    ctx: Optional[AnalyticsContext] = None,
+    refresh: bool = False
+) -> dict:
+    """
+    Generate AI-powered insights for a student.
+
+    Cached (see _cached_insights) until the summary, progression or
+    strengths change; refresh=True skips the cache.
+    """
+    ctx = ctx or AnalyticsContext()
+    summary = ctx.summary(student_id)
+    progression = ctx.progression(student_id)
+    strengths_weaknesses = ctx.strengths_weaknesses(student_id)
 
     if "error" in summary:
         return summary
 
+    fingerprint = _insights_fingerprint(summary, progression, strengths_weaknesses)
+    if not refresh:
+        cached = _cached_insights("student", student_id, fingerprint)
+        if cached:
+            return cached
+
     prompt = f"""Analyze this student's performance data and provide actionable insights.
 
 STUDENT: {summary['student']['name']}
@@ -480,25 +777,41 @@ Be specific and reference actual data patterns. Focus on actionable insights."""
 
     try:
         client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("analyzer", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=1000,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         result = json.loads(response.content[0].text)
         result["student"] = summary["student"]
         result["data_summary"] = summary["metrics"]
-        return result
 
     except Exception as e:
         return {"error": str(e), "student": summary["student"]}
 
+    return _store_insights("student", student_id, fingerprint, result)
+
+
+def generate_class_insights(ctx: Optional[AnalyticsContext] = None, refresh: bool = False) -> dict:
+    """
+    Generate AI-powered insights for the entire class.
 
-def generate_class_insights() -> dict:
-    """Generate AI-powered insights for the entire class."""
-    overview = get_class_overview()
-    groups = identify_student_groups()
+    Cached (see _cached_insights) until the overview or group sizes change;
+    refresh=True skips the cache.
+    """
+    ctx = ctx or AnalyticsContext()
+    overview = ctx.overview()
+    groups = ctx.groups()
+    group_counts = {k: len(v) for k, v in groups.items()}
+
+    fingerprint = _insights_fingerprint(overview, group_counts)
+    if not refresh:
+        cached = _cached_insights("class", None, fingerprint)
+        if cached:
+            return cached
 
     prompt = f"""Analyze this class performance data and provide insights for the instructor.
 
@@ -546,48 +859,156 @@ Be specific and actionable."""
 
     try:
         client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=1500,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("analyzer", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=1500,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         result = json.loads(response.content[0].text)
         result["data"] = overview
-        result["groups"] = {k: len(v) for k, v in groups.items()}
-        return result
+        result["groups"] = group_counts
 
     except Exception as e:
         return {"error": str(e)}
 
+    return _store_insights("class", None, fingerprint, result)
+
 
 # ============================================================================
 # Progress snapshots
 # ============================================================================
 
-def create_progress_snapshot() -> ProgressSnapshot:
-    """Create a point-in-time snapshot of class progress."""
-    session = get_session()
+def _snapshot_student_values(groups: dict) -> dict:
+    """Per-student values kept in a snapshot, keyed by student id."""
+    values = {}
+    for group, members in groups.items():
+        for info in members:
+            values[str(info["id"])] = {
+                "group": group,
+                "average": round(info["average"], 1),
+                "trend": round(info["trend"], 1),
+                "submission_rate": round(info["submission_rate"], 1)
+            }
+    return values
+
+
+def _diff_values(previous: dict, current: dict) -> dict:
+    """Entries of current that differ from previous, with None for removed keys."""
+    changes = {key: value for key, value in current.items() if previous.get(key) != value}
+    changes.update({key: None for key in previous if key not in current})
+    return changes
+
+
+def _apply_values(state: dict, changes: dict) -> dict:
+    """Inverse of _diff_values: apply a delta to a full state."""
+    merged = dict(state)
+    for key, value in changes.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = value
+    return merged
 
-    overview = get_class_overview()
-    groups = identify_student_groups()
 
-    # Generate insights
-    try:
-        insights_data = generate_class_insights()
-        insights = insights_data.get("patterns_and_concerns", [])
-        recommendations = insights_data.get("suggested_interventions", [])
-    except Exception:
-        insights = []
-        recommendations = []
+def _snapshot_states(session, first_id: int) -> list[tuple[ProgressSnapshot, dict, dict]]:
+    """
+    Rebuild full skill distributions and student values for snapshots.
+
+    Loads from the last full snapshot at or before first_id onwards.
+
+    Returns:
+        (snapshot, skill_distribution, student_values) for every snapshot
+        from that full snapshot on, in id order
+    """
+    start_id = session.query(func.max(ProgressSnapshot.id)).filter(
+        ProgressSnapshot.id <= first_id,
+        ProgressSnapshot.previous_id.is_(None)
+    ).scalar() or first_id
+
+    snapshots = session.query(ProgressSnapshot).filter(
+        ProgressSnapshot.id >= start_id
+    ).order_by(ProgressSnapshot.id).all()
+
+    states = {}
+    result = []
+    for s in snapshots:
+        if s.previous_id is None:
+            skills, students = s.skill_distribution or {}, s.student_values or {}
+        else:
+            base_skills, base_students = states.get(s.previous_id, ({}, {}))
+            skills = _apply_values(base_skills, s.skill_distribution or {})
+            students = _apply_values(base_students, s.student_values or {})
+        states[s.id] = (skills, students)
+        result.append((s, skills, students))
+    return result
+
+
+def create_progress_snapshot(
+    include_insights: bool = True,
+    min_age_hours: Optional[float] = None,
+    ctx: Optional[AnalyticsContext] = None
+) -> Optional[ProgressSnapshot]:
+    """
+    Create a point-in-time snapshot of class progress.
+
+    Skill distribution and per-student values are stored as changes since
+    the previous snapshot, with a full snapshot every FULL_SNAPSHOT_EVERY.
+
+    Args:
+        include_insights: Ask the LLM for insights and recommendations
+        min_age_hours: Skip if the latest snapshot is newer than this
+        ctx: Analytics context to reuse; a new one by default
+
+    Returns:
+        The new snapshot, or None if it was skipped
+    """
+    session = get_session()
+
+    previous = session.query(ProgressSnapshot).order_by(ProgressSnapshot.id.desc()).first()
+    if (previous and min_age_hours is not None
+            and previous.snapshot_date > datetime.utcnow() - timedelta(hours=min_age_hours)):
+        print(f"Skipped: latest snapshot is from {previous.snapshot_date}")
+        session.close()
+        return None
+
+    ctx = ctx or AnalyticsContext()
+    overview = ctx.overview()
+    groups = ctx.groups()
+
+    insights = []
+    recommendations = []
+    if include_insights:
+        try:
+            insights_data = generate_class_insights(ctx)
+            insights = insights_data.get("patterns_and_concerns", [])
+            recommendations = insights_data.get("suggested_interventions", [])
+        except Exception:
+            pass
+
+    skills = {skill: dict(levels) for skill, levels in overview["skill_distribution"].items()}
+    students = _snapshot_student_values(groups)
+
+    previous_id = None
+    if previous:
+        chain = _snapshot_states(session, previous.id)
+        if len(chain) < FULL_SNAPSHOT_EVERY:
+            _, previous_skills, previous_students = chain[-1]
+            previous_id = previous.id
+            skills = _diff_values(previous_skills, skills)
+            students = _diff_values(previous_students, students)
 
     snapshot = ProgressSnapshot(
+        previous_id=previous_id,
         class_average_score=overview["summary"]["class_average"],
         submission_rate=sum(
             r["rate"] for r in overview["submission_rates"].values()
         ) / len(overview["submission_rates"]) if overview["submission_rates"] else 0,
-        skill_distribution=overview["skill_distribution"],
+        skill_distribution=skills,
         student_clusters={k: len(v) for k, v in groups.items()},
+        student_values=students,
         insights=insights,
         recommendations=recommendations
     )
@@ -600,25 +1021,48 @@ def create_progress_snapshot() -> ProgressSnapshot:
     return snapshot
 
 
-def get_progress_history(days: int = 30) -> list[dict]:
-    """Get historical progress snapshots."""
+def get_progress_history(days: int = 30, detail: bool = True) -> list[dict]:
+    """
+    Get historical progress snapshots.
+
+    Args:
+        days: How far back to go
+        detail: Rebuild each snapshot's skill_distribution and
+            student_values; without it only the class-wide numbers are
+            loaded, which is enough to chart long histories
+    """
     session = get_session()
 
     cutoff = datetime.utcnow() - timedelta(days=days)
-    snapshots = session.query(ProgressSnapshot).filter(
+    query = session.query(ProgressSnapshot).filter(
         ProgressSnapshot.snapshot_date >= cutoff
-    ).order_by(ProgressSnapshot.snapshot_date).all()
-
-    result = [{
-        "id": s.id,
-        "date": s.snapshot_date.isoformat(),
-        "class_average": s.class_average_score,
-        "submission_rate": s.submission_rate,
-        "skill_distribution": s.skill_distribution,
-        "student_clusters": s.student_clusters,
-        "insights": s.insights,
-        "recommendations": s.recommendations
-    } for s in snapshots]
+    ).order_by(ProgressSnapshot.id)
+
+    if detail:
+        first = query.first()
+        states = _snapshot_states(session, first.id) if first else []
+        states = [state for state in states if state[0].snapshot_date >= cutoff]
+    else:
+        snapshots = query.options(
+            defer(ProgressSnapshot.skill_distribution), defer(ProgressSnapshot.student_values)
+        ).all()
+        states = [(s, None, None) for s in snapshots]
+
+    result = []
+    for s, skills, students in states:
+        entry = {
+            "id": s.id,
+            "date": s.snapshot_date.isoformat(),
+            "class_average": s.class_average_score,
+            "submission_rate": s.submission_rate,
+            "student_clusters": s.student_clusters,
+            "insights": s.insights,
+            "recommendations": s.recommendations
+        }
+        if detail:
+            entry["skill_distribution"] = skills
+            entry["student_values"] = students
+        result.append(entry)
 
     session.close()
     return result
@@ -628,6 +1072,86 @@ def get_progress_history(days: int = 30) -> list[dict]:
 # Skill assessment updates
 # ============================================================================
 
+def _final_skill_ratings(session, student_ids: Optional[list[int]] = None) -> dict:
+    """
+    Final-evaluation skill ratings in one query.
+
+    Returns:
+        {student_id: {skill: [(level, evaluated_at), ...]}} with each list
+        oldest first
+    """
+    query = (
+        session.query(Submission.student_id, Evaluation.skill_ratings, Evaluation.created_at)
+        .join(Evaluation, Evaluation.submission_id == Submission.id)
+        .filter(Evaluation.is_final == True, Evaluation.skill_ratings.isnot(None))
+        .order_by(Evaluation.created_at, Evaluation.id)
+    )
+    if student_ids is not None:
+        query = query.filter(Submission.student_id.in_(student_ids))
+
+    ratings = defaultdict(lambda: defaultdict(list))
+    for student_id, skill_ratings, created_at in query:
+        for skill, level in (skill_ratings or {}).items():
+            if skill.startswith('_') or not isinstance(level, str):
+                continue
+            ratings[student_id][skill].append((level, created_at))
+    return ratings
+
+
+def _assess_skill(levels: list[str]) -> tuple[str, float]:
+    """Recency-weighted level and confidence from a skill's ratings (oldest first)."""
+    # Weight recent ratings more heavily
+    level_scores = defaultdict(float)
+    for i, level in enumerate(levels):
+        weight = 1 + (i / len(levels))  # Later = higher weight
+        level_scores[level] += weight
+
+    current_level = max(level_scores, key=level_scores.get)
+
+    # Confidence based on number of data points, max at 5+ ratings
+    confidence = min(1.0, len(levels) / 5)
+    return current_level, confidence
+
+
+def _skill_history_points(student_id: int, skill: str, ratings: list, last=None) -> list[dict]:
+    """
+    History rows for a skill's ratings after the last recorded point.
+
+    Replays the ratings (oldest first) and records the assessment as it
+    stood after each evaluation, dated at that evaluation, skipping
+    evaluations that left the level and confidence unchanged. last is the
+    newest SkillHistory row for the skill, if any; its evidence_count says
+    how many ratings it already covers.
+    """
+    start, previous = (last.evidence_count, (last.skill_level, last.confidence)) if last else (0, None)
+    points = []
+    for i in range(start + 1, len(ratings) + 1):
+        current_level, confidence = _assess_skill([level for level, _ in ratings[:i]])
+        if (current_level, confidence) == previous:
+            continue
+        previous = (current_level, confidence)
+        points.append({
+            "student_id": student_id,
+            "skill_name": skill,
+            "skill_level": current_level,
+            "confidence": confidence,
+            "evidence_count": i,
+            "assessed_at": ratings[i - 1][1] or datetime.utcnow()
+        })
+    return points
+
+
+def _latest_skill_history(session, student_ids: Optional[list[int]] = None) -> dict:
+    """{(student_id, skill): newest SkillHistory row}."""
+    query = session.query(
+        SkillHistory.student_id, SkillHistory.skill_name, SkillHistory.skill_level,
+        SkillHistory.confidence, SkillHistory.evidence_count
+    ).order_by(SkillHistory.assessed_at, SkillHistory.id)
+    if student_ids is not None:
+        query = query.filter(SkillHistory.student_id.in_(student_ids))
+    return {(row.student_id, row.skill_name): row for row in query}
+
+
 def update_student_skill_assessments(student_id: int) -> list[SkillAssessment]:
     """Update cumulative skill assessments for a student based on all evaluations."""
     session = get_session()
@@ -637,58 +1161,40 @@ def update_student_skill_assessments(student_id: int) -> list[SkillAssessment]:
         session.close()
         return []
 
-    # Collect all skill ratings from evaluations
-    skill_data = defaultdict(list)
+    skill_data = _final_skill_ratings(session, [student_id]).get(student_id, {})
+    latest = _latest_skill_history(session, [student_id])
+    existing = {}
+    for assessment in session.query(SkillAssessment).filter_by(student_id=student_id).order_by(SkillAssessment.id):
+        existing.setdefault(assessment.skill_name, assessment)
 
-    for submission in student.submissions:
-        for eval in submission.evaluations:
-            if eval.is_final and eval.skill_ratings:
-                for skill, level in eval.skill_ratings.items():
-                    if skill.startswith('_') or not isinstance(level, str):
-                        continue
-                    skill_data[skill].append({
-                        "level": level,
-                        "date": eval.created_at
-                    })
-
-    # Create/update skill assessments
+    # Create/update skill assessments, adding history for evaluations since the last point
+    now = datetime.utcnow()
     assessments = []
+    history = []
     for skill, ratings in skill_data.items():
-        # Weight recent ratings more heavily
-        level_scores = defaultdict(float)
-        for i, r in enumerate(sorted(ratings, key=lambda x: x["date"])):
-            weight = 1 + (i / len(ratings))  # Later = higher weight
-            level_scores[r["level"]] += weight
-
-        # Determine current level
-        current_level = max(level_scores, key=level_scores.get)
-
-        # Calculate confidence based on number of data points
-        confidence = min(1.0, len(ratings) / 5)  # Max confidence at 5+ ratings
-
-        # Update or create assessment
-        existing = session.query(SkillAssessment).filter_by(
-            student_id=student_id,
-            skill_name=skill
-        ).first()
-
-        if existing:
-            existing.skill_level = current_level
-            existing.confidence = confidence
-            existing.evidence_count = len(ratings)
-            existing.assessed_at = datetime.utcnow()
-            assessments.append(existing)
+        current_level, confidence = _assess_skill([level for level, _ in ratings])
+
+        assessment = existing.get(skill)
+        if assessment:
+            assessment.skill_level = current_level
+            assessment.confidence = confidence
+            assessment.evidence_count = len(ratings)
+            assessment.assessed_at = now
         else:
             assessment = SkillAssessment(
                 student_id=student_id,
                 skill_name=skill,
                 skill_level=current_level,
                 confidence=confidence,
-                evidence_count=len(ratings)
+                evidence_count=len(ratings),
+                assessed_at=now
             )
             session.add(assessment)
-            assessments.append(assessment)
+        assessments.append(assessment)
+        history.extend(_skill_history_points(student_id, skill, ratings, latest.get((student_id, skill))))
 
+    if history:
+        session.execute(insert(SkillHistory), history)
     session.commit()
     session.close()
 
@@ -696,31 +1202,194 @@ def update_student_skill_assessments(student_id: int) -> list[SkillAssessment]:
 
 
 def update_all_skill_assessments() -> int:
-    """Update skill assessments for all students."""
+    """
+    Update skill assessments for all students.
+
+    Reads every final skill rating in one query and writes all the
+    assessments, plus history points for evaluations since each skill's
+    last point (dated at the evaluation, as rebuild_skill_history() does),
+    with bulk inserts/updates in a single transaction.
+    """
     session = get_session()
-    students = session.query(Student).all()
-    student_ids = [s.id for s in students]
+    try:
+        student_ids = [row.id for row in session.query(Student.id)]
+        skill_data = _final_skill_ratings(session)
+        latest = _latest_skill_history(session)
+
+        existing = {}
+        for row in session.query(
+            SkillAssessment.id, SkillAssessment.student_id, SkillAssessment.skill_name,
+            SkillAssessment.skill_level, SkillAssessment.confidence, SkillAssessment.evidence_count
+        ).order_by(SkillAssessment.id):
+            existing.setdefault((row.student_id, row.skill_name), row)
+
+        now = datetime.utcnow()
+        inserts, updates, history = [], [], []
+        for student_id in student_ids:
+            for skill, ratings in skill_data.get(student_id, {}).items():
+                current_level, confidence = _assess_skill([level for level, _ in ratings])
+                values = {
+                    "skill_level": current_level,
+                    "confidence": confidence,
+                    "evidence_count": len(ratings),
+                    "assessed_at": now
+                }
+                row = existing.get((student_id, skill))
+                if row:
+                    updates.append({"id": row.id, **values})
+                history.extend(_skill_history_points(student_id, skill, ratings, latest.get((student_id, skill))))
+                if not row:
+                    inserts.append({"student_id": student_id, "skill_name": skill, **values})
+
+        if inserts:
+            session.execute(insert(SkillAssessment), inserts)
+        if updates:
+            session.execute(update(SkillAssessment), updates)
+        if history:
+            session.execute(insert(SkillHistory), history)
+        session.commit()
+    finally:
+        session.close()
+
+    print(f"Updated skill assessments for {len(student_ids)} students")
+    return len(student_ids)
+
+
+# ============================================================================
+# Skill history
+# ============================================================================
+
+def rebuild_skill_history() -> int:
+    """
+    Rebuild the skill history from evaluations.
+
+    Replays each student's final skill ratings in date order and records the
+    assessment as it stood after each evaluation, dated at that evaluation.
+    Use after upgrading, or to repair the history after editing evaluations.
+
+    Returns:
+        Number of history rows written
+    """
+    session = get_session()
+    try:
+        skill_data = _final_skill_ratings(session)
+
+        rows = []
+        for student_id, skills in skill_data.items():
+            for skill, ratings in skills.items():
+                rows.extend(_skill_history_points(student_id, skill, ratings))
+
+        session.query(SkillHistory).delete()
+        if rows:
+            session.execute(insert(SkillHistory), rows)
+        session.commit()
+    finally:
+        session.close()
+
+    print(f"Rebuilt skill history: {len(rows)} points")
+    return len(rows)
+
+
+def _history_point(row: SkillHistory) -> dict:
+    return {
+        "date": row.assessed_at.isoformat(),
+        "level": row.skill_level,
+        "level_value": SKILL_LEVEL_ORDER.get(row.skill_level, 0),
+        "confidence": row.confidence,
+        "evidence_count": row.evidence_count
+    }
+
+
+def get_skill_history(student_id: int, skill_name: Optional[str] = None) -> dict:
+    """
+    A student's assessed skill levels over time, for charts.
+
+    Returns:
+        {skill: [{date, level, level_value, confidence, evidence_count}, ...]}
+        with each list oldest first
+    """
+    session = get_session()
+    query = session.query(SkillHistory).filter(SkillHistory.student_id == student_id)
+    if skill_name:
+        query = query.filter(SkillHistory.skill_name == skill_name)
+
+    history = defaultdict(list)
+    for row in query.order_by(SkillHistory.skill_name, SkillHistory.assessed_at, SkillHistory.id):
+        history[row.skill_name].append(_history_point(row))
+    session.close()
+    return dict(history)
+
+
+def get_skill_level_at(student_id: int, skill_name: str, at: datetime) -> Optional[dict]:
+    """
+    A student's assessed level for a skill as of a date.
+
+    Returns:
+        {date, level, level_value, confidence, evidence_count} for the latest
+        assessment at or before `at`, or None if there wasn't one yet
+    """
+    session = get_session()
+    row = session.query(SkillHistory).filter(
+        SkillHistory.student_id == student_id,
+        SkillHistory.skill_name == skill_name,
+        SkillHistory.assessed_at <= at
+    ).order_by(SkillHistory.assessed_at.desc(), SkillHistory.id.desc()).first()
+
+    point = _history_point(row) if row else None
     session.close()
+    return point
+
+
+def get_skill_deltas(student_id: int, days: int = 30, end: Optional[datetime] = None) -> dict:
+    """
+    How each of a student's skills changed over a window.
 
-    count = 0
-    for student_id in student_ids:
-        update_student_skill_assessments(student_id)
-        count += 1
+    Args:
+        student_id: Student to look at
+        days: Window length
+        end: End of the window (default now)
 
-    print(f"Updated skill assessments for {count} students")
-    return count
+    Returns:
+        {skill: {start_level, end_level, delta}} where delta is the change in
+        level_value (a skill first assessed inside the window starts from 0)
+    """
+    end = end or datetime.utcnow()
+    start = end - timedelta(days=days)
+
+    session = get_session()
+    rows = session.query(SkillHistory).filter(
+        SkillHistory.student_id == student_id,
+        SkillHistory.assessed_at <= end
+    ).order_by(SkillHistory.skill_name, SkillHistory.assessed_at, SkillHistory.id).all()
+    session.close()
+
+    at_start, at_end = {}, {}
+    for row in rows:
+        if row.assessed_at <= start:
+            at_start[row.skill_name] = row.skill_level
+        at_end[row.skill_name] = row.skill_level
+
+    return {
+        skill: {
+            "start_level": at_start.get(skill),
+            "end_level": level,
+            "delta": SKILL_LEVEL_ORDER.get(level, 0) - SKILL_LEVEL_ORDER.get(at_start.get(skill), 0)
+        }
+        for skill, level in at_end.items()
+    }
 
 
 if __name__ == "__main__":
     # Example usage
     print("=== Student Tracker Analysis ===")
 
-    overview = get_class_overview()
+    ctx = AnalyticsContext()
+    overview = get_class_overview(ctx)
     print(f"\nClass Overview:")
     print(f"  Students: {overview['summary']['total_students']}")
     print(f"  Average: {overview['summary']['class_average']:.1f}%")
 
-    groups = identify_student_groups()
+    groups = identify_student_groups(ctx)
     print(f"\nStudent Groups:")
     for group, students in groups.items():
         print(f"  {group}: {len(students)}")
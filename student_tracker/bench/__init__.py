@@ -0,0 +1,9 @@
+"""
+Synthetic data and benchmarks for the student tracker.
+
+    python -m student_tracker.bench --scale large --output results.json
+
+Generates a synthetic course into a temporary database (synthetic.py),
+times the dashboard and pipeline hot paths against it (runner.py), and
+compares the results with a stored baseline.
+"""
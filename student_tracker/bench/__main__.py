@@ -0,0 +1,147 @@
+"""
+Run the benchmark suite.
+
+Usage:
+    python -m student_tracker.bench [--scale small|medium|large] [options]
+
+Examples:
+    # Quick run on a small synthetic course
+    python -m student_tracker.bench
+
+    # 5k students x 40 assignments, keep the database for later runs
+    python -m student_tracker.bench --scale large --db /tmp/bench-large.db
+
+    # Record a baseline, then check a branch against it
+    python -m student_tracker.bench --scale medium --update-baseline
+    python -m student_tracker.bench --scale medium --output results.json
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Dataset size presets
+SCALES = {
+    "small": {"students": 200, "assignments": 10},
+    "medium": {"students": 1000, "assignments": 20},
+    "large": {"students": 5000, "assignments": 40},
+}
+
+
+def main() -> int:
+    # models binds its engine to STUDENT_TRACKER_DB at import time, so the
+    # database path has to be set before anything imports it
+    if "student_tracker.models" in sys.modules:
+        print("student_tracker.models is already imported; run the bench in a fresh process")
+        return 2
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the student tracker against a synthetic course",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="Dataset size preset")
+    parser.add_argument("--students", type=int, help="Override the preset's student count")
+    parser.add_argument("--assignments", type=int, help="Override the preset's assignment count")
+    parser.add_argument("--evaluations", type=int, default=2, help="Max evaluations per submission")
+    parser.add_argument("--seed", type=int, default=140, help="Random seed for the dataset")
+    parser.add_argument("--db", help="Database path; reused if it exists, generated otherwise")
+    parser.add_argument("--only", help="Comma-separated benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--output", "-o", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Baseline results JSON (default: baselines/<scale>.json if present)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=None,
+        help="Slowdown fraction that counts as a regression (default 0.25)")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    spec = dict(SCALES[args.scale])
+    if args.students:
+        spec["students"] = args.students
+    if args.assignments:
+        spec["assignments"] = args.assignments
+
+    workdir = tempfile.mkdtemp(prefix="student-tracker-bench-")
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, "bench.db")
+    os.environ["STUDENT_TRACKER_DB"] = db_path
+
+    from . import runner
+    from .synthetic import generate_dataset, build_canvas_fixture
+
+    if args.list:
+        print("\n".join(runner.BENCHMARKS))
+        shutil.rmtree(workdir, ignore_errors=True)
+        return 0
+
+    names = args.only.split(",") if args.only else list(runner.BENCHMARKS)
+    unknown = [n for n in names if n not in runner.BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)} (see --list)")
+        return 2
+
+    try:
+        generate_seconds = None
+        if os.path.exists(db_path):
+            print(f"Reusing database {db_path}")
+            from ..models import init_db
+            init_db()  # add columns and indexes from newer models
+            dataset = None
+        else:
+            print(f"Generating {spec['students']} students x {spec['assignments']} assignments into {db_path}")
+            started = time.perf_counter()
+            dataset = generate_dataset(
+                students=spec["students"],
+                assignments=spec["assignments"],
+                evaluations_per_submission=args.evaluations,
+                seed=args.seed
+            )
+            generate_seconds = round(time.perf_counter() - started, 2)
+            print(f"  {dataset} in {generate_seconds}s")
+
+        ctx = {"workdir": workdir, "canvas_fixture": build_canvas_fixture()}
+
+        print(f"Running {len(names)} benchmarks x {args.repeat}")
+        results = {
+            "meta": {
+                **runner.environment_info(),
+                "scale": args.scale,
+                "spec": spec,
+                "dataset": dataset,
+                "generate_seconds": generate_seconds,
+                "repeat": args.repeat
+            },
+            "benchmarks": runner.run_benchmarks(ctx, names, repeat=args.repeat)
+        }
+    finally:
+        for name in ("canvas_server", "llm_server"):
+            if "ctx" in locals() and name in ctx:
+                ctx[name].shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        runner.save_json(results, args.output)
+        print(f"\nWrote {args.output}")
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.scale}.json")
+    exit_code = 0
+    if args.update_baseline:
+        runner.save_json(results, baseline_path)
+        print(f"Saved baseline {baseline_path}")
+    elif os.path.exists(baseline_path):
+        threshold = args.threshold if args.threshold is not None else runner.DEFAULT_THRESHOLD
+        rows = runner.compare(results, runner.load_json(baseline_path), threshold)
+        print(f"\nCompared with {baseline_path} (regression threshold +{threshold:.0%})")
+        runner.print_comparison(rows)
+        if any(row["status"] == "regression" for row in rows):
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Local stand-in for the Canvas REST API.
+
+Serves the endpoints canvas_fetcher and feedback_queue use, from data built
+by the synthetic course generator, so sync and publishing can be exercised
+and load-tested without the live Canvas:
+
+- GET  /api/v1/courses/:course/users
+- GET  /api/v1/courses/:course/assignments
+- GET  /api/v1/courses/:course/assignments/:assignment/submissions
+- GET  /api/v1/courses/:course/students/submissions
+       (student_ids[], assignment_ids[], submitted_since, include[])
+- GET/PUT /api/v1/courses/:course/assignments/:assignment/submissions/:user
+       (include[]; comment[text_comment])
+- GET/POST /api/v1/courses/:course/discussion_topics (announcements too)
+- POST /api/v1/courses/:course/discussion_topics/:topic/entries
+
+List endpoints paginate with per_page/page and a Link header like Canvas.
+Every response carries X-Request-Cost and X-Rate-Limit-Remaining from a
+leaky-bucket rate limiter, and requests over the limit get Canvas's
+403 "Rate Limit Exceeded".
+
+Test hooks:
+- GET  /_fake/stats   request counts, comments, topics, duplicate comments
+- POST /_fake/mutate  {"update": n, "create": n} changes submissions so an
+                      incremental sync has something to pick up
+
+Usage:
+    python -m student_tracker.bench.fake_canvas --students 200 --assignments 10 --port 8900
+    CANVAS_BASE_URL=http://127.0.0.1:8900 CANVAS_API_TOKEN=fake CANVAS_COURSE_ID=1 \\
+        python -m student_tracker.cli sync
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlencode
+
+from flask import Flask, Response, g, jsonify, request
+
+COURSE_ID = "1"
+
+# Canvas defaults: 10 items per page, at most 100
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+# Canvas-style leaky bucket: capacity, drain per second, cost per request
+DEFAULT_RATE_LIMIT = 700.0
+DEFAULT_RATE_REFILL = 10.0
+DEFAULT_REQUEST_COST = 1.0
+
+
+class FakeCanvas:
+    """In-memory course state plus the rate limiter and request stats."""
+
+    def __init__(
+        self,
+        fixture: dict,
+        course_id: str = COURSE_ID,
+        latency_ms: float = 0.0,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_refill: float = DEFAULT_RATE_REFILL,
+        request_cost: float = DEFAULT_REQUEST_COST,
+        seed: int = 140
+    ):
+        self.course_id = str(course_id)
+        self.users = list(fixture["users"])
+        self.assignments = list(fixture["assignments"])
+        self.submissions = {
+            (s["assignment_id"], s["user_id"]): dict(s) for s in fixture["submissions"]
+        }
+        self.topics = []
+        self.entries = []
+
+        self.latency_ms = latency_ms
+        self.rate_limit = rate_limit
+        self.rate_refill = rate_refill
+        self.request_cost = request_cost
+        self._bucket = 0.0
+        self._bucket_updated = time.monotonic()
+
+        self.lock = threading.Lock()
+        self.rnd = random.Random(seed)
+        self.next_id = 1 + max(
+            [s["id"] for s in self.submissions.values()] + [u["id"] for u in self.users] + [0]
+        )
+        self.stats = Counter()
+        self.comment_texts = Counter()  # (assignment, user, text) -> times posted
+
+    def _new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def charge(self) -> float:
+        """Take one request's cost from the bucket; return the remaining allowance."""
+        with self.lock:
+            now = time.monotonic()
+            self._bucket = max(0.0, self._bucket - (now - self._bucket_updated) * self.rate_refill)
+            self._bucket_updated = now
+            if self._bucket + self.request_cost > self.rate_limit:
+                return -1.0
+            self._bucket += self.request_cost
+            return self.rate_limit - self._bucket
+
+    def mutate(self, update: int = 0, create: int = 0) -> dict:
+        """Change existing submissions and add new ones (for incremental sync tests)."""
+        now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self.lock:
+            updated = self.rnd.sample(list(self.submissions), min(update, len(self.submissions)))
+            for key in updated:
+                sub = self.submissions[key]
+                sub["body"] = (sub.get("body") or "") + f" Revised {now}."
+                sub["submission_type"] = "online_text_entry"
+                sub["workflow_state"] = "submitted"
+                sub["submitted_at"] = now
+
+            created = []
+            for _ in range(create):
+                user = {"id": self._new_id(), "name": f"New Student {self.next_id}"}
+                user["sortable_name"] = user["name"]
+                user["email"] = f"new{user['id']}@montclair.edu"
+                self.users.append(user)
+                for assignment in self.assignments:
+                    sub = {
+                        "id": self._new_id(),
+                        "user_id": user["id"],
+                        "assignment_id": assignment["id"],
+                        "workflow_state": "submitted",
+                        "submitted_at": now,
+                        "late": False,
+                        "submission_type": "online_text_entry",
+                        "body": "Newly submitted work.",
+                        "score": None,
+                        "grade": None,
+                        "submission_comments": []
+                    }
+                    self.submissions[(assignment["id"], user["id"])] = sub
+                    created.append(sub["id"])
+
+        return {
+            "updated": [self.submissions[key]["id"] for key in updated],
+            "created": created,
+            "changed_at": now
+        }
+
+
+def create_app(canvas: FakeCanvas) -> Flask:
+    """Build the Flask app serving a FakeCanvas."""
+    app = Flask(__name__)
+    prefix = "/api/v1/courses/<course_id>"
+
+    def paginate(items: list) -> Response:
+        per_page = min(request.args.get("per_page", DEFAULT_PER_PAGE, type=int), MAX_PER_PAGE)
+        page = max(request.args.get("page", 1, type=int), 1)
+        last = max((len(items) + per_page - 1) // per_page, 1)
+        response = jsonify(items[(page - 1) * per_page:page * per_page])
+
+        def link(n: int, rel: str) -> str:
+            args = [(k, v) for k, v in request.args.items(multi=True) if k != "page"]
+            return f'<{request.base_url}?{urlencode(args + [("page", n)])}>; rel="{rel}"'
+
+        links = [link(page, "current"), link(1, "first"), link(last, "last")]
+        if page < last:
+            links.append(link(page + 1, "next"))
+        if page > 1:
+            links.append(link(page - 1, "prev"))
+        response.headers["Link"] = ",".join(links)
+        return response
+
+    def shape_submission(sub: dict, includes: list) -> dict:
+        item = {k: v for k, v in sub.items() if k != "submission_comments"}
+        if "submission_comments" in includes:
+            item["submission_comments"] = sub.get("submission_comments", [])
+        if "user" in includes:
+            item["user"] = next((u for u in canvas.users if u["id"] == sub["user_id"]), None)
+        return item
+
+    @app.before_request
+    def check_request():
+        if request.path.startswith("/_fake"):
+            return None
+
+        if canvas.latency_ms:
+            time.sleep(canvas.latency_ms / 1000 * canvas.rnd.uniform(0.5, 1.5))
+
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return jsonify({"errors": [{"message": "Invalid access token."}]}), 401
+
+        course_id = (request.view_args or {}).get("course_id")
+        if course_id is not None and str(course_id) != canvas.course_id:
+            return jsonify({"errors": [{"message": "The specified resource does not exist."}]}), 404
+
+        remaining = canvas.charge()
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        canvas.stats[f"{request.method} {endpoint}"] += 1
+        if remaining < 0:
+            canvas.stats["rate_limited"] += 1
+            response = Response("403 Forbidden (Rate Limit Exceeded)", status=403)
+            response.headers["X-Rate-Limit-Remaining"] = "0"
+            return response
+        g.rate_limit_remaining = remaining
+
+    @app.after_request
+    def rate_limit_headers(response):
+        if not request.path.startswith("/_fake"):
+            response.headers["X-Request-Cost"] = f"{canvas.request_cost:.4f}"
+            remaining = g.get("rate_limit_remaining")
+            if remaining is not None:
+                response.headers["X-Rate-Limit-Remaining"] = f"{remaining:.4f}"
+        return response
+
+    @app.route(f"{prefix}/users")
+    def users(course_id):
+        return paginate(canvas.users)
+
+    @app.route(f"{prefix}/assignments")
+    def assignments(course_id):
+        return paginate(canvas.assignments)
+
+    @app.route(f"{prefix}/assignments/<int:assignment_id>/submissions")
+    def assignment_submissions(course_id, assignment_id):
+        includes = request.args.getlist("include[]")
+        items = [shape_submission(s, includes) for (a, _), s in canvas.submissions.items() if a == assignment_id]
+        return paginate(items)
+
+    @app.route(f"{prefix}/students/submissions")
+    def student_submissions(course_id):
+        includes = request.args.getlist("include[]")
+        student_ids = request.args.getlist("student_ids[]")
+        assignment_ids = {int(a) for a in request.args.getlist("assignment_ids[]")}
+        since = request.args.get("submitted_since")
+
+        items = []
+        for (assignment_id, user_id), sub in canvas.submissions.items():
+            if student_ids and "all" not in student_ids and str(user_id) not in student_ids:
+                continue
+            if assignment_ids and assignment_id not in assignment_ids:
+                continue
+            if since and (not sub.get("submitted_at") or sub["submitted_at"] < since):
+                continue
+            items.append(shape_submission(sub, includes))
+        return paginate(items)
+
+    @app.route(f"{prefix}/assignments/<int:assignment_id>/submissions/<int:user_id>", methods=["GET", "PUT"])
+    def grade_or_comment(course_id, assignment_id, user_id):
+        sub = canvas.submissions.get((assignment_id, user_id))
+        if sub is None:
+            return jsonify({"errors": [{"message": "The specified resource does not exist."}]}), 404
+        if request.method == "GET":
+            return jsonify(shape_submission(sub, request.args.getlist("include[]")))
+
+        data = request.get_json(silent=True) or {}
+        text = (data.get("comment") or {}).get("text_comment")
+        if text:
+            with canvas.lock:
+                comment = {
+                    "id": canvas._new_id(),
+                    "author_name": "Instructor",
+                    "comment": text,
+                    "created_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+                }
+                sub.setdefault("submission_comments", []).append(comment)
+                canvas.comment_texts[(assignment_id, user_id, text)] += 1
+                canvas.stats["comments"] += 1
+        return jsonify(sub)
+
+    @app.route(f"{prefix}/discussion_topics", methods=["GET", "POST"])
+    def discussion_topics(course_id):
+        if request.method == "GET":
+            announcements = request.args.get("only_announcements") in ("true", "1")
+            return paginate([t for t in canvas.topics if t["is_announcement"] == announcements])
+
+        data = request.get_json(silent=True) or {}
+        with canvas.lock:
+            topic = {
+                "id": canvas._new_id(),
+                "title": data.get("title"),
+                "message": data.get("message"),
+                "published": data.get("published", False),
+                "is_announcement": bool(data.get("is_announcement")),
+                "discussion_type": data.get("discussion_type", "side_comment"),
+                "posted_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+            }
+            canvas.topics.append(topic)
+            canvas.stats["announcements" if topic["is_announcement"] else "topics"] += 1
+        return jsonify(topic)
+
+    @app.route(f"{prefix}/discussion_topics/<int:topic_id>/entries", methods=["POST"])
+    def discussion_entries(course_id, topic_id):
+        if not any(t["id"] == topic_id for t in canvas.topics):
+            return jsonify({"errors": [{"message": "The specified resource does not exist."}]}), 404
+
+        data = request.get_json(silent=True) or {}
+        with canvas.lock:
+            entry = {"id": canvas._new_id(), "topic_id": topic_id, "message": data.get("message")}
+            canvas.entries.append(entry)
+            canvas.stats["entries"] += 1
+        return jsonify(entry)
+
+    @app.route("/_fake/stats")
+    def fake_stats():
+        duplicates = sum(count - 1 for count in canvas.comment_texts.values() if count > 1)
+        return jsonify({
+            "requests": dict(canvas.stats),
+            "users": len(canvas.users),
+            "assignments": len(canvas.assignments),
+            "submissions": len(canvas.submissions),
+            "topics": len(canvas.topics),
+            "duplicate_comments": duplicates
+        })
+
+    @app.route("/_fake/mutate", methods=["POST"])
+    def fake_mutate():
+        data = request.get_json(silent=True) or {}
+        return jsonify(canvas.mutate(update=int(data.get("update", 0)), create=int(data.get("create", 0))))
+
+    return app
+
+
+def serve_in_thread(canvas: FakeCanvas, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the fake Canvas in a background thread.
+
+    Returns:
+        (server, base_url); call server.shutdown() to stop it
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server(host, port, create_app(canvas), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+@contextmanager
+def use_fake_canvas(base_url: str, course_id: str = COURSE_ID):
+    """Point canvas_fetcher at a fake Canvas for the duration of the block."""
+    from .. import canvas_fetcher
+
+    patched = {
+        "CANVAS_BASE_URL": base_url,
+        "CANVAS_API_TOKEN": "fake",
+        "CANVAS_COURSE_ID": course_id,
+    }
+    original = {name: getattr(canvas_fetcher, name) for name in patched}
+    for name, value in patched.items():
+        setattr(canvas_fetcher, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(canvas_fetcher, name, value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a local fake Canvas API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--fixture", help="Canvas fixture JSON (users, assignments, submissions)")
+    parser.add_argument("--from-db", help="Build the fixture from an existing student tracker database")
+    parser.add_argument("--students", type=int, default=200, help="Synthetic students (no fixture/db)")
+    parser.add_argument("--assignments", type=int, default=10, help="Synthetic assignments (no fixture/db)")
+    parser.add_argument("--seed", type=int, default=140)
+    parser.add_argument("--save-fixture", help="Also write the fixture JSON here")
+    parser.add_argument("--course-id", default=COURSE_ID)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Rate limit bucket size")
+    parser.add_argument("--rate-refill", type=float, default=DEFAULT_RATE_REFILL, help="Bucket drain per second")
+    parser.add_argument("--request-cost", type=float, default=DEFAULT_REQUEST_COST, help="Cost per request")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, encoding="utf-8") as f:
+            fixture = json.load(f)
+    else:
+        # models binds its engine at import time, so choose the database first
+        if args.from_db:
+            os.environ["STUDENT_TRACKER_DB"] = os.path.abspath(args.from_db)
+        else:
+            os.environ["STUDENT_TRACKER_DB"] = os.path.join(
+                tempfile.mkdtemp(prefix="fake-canvas-"), "seed.db"
+            )
+        from .synthetic import generate_dataset, build_canvas_fixture
+        if not args.from_db:
+            print(f"Generating {args.students} students x {args.assignments} assignments...")
+            generate_dataset(students=args.students, assignments=args.assignments, seed=args.seed)
+        fixture = build_canvas_fixture()
+
+    if args.save_fixture:
+        with open(args.save_fixture, "w", encoding="utf-8") as f:
+            json.dump(fixture, f)
+
+    canvas = FakeCanvas(
+        fixture,
+        course_id=args.course_id,
+        latency_ms=args.latency_ms,
+        rate_limit=args.rate_limit,
+        rate_refill=args.rate_refill,
+        request_cost=args.request_cost,
+        seed=args.seed
+    )
+    print(f"Fake Canvas: {len(canvas.users)} users, {len(canvas.assignments)} assignments, "
+          f"{len(canvas.submissions)} submissions")
+    print(f"  CANVAS_BASE_URL=http://{args.host}:{args.port} CANVAS_API_TOKEN=fake "
+          f"CANVAS_COURSE_ID={args.course_id}")
+    create_app(canvas).run(host=args.host, port=args.port, threaded=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
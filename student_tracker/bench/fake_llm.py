@@ -0,0 +1,392 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Answers POST /v1/messages with schema-valid JSON for every prompt the
+tracker sends, so evaluation, insights and recommendations can be
+load-tested without spending money:
+
+- evaluations (evaluator.py): overall_score within the prompt's points
+  possible, a score_breakdown for each rubric criterion, skill ratings,
+  strengths, feedback and ai_likelihood
+- student and class insights (analyzer.py)
+- student, group, class and assignment recommendations (recommendations.py)
+
+Responses are deterministic for a given prompt (the content is seeded from
+a hash of it). Latency follows a lognormal distribution around a median,
+plus an optional per-output-token generation time. Configurable error and
+429 rates, and a concurrency limit, exercise retry and backoff paths; the
+errors use the API's JSON error shape so the SDK raises its usual
+exceptions.
+
+Test hooks:
+- GET  /_fake/stats  requests by prompt kind, errors, tokens, peak concurrency
+- POST /_fake/reset  clear the stats
+
+Usage:
+    python -m student_tracker.bench.fake_llm --port 8901 --latency-ms 800 --rate-limit-rate 0.05
+    STUDENT_TRACKER_LLM_BASE_URL=http://127.0.0.1:8901 python -m student_tracker.cli evaluate --limit 50
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import Flask, jsonify, request
+
+SKILLS = ["writing", "critical_thinking", "research", "design", "strategy", "communication"]
+SKILL_LEVELS = ["emerging", "developing", "proficient", "advanced"]
+
+STRENGTHS = [
+    "Clear thesis tied back to the reading",
+    "Strong, specific examples",
+    "Good visual hierarchy",
+    "Solid sourcing",
+    "Knows the audience well",
+]
+IMPROVEMENTS = [
+    "Needs more specific evidence",
+    "Tighten the conclusion",
+    "Cite sources consistently",
+    "Explain the strategy behind the choices",
+    "Proofread for typos",
+]
+
+# Distinctive key in each prompt's JSON template -> prompt kind
+PROMPT_KINDS = [
+    ('"overall_score"', "evaluation"),
+    ('"overall_assessment"', "student_insights"),
+    ('"class_health"', "class_insights"),
+    ('"top_recommendations"', "student_recommendations"),
+    ('"class_intervention"', "group_recommendations"),
+    ('"class_health_assessment"', "class_recommendations"),
+    ('"assignment_feedback"', "assignment_recommendations"),
+]
+
+# Rough characters per token, for usage numbers
+CHARS_PER_TOKEN = 4
+
+
+def prompt_kind(prompt: str) -> str:
+    for marker, kind in PROMPT_KINDS:
+        if marker in prompt:
+            return kind
+    return "unknown"
+
+
+def _level(rnd: random.Random, fraction: float) -> str:
+    index = min(int(fraction * len(SKILL_LEVELS) + rnd.uniform(-0.5, 0.5)), len(SKILL_LEVELS) - 1)
+    return SKILL_LEVELS[max(index, 0)]
+
+
+def _evaluation(prompt: str, rnd: random.Random) -> dict:
+    match = re.search(r"POINTS POSSIBLE:\s*([\d.]+)", prompt)
+    points = float(match.group(1)) if match else 100.0
+    criteria = re.findall(r"^\d+\. (.+?) \((\d+)%\)$", prompt, flags=re.MULTILINE) or [("Overall", "100")]
+
+    fraction = min(max(rnd.gauss(0.78, 0.12), 0.0), 1.0)
+    breakdown = {
+        name: {
+            "level": _level(rnd, fraction),
+            "score": round(points * int(weight) / 100 * fraction, 1),
+            "feedback": "Nice work here! This could go a bit deeper."
+        }
+        for name, weight in criteria
+    }
+    ai_score = rnd.randint(0, 60)
+    return {
+        "overall_score": round(points * fraction, 1),
+        "score_breakdown": breakdown,
+        "skill_ratings": {skill: _level(rnd, fraction) for skill in rnd.sample(SKILLS, 3)},
+        "strengths": rnd.sample(STRENGTHS, 2),
+        "areas_for_improvement": rnd.sample(IMPROVEMENTS, 2),
+        "overall_feedback": "Good work overall! You've got the core idea down. Next time, push the analysis further.",
+        "next_steps": "Pick one claim and back it up with a specific example.",
+        "ai_likelihood": {
+            "score": ai_score,
+            "signals": ["generic transitions"] if ai_score >= 30 else [],
+            "note": "Some generic phrasing." if ai_score >= 30 else None
+        }
+    }
+
+
+def _content(kind: str, prompt: str, rnd: random.Random) -> dict:
+    if kind == "evaluation":
+        return _evaluation(prompt, rnd)
+    if kind == "student_insights":
+        return {
+            "overall_assessment": "Steady work with clear strengths in writing. Research depth is the main gap.",
+            "recommendations": rnd.sample(IMPROVEMENTS, 2),
+            "teaching_strategies": ["Model a strong example in class", "Offer a short check-in before the next deadline"],
+            "concerns": None if rnd.random() < 0.7 else ["Two late submissions in a row"]
+        }
+    if kind == "class_insights":
+        return {
+            "class_health": "The class is mostly on track. A small group is falling behind on submissions.",
+            "skills_needing_attention": rnd.sample(SKILLS, 2),
+            "group_recommendations": {
+                "struggling": "Short targeted workshops on evidence.",
+                "at_risk": "Individual outreach this week.",
+                "high_performers": "Offer stretch goals on the next project."
+            },
+            "patterns_and_concerns": ["Late submissions cluster around midterms"],
+            "suggested_interventions": ["Add a draft checkpoint", "Share an annotated exemplar"]
+        }
+    if kind == "student_recommendations":
+        return {
+            "top_recommendations": [
+                {
+                    "title": f"Strengthen {skill.replace('_', ' ')}",
+                    "description": "Focus on one concrete habit for the next assignment.",
+                    "action_items": ["Outline before drafting", "Ask for feedback on a draft"]
+                }
+                for skill in rnd.sample(SKILLS, 3)
+            ],
+            "encouragement": "You've made real progress this semester. Keep it up!"
+        }
+    if kind == "group_recommendations":
+        return {
+            "class_intervention": "Run a 15-minute review of the rubric before the next deadline.",
+            "individual_outreach": ["Email a check-in", "Offer office hours slots"],
+            "assignment_strategy": "Allow a draft submission for early feedback.",
+            "priority_level": rnd.choice(["high", "medium", "low"])
+        }
+    if kind == "class_recommendations":
+        return {
+            "class_health_assessment": "Most students are meeting expectations. Research skills lag behind writing.",
+            "immediate_priorities": ["Follow up with at-risk students", "Clarify citation expectations"],
+            "teaching_adjustments": ["More in-class examples", "Shorter feedback loops"],
+            "upcoming_assignment_considerations": ["Add a sourcing checklist"],
+            "positive_observations": ["Strong engagement with the readings"]
+        }
+    if kind == "assignment_recommendations":
+        return {
+            "assignment_feedback": "Students handled the core task well but struggled with sourcing.",
+            "instructions_improvements": ["State the minimum number of sources"],
+            "rubric_adjustments": ["Weight analysis above formatting"],
+            "preparation_activities": ["Library database demo"],
+            "common_misconceptions": ["Treating opinion pieces as research"]
+        }
+    return {"text": "OK"}
+
+
+class FakeLLM:
+    """Response generation, simulated latency and failures, and request stats."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.5,
+        output_tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        max_concurrency: int = 0,
+        retry_after: float = 1.0,
+        seed: int = 140
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.output_tokens_per_second = output_tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+
+        self.lock = threading.Lock()
+        self.rnd = random.Random(seed)
+        self.seed = seed
+        self.in_flight = 0
+        self.stats = Counter()
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def delay(self, output_tokens: int) -> float:
+        """Seconds to spend on one request."""
+        seconds = 0.0
+        if self.latency_ms:
+            with self.lock:
+                noise = self.rnd.gauss(0, self.latency_sigma)
+            seconds += self.latency_ms / 1000 * math.exp(noise)
+        if self.output_tokens_per_second:
+            seconds += output_tokens / self.output_tokens_per_second
+        return seconds
+
+    def failure(self):
+        """Pick a simulated failure for this request: (status, error type, message) or None."""
+        with self.lock:
+            roll = self.rnd.random()
+            if self.max_concurrency and self.in_flight > self.max_concurrency:
+                return 429, "rate_limit_error", "Number of concurrent connections has exceeded your rate limit."
+            if roll < self.rate_limit_rate:
+                return 429, "rate_limit_error", "Number of request tokens has exceeded your per-minute rate limit."
+            if roll < self.rate_limit_rate + self.error_rate:
+                return self.rnd.choice([
+                    (500, "api_error", "Internal server error"),
+                    (529, "overloaded_error", "Overloaded"),
+                ])
+        return None
+
+    def respond(self, body: dict) -> dict:
+        """Build a Messages API response for a request body."""
+        prompt = "\n".join(
+            part if isinstance(part, str) else "".join(p.get("text", "") for p in part)
+            for part in (m.get("content", "") for m in body.get("messages", []))
+        )
+        if isinstance(body.get("system"), str):
+            prompt = body["system"] + "\n" + prompt
+
+        kind = prompt_kind(prompt)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        rnd = random.Random(f"{self.seed}:{digest}")
+        text = json.dumps(_content(kind, prompt, rnd), indent=2)
+
+        input_tokens = max(len(prompt) // CHARS_PER_TOKEN, 1)
+        output_tokens = min(max(len(text) // CHARS_PER_TOKEN, 1), int(body.get("max_tokens") or 4096))
+        with self.lock:
+            self.stats[f"kind:{kind}"] += 1
+            self.stats["input_tokens"] += input_tokens
+            self.stats["output_tokens"] += output_tokens
+
+        return {
+            "id": f"msg_fake_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+        }
+
+
+def create_app(llm: FakeLLM) -> Flask:
+    """Build the Flask app serving a FakeLLM."""
+    app = Flask(__name__)
+
+    def error(status: int, error_type: str, message: str):
+        response = jsonify({"type": "error", "error": {"type": error_type, "message": message}})
+        response.status_code = status
+        if status == 429:
+            response.headers["retry-after"] = f"{llm.retry_after:g}"
+        return response
+
+    @app.route("/v1/messages", methods=["POST"])
+    def messages():
+        if not request.headers.get("x-api-key") and not request.headers.get("Authorization"):
+            return error(401, "authentication_error", "x-api-key header is required")
+
+        body = request.get_json(silent=True)
+        if not body or not body.get("messages"):
+            return error(400, "invalid_request_error", "messages: field required")
+
+        with llm.lock:
+            llm.in_flight += 1
+            llm.stats["requests"] += 1
+            llm.stats["peak_concurrency"] = max(llm.stats["peak_concurrency"], llm.in_flight)
+        try:
+            failure = llm.failure()
+            if failure:
+                # Failures come back quickly, like the real API's
+                time.sleep(llm.delay(0) / 10)
+                with llm.lock:
+                    llm.stats[f"status:{failure[0]}"] += 1
+                return error(*failure)
+
+            result = llm.respond(body)
+            time.sleep(llm.delay(result["usage"]["output_tokens"]))
+            with llm.lock:
+                llm.stats["status:200"] += 1
+            return jsonify(result)
+        finally:
+            with llm.lock:
+                llm.in_flight -= 1
+
+    @app.route("/_fake/stats")
+    def fake_stats():
+        with llm.lock:
+            return jsonify(dict(llm.stats))
+
+    @app.route("/_fake/reset", methods=["POST"])
+    def fake_reset():
+        llm.reset()
+        return jsonify({"reset": True})
+
+    return app
+
+
+def serve_in_thread(llm: FakeLLM, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the fake LLM in a background thread.
+
+    Returns:
+        (server, base_url); call server.shutdown() to stop it
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server(host, port, create_app(llm), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+@contextmanager
+def use_fake_llm(base_url: str):
+    """Point the evaluator, analyzer and recommendations clients at a fake LLM."""
+    from .. import analyzer, evaluator, recommendations
+
+    modules = [evaluator, analyzer, recommendations]
+    original = [module.LLM_BASE_URL for module in modules]
+    for module in modules:
+        module.LLM_BASE_URL = base_url
+    try:
+        yield
+    finally:
+        for module, value in zip(modules, original):
+            module.LLM_BASE_URL = value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a local fake Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median latency per request")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal spread of the latency")
+    parser.add_argument("--output-tps", type=float, default=0.0,
+        help="Simulated generation speed in output tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500/529")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests getting 429")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="429 above this many in-flight requests")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds on 429s")
+    parser.add_argument("--seed", type=int, default=140)
+    args = parser.parse_args()
+
+    llm = FakeLLM(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        output_tokens_per_second=args.output_tps,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    print(f"Fake LLM: STUDENT_TRACKER_LLM_BASE_URL=http://{args.host}:{args.port}")
+    create_app(llm).run(host=args.host, port=args.port, threaded=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Import-time profiling (python -X importtime) for the CLI and its modules.
+
+Each measurement runs in a fresh interpreter, so it is what a cron-run
+command actually pays before doing any work.
+
+Usage:
+    python -m student_tracker.bench.importtime                    # student_tracker.cli
+    python -m student_tracker.bench.importtime student_tracker.evaluator --top 25
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Dependencies that only some commands need; importing the CLI shouldn't load them
+HEAVY_MODULES = ["anthropic", "requests", "googleapiclient", "flask"]
+
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [PACKAGE_PARENT, env.get("PYTHONPATH")] if p)
+    return env
+
+
+def import_profile(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Returns:
+        Dict with total_us (time spent importing the module, its parent
+        packages and dependencies) and modules, a list of
+        {name, self_us, cumulative_us, depth} in import order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules.append({
+                "name": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": len(match.group(3)) // 2
+            })
+
+    # Keep only the module's own import tree (its parent packages included),
+    # not what the interpreter imported at startup
+    root = module.split(".")[0]
+    start = next(i for i, m in enumerate(modules) if m["name"] == root)
+    while start > 0 and modules[start - 1]["depth"] > 0:
+        start -= 1
+    modules = modules[start:]
+
+    return {
+        "module": module,
+        "total_us": sum(m["self_us"] for m in modules),
+        "modules": modules
+    }
+
+
+def by_package(profile: dict) -> list[tuple[str, int]]:
+    """Self time summed per top-level package, slowest first."""
+    totals = {}
+    for m in profile["modules"]:
+        package = m["name"].split(".")[0]
+        totals[package] = totals.get(package, 0) + m["self_us"]
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def heavy_imports(profile: dict) -> list[str]:
+    """Top-level packages from HEAVY_MODULES that the import pulled in."""
+    loaded = {m["name"].split(".")[0] for m in profile["modules"]}
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def run_command(args: list[str]) -> subprocess.CompletedProcess:
+    """Run python -m student_tracker.cli with arguments in a fresh interpreter."""
+    return subprocess.run(
+        [sys.executable, "-m", "student_tracker.cli", *args],
+        capture_output=True, text=True, env=_env(), timeout=300
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show what importing a module costs")
+    parser.add_argument("modules", nargs="*", default=["student_tracker.cli"])
+    parser.add_argument("--top", type=int, default=15, help="Slowest packages to list")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        profile = import_profile(module)
+        print(f"\n{module}: {profile['total_us'] / 1000:.1f} ms")
+
+        for package, us in by_package(profile)[:args.top]:
+            print(f"  {us / 1000:>9.1f} ms  {package}")
+
+        heavy = heavy_imports(profile)
+        if heavy:
+            print(f"  loads: {', '.join(heavy)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+Benchmarks for the dashboard and pipeline hot paths.
+
+Each benchmark runs a real code path against the configured database (a
+synthetic course from synthetic.py) and is timed over several runs, with
+the number of SQL queries recorded for the first run. Results are plain
+JSON so runs can be compared against a stored baseline.
+"""
+
+import csv
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import event, func, select
+
+from ..models import engine
+
+# name -> {"func": function(context), "setup": optional function(context)}
+BENCHMARKS = {}
+
+# Median slowdown beyond this fraction of the baseline counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+
+def benchmark(name: str, setup: Optional[Callable] = None):
+    """
+    Register a benchmark function under a name.
+
+    setup, if given, runs untimed before every run (e.g. to reset state the
+    benchmark consumes).
+    """
+    def decorator(func: Callable):
+        BENCHMARKS[name] = {"func": func, "setup": setup}
+        return func
+    return decorator
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+@benchmark("get_class_overview")
+def bench_class_overview(ctx: dict):
+    from ..analyzer import get_class_overview
+    get_class_overview()
+
+
+@benchmark("identify_student_groups")
+def bench_student_groups(ctx: dict):
+    from ..analyzer import identify_student_groups
+    identify_student_groups()
+
+
+@benchmark("update_all_skill_assessments")
+def bench_update_skill_assessments(ctx: dict):
+    from ..analyzer import update_all_skill_assessments
+    update_all_skill_assessments()
+
+
+@benchmark("students_list")
+def bench_students_list(ctx: dict):
+    from ..dashboard import app
+    response = app.test_client().get("/students")
+    assert response.status_code == 200, response.status_code
+
+
+@benchmark("export_grades_csv")
+def bench_export_grades(ctx: dict):
+    from ..manual_input import export_grades_csv
+    export_grades_csv(os.path.join(ctx["workdir"], "grades.csv"))
+
+
+def _write_import_csv(ctx: dict):
+    """Write a submissions CSV (by name, one row per existing submission) on first use."""
+    if "import_csv" in ctx:
+        return
+    from ..models import Assignment, Student, Submission
+
+    query = select(Student.name, Assignment.name, Submission.id).join_from(
+        Submission, Student, Submission.student_id == Student.id
+    ).join(Assignment, Submission.assignment_id == Assignment.id).order_by(Submission.id)
+
+    ctx["import_csv"] = os.path.join(ctx["workdir"], "submissions.csv")
+    with engine.connect() as conn, open(ctx["import_csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student_name", "assignment_name", "content", "submitted_at", "status"])
+        for student_name, assignment_name, submission_id in conn.execute(query):
+            writer.writerow([student_name, assignment_name, f"Imported text {submission_id}",
+                             "2026-02-01T10:00:00", "submitted"])
+
+
+@benchmark("import_submissions_csv", setup=_write_import_csv)
+def bench_import_submissions(ctx: dict):
+    from ..manual_input import import_submissions_csv
+    assert import_submissions_csv(ctx["import_csv"]), "nothing was imported"
+
+
+def _write_submission_folder(ctx: dict):
+    """Write one .txt or .docx submission per student (named after them) on first use."""
+    if "submission_folder" in ctx:
+        return
+    import zipfile
+    from xml.sax.saxutils import escape
+    from ..models import Student
+
+    ctx["submission_folder"] = os.path.join(ctx["workdir"], "submissions")
+    os.makedirs(ctx["submission_folder"])
+    with engine.connect() as conn:
+        for i, name in enumerate(conn.scalars(select(Student.name))):
+            text = f"Submission from {name}. " * 200
+            path = os.path.join(ctx["submission_folder"], name)
+            if i % 2:
+                with open(f"{path}.txt", "w", encoding="utf-8") as f:
+                    f.write(text)
+            else:
+                with zipfile.ZipFile(f"{path}.docx", "w") as docx:
+                    docx.writestr("word/document.xml", (
+                        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                        f"<w:body><w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p></w:body></w:document>"
+                    ))
+
+
+@benchmark("ingest_submission_folder", setup=_write_submission_folder)
+def bench_ingest_submission_folder(ctx: dict):
+    from ..manual_input import bulk_import_text_files
+    assert bulk_import_text_files(ctx["submission_folder"], 1), "nothing was imported"
+
+
+@benchmark("sync_submissions_to_db")
+def bench_sync_submissions(ctx: dict):
+    from .. import canvas_fetcher
+    with replay_canvas_fixture(ctx["canvas_fixture"]):
+        canvas_fetcher.sync_submissions_to_db()
+
+
+def _fake_canvas_url(ctx: dict) -> str:
+    """Start the fake Canvas for this run on first use."""
+    if "canvas_url" not in ctx:
+        from .fake_canvas import FakeCanvas, serve_in_thread
+        ctx["canvas_server"], ctx["canvas_url"] = serve_in_thread(
+            FakeCanvas(ctx["canvas_fixture"], rate_limit=float("inf"))
+        )
+    return ctx["canvas_url"]
+
+
+@benchmark("sync_submissions_http")
+def bench_sync_submissions_http(ctx: dict):
+    from .. import canvas_fetcher
+    from .fake_canvas import use_fake_canvas
+    with use_fake_canvas(_fake_canvas_url(ctx)):
+        canvas_fetcher.sync_submissions_to_db()
+
+
+def _reset_publishable(ctx: dict):
+    """Put the publish benchmark's feedback items back into the approved state."""
+    from ..models import FeedbackQueue, FeedbackQueueStatus
+
+    table = FeedbackQueue.__table__
+    with engine.begin() as conn:
+        if "publish_ids" not in ctx:
+            ctx["publish_ids"] = [row.id for row in conn.execute(
+                table.select().with_only_columns(table.c.id).where(
+                    table.c.status.in_([FeedbackQueueStatus.APPROVED.value, FeedbackQueueStatus.EDITED.value])
+                ).order_by(table.c.id).limit(200)
+            )]
+        conn.execute(
+            table.update().where(table.c.id.in_(ctx["publish_ids"])).values(
+                status=FeedbackQueueStatus.APPROVED.value, published_at=None,
+                publish_started_at=None, publish_attempts=0, next_attempt_at=None, last_error=None
+            )
+        )
+
+
+@benchmark("publish_all_approved", setup=_reset_publishable)
+def bench_publish_all_approved(ctx: dict):
+    from ..feedback_queue import publish_all_approved
+    from .fake_canvas import use_fake_canvas
+    with use_fake_canvas(_fake_canvas_url(ctx)):
+        result = publish_all_approved()
+    assert result["failed"] == 0, result["errors"][:3]
+
+
+def _fake_llm_url(ctx: dict) -> str:
+    """Start the fake LLM for this run on first use (small fixed latency, no errors)."""
+    if "llm_url" not in ctx:
+        from .fake_llm import FakeLLM, serve_in_thread
+        ctx["llm_server"], ctx["llm_url"] = serve_in_thread(FakeLLM(latency_ms=20, latency_sigma=0.2))
+    return ctx["llm_url"]
+
+
+def _reset_evaluations(ctx: dict):
+    """Delete evaluations made by earlier runs so the same submissions are pending again."""
+    from ..models import Evaluation, refresh_needs_evaluation
+
+    table = Evaluation.__table__
+    with engine.begin() as conn:
+        if "max_evaluation_id" not in ctx:
+            ctx["max_evaluation_id"] = conn.execute(select(func.max(table.c.id))).scalar() or 0
+        created = table.c.id > ctx["max_evaluation_id"]
+        submission_ids = list(conn.execute(select(table.c.submission_id).where(created)).scalars())
+        conn.execute(table.delete().where(created))
+        refresh_needs_evaluation(conn, submission_ids)
+
+
+@benchmark("evaluate_all_pending", setup=_reset_evaluations)
+def bench_evaluate_all_pending(ctx: dict):
+    from ..evaluator import evaluate_all_pending
+    from .fake_llm import use_fake_llm
+    with use_fake_llm(_fake_llm_url(ctx)):
+        evaluations = evaluate_all_pending(limit=50)
+    assert evaluations, "nothing was evaluated"
+
+
+@benchmark("generate_class_recommendations")
+def bench_class_recommendations(ctx: dict):
+    from ..recommendations import generate_class_recommendations
+    from .fake_llm import use_fake_llm
+    with use_fake_llm(_fake_llm_url(ctx)):
+        result = generate_class_recommendations()
+    assert "error" not in result["class_recommendations"], result["class_recommendations"]
+
+
+def _reset_generated_feedback(ctx: dict):
+    """Delete feedback queued by earlier runs so the same submissions are eligible again."""
+    from ..models import FeedbackQueue
+
+    table = FeedbackQueue.__table__
+    with engine.begin() as conn:
+        if "max_feedback_id" not in ctx:
+            ctx["max_feedback_id"] = conn.execute(select(func.max(table.c.id))).scalar() or 0
+        conn.execute(table.delete().where(table.c.id > ctx["max_feedback_id"]))
+
+
+@benchmark("feedback_generate_batch", setup=_reset_generated_feedback)
+def bench_feedback_generate_batch(ctx: dict):
+    from ..dashboard import app
+    response = app.test_client().post("/api/feedback/generate-batch")
+    assert response.status_code == 302, response.status_code
+
+
+@benchmark("get_pending_feedback")
+def bench_pending_feedback(ctx: dict):
+    from ..feedback_queue import get_pending_feedback
+    get_pending_feedback(limit=50)
+
+
+@benchmark("import_cli")
+def bench_import_cli(ctx: dict):
+    from .importtime import heavy_imports, import_profile
+    heavy = heavy_imports(import_profile("student_tracker.cli"))
+    assert not heavy, f"importing the CLI loads {', '.join(heavy)}"
+
+
+@benchmark("cli_student_list")
+def bench_cli_student_list(ctx: dict):
+    from .importtime import run_command
+    result = run_command(["student", "list"])
+    assert result.returncode == 0, result.stderr[-1000:]
+
+
+@contextmanager
+def replay_canvas_fixture(fixture: dict):
+    """
+    Serve canvas_fetcher's fetch_* calls from a recorded fixture.
+
+    Measures the database side of sync without a network. For the HTTP side
+    run against the fake Canvas server instead.
+    """
+    from .. import canvas_fetcher
+
+    patched = {
+        "CANVAS_API_TOKEN": "bench",
+        "CANVAS_COURSE_ID": "1",
+        "fetch_students": lambda: fixture["users"],
+        "fetch_assignments": lambda: fixture["assignments"],
+        "fetch_all_submissions": lambda: fixture["submissions"],
+    }
+    original = {name: getattr(canvas_fetcher, name) for name in patched}
+    for name, value in patched.items():
+        setattr(canvas_fetcher, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(canvas_fetcher, name, value)
+
+
+# ============================================================================
+# Running and comparing
+# ============================================================================
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the engine inside the block."""
+    counter = {"queries": 0}
+
+    def on_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+@contextmanager
+def _quiet():
+    """Silence the pipelines' progress prints while timing."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        yield
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def run_benchmarks(ctx: dict, names: Optional[list[str]] = None, repeat: int = 3) -> dict:
+    """
+    Time the selected benchmarks.
+
+    Returns:
+        Dict of benchmark name -> {runs, median, min, queries} (seconds)
+    """
+    results = {}
+    for name in names or list(BENCHMARKS):
+        func, setup = BENCHMARKS[name]["func"], BENCHMARKS[name]["setup"]
+        runs = []
+        queries = None
+        for i in range(repeat):
+            if setup:
+                with _quiet():
+                    setup(ctx)
+            with count_queries() as counter, _quiet():
+                started = time.perf_counter()
+                func(ctx)
+                runs.append(time.perf_counter() - started)
+            if queries is None:
+                queries = counter["queries"]
+
+        results[name] = {
+            "runs": [round(r, 4) for r in runs],
+            "median": round(statistics.median(runs), 4),
+            "min": round(min(runs), 4),
+            "queries": queries
+        }
+        print(f"  {name:<32} median {results[name]['median']:>9.3f}s  "
+              f"min {results[name]['min']:>9.3f}s  {queries:>8} queries")
+    return results
+
+
+def environment_info() -> dict:
+    """Where the numbers came from."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine()
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Compare benchmark medians against a baseline results file.
+
+    Returns:
+        One row per benchmark with baseline, current, ratio and a status of
+        "regression", "improvement", "ok" or "new"
+    """
+    rows = []
+    baseline_benchmarks = baseline.get("benchmarks", {})
+    for name, current in results["benchmarks"].items():
+        before = baseline_benchmarks.get(name)
+        if not before:
+            rows.append({"name": name, "baseline": None, "current": current["median"],
+                         "ratio": None, "status": "new"})
+            continue
+
+        ratio = current["median"] / before["median"] if before["median"] else None
+        if ratio is None:
+            status = "ok"
+        elif ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "baseline": before["median"],
+            "current": current["median"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "status": status
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict]):
+    print(f"\n  {'benchmark':<32} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        baseline = f"{row['baseline']:.3f}s" if row["baseline"] is not None else "—"
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "—"
+        print(f"  {row['name']:<32} {baseline:>10} {row['current']:>9.3f}s {ratio:>7}  {row['status']}")
+
+
+def load_json(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(data: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
@@ -0,0 +1,324 @@
+"""
+Synthetic course data for benchmarks and load tests.
+
+Generates a realistic-looking course (students with a latent ability,
+weekly assignments, submissions with text content, one or more evaluations
+per submission with skill_ratings JSON, and a feedback queue) straight into
+the configured database with bulk inserts, plus the same data shaped like
+Canvas API responses for sync benchmarks and the fake Canvas server.
+
+Everything is deterministic for a given seed.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from ..models import (
+    Base, engine as default_engine, Student, Assignment, Submission, Evaluation,
+    FeedbackQueue, FeedbackQueueStatus, FeedbackType, EvaluationSource, SubmissionStatus
+)
+
+SKILLS = ["writing", "design", "research", "strategy", "critical_thinking"]
+SKILL_LEVELS = ["emerging", "developing", "proficient", "advanced"]
+
+ASSIGNMENT_KINDS = [
+    ("written", "Reflection", ["writing", "critical_thinking"]),
+    ("visual", "Poster Design", ["design", "critical_thinking"]),
+    ("research", "Research Dossier", ["research", "writing"]),
+    ("strategy", "Campaign Strategy", ["strategy", "writing"]),
+    ("written", "Copy Analysis", ["writing", "research"]),
+]
+
+FIRST_NAMES = [
+    "Aaliyah", "Ben", "Camila", "Darius", "Elena", "Farah", "Gabe", "Hana", "Isaac", "Jada",
+    "Kofi", "Lena", "Marco", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq",
+    "Uma", "Victor", "Wen", "Ximena", "Yusuf", "Zoe"
+]
+LAST_NAMES = [
+    "Adams", "Bautista", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hughes", "Ibrahim",
+    "Johnson", "Kim", "Lopez", "Mensah", "Nguyen", "Okafor", "Patel", "Rivera", "Singh",
+    "Thompson", "Walsh"
+]
+
+WORDS = (
+    "audience message brand campaign visual story headline layout color contrast "
+    "research source evidence persona strategy channel engagement narrative draft "
+    "revision clarity tone voice design typography image caption hook call action "
+    "insight data community platform video social media trust credibility feedback"
+).split()
+
+STRENGTHS = [
+    "Clear, specific headline", "Strong sense of audience", "Well-chosen sources",
+    "Consistent visual hierarchy", "Concrete examples", "Confident voice",
+    "Thoughtful use of color", "Tight structure"
+]
+IMPROVEMENTS = [
+    "Cite more primary sources", "Tighten the opening paragraph", "Increase contrast for legibility",
+    "Define the target audience", "Cut generic phrasing", "Support claims with data",
+    "Vary sentence length", "Align elements to a grid"
+]
+
+# Share of items per feedback queue status
+FEEDBACK_STATUS_WEIGHTS = [
+    (FeedbackQueueStatus.PENDING.value, 60),
+    (FeedbackQueueStatus.APPROVED.value, 15),
+    (FeedbackQueueStatus.EDITED.value, 5),
+    (FeedbackQueueStatus.PUBLISHED.value, 15),
+    (FeedbackQueueStatus.REJECTED.value, 5),
+]
+
+COURSE_START = datetime(2026, 1, 20, 9, 0)
+CHUNK_SIZE = 5000
+
+
+def _level_for(fraction: float) -> str:
+    if fraction >= 0.9:
+        return "advanced"
+    if fraction >= 0.78:
+        return "proficient"
+    if fraction >= 0.65:
+        return "developing"
+    return "emerging"
+
+
+def _text(rnd: random.Random, min_words: int, max_words: int) -> str:
+    words = [rnd.choice(WORDS) for _ in range(rnd.randint(min_words, max_words))]
+    sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+    return " ".join(sentences)
+
+
+def generate_dataset(
+    students: int = 200,
+    assignments: int = 10,
+    evaluations_per_submission: int = 2,
+    pending_rate: float = 0.1,
+    missing_rate: float = 0.05,
+    feedback_rate: float = 0.1,
+    seed: int = 140,
+    engine=None
+) -> dict:
+    """
+    Fill an empty database with a synthetic course.
+
+    Args:
+        students: Number of students
+        assignments: Number of assignments (one submission per student each)
+        evaluations_per_submission: Maximum evaluations per submission; earlier
+            ones are archived and the last is final
+        pending_rate: Share of submissions with content but no evaluation yet
+        missing_rate: Share of submissions with no content
+        feedback_rate: Share of evaluated submissions with a feedback queue item
+        seed: Random seed (same seed, same data)
+        engine: SQLAlchemy engine (defaults to the configured database)
+
+    Returns:
+        Summary dict with row counts per table
+    """
+    engine = engine or default_engine
+    rnd = random.Random(seed)
+    Base.metadata.create_all(engine)
+
+    counts = {"students": 0, "assignments": 0, "submissions": 0, "evaluations": 0, "feedback_queue": 0}
+    buffers = {Submission: [], Evaluation: [], FeedbackQueue: []}
+
+    with engine.begin() as conn:
+        # Bulk-load speedups; only affects this connection
+        conn.exec_driver_sql("PRAGMA synchronous = OFF")
+
+        def flush_all():
+            # Parents before children
+            for model in (Submission, Evaluation, FeedbackQueue):
+                if buffers[model]:
+                    conn.execute(insert(model.__table__), buffers[model])
+                    buffers[model].clear()
+
+        # Students, each with a latent ability that drives their scores
+        student_rows = []
+        abilities = {}
+        for i in range(1, students + 1):
+            first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+            student_rows.append({
+                "id": i,
+                "canvas_id": str(100000 + i),
+                "name": f"{first} {last} {i}",
+                "email": f"{first.lower()}.{last.lower()}{i}@montclair.edu",
+                "created_at": COURSE_START,
+                "updated_at": COURSE_START
+            })
+            abilities[i] = min(max(rnd.gauss(0.8, 0.1), 0.3), 1.0)
+        conn.execute(insert(Student.__table__), student_rows)
+        counts["students"] = students
+
+        # Weekly assignments cycling through the assignment kinds
+        assignment_rows = []
+        for j in range(1, assignments + 1):
+            kind, title, skills = ASSIGNMENT_KINDS[(j - 1) % len(ASSIGNMENT_KINDS)]
+            assignment_rows.append({
+                "id": j,
+                "canvas_id": str(500000 + j),
+                "name": f"{title} {(j - 1) // len(ASSIGNMENT_KINDS) + 1}",
+                "description": _text(rnd, 20, 40),
+                "points_possible": rnd.choice([10, 25, 25, 50, 100]),
+                "due_date": COURSE_START + timedelta(days=7 * j),
+                "assignment_type": kind,
+                "skills_assessed": skills,
+                "created_at": COURSE_START,
+                "updated_at": COURSE_START
+            })
+        conn.execute(insert(Assignment.__table__), assignment_rows)
+        counts["assignments"] = assignments
+
+        submission_id = 0
+        evaluation_id = 0
+        feedback_id = 0
+        for student_id in range(1, students + 1):
+            ability = abilities[student_id]
+            for a in assignment_rows:
+                submission_id += 1
+                roll = rnd.random()
+                missing = roll < missing_rate
+                pending = not missing and roll < missing_rate + pending_rate
+                late = not missing and rnd.random() < 0.12
+
+                if missing:
+                    status, submitted_at, content = SubmissionStatus.MISSING.value, None, None
+                else:
+                    status = SubmissionStatus.LATE.value if late else SubmissionStatus.SUBMITTED.value
+                    offset = timedelta(hours=rnd.randint(1, 48)) if late else -timedelta(hours=rnd.randint(1, 96))
+                    submitted_at = a["due_date"] + offset
+                    content = _text(rnd, 40, 160)
+
+                buffers[Submission].append({
+                    "id": submission_id,
+                    "student_id": student_id,
+                    "assignment_id": a["id"],
+                    "canvas_submission_id": str(9000000 + submission_id),
+                    "content": content,
+                    "submitted_at": submitted_at,
+                    "status": status,
+                    "input_source": "canvas",
+                    "needs_evaluation": pending,
+                    "created_at": submitted_at or a["due_date"],
+                    "updated_at": submitted_at or a["due_date"]
+                })
+
+                if missing or pending:
+                    continue
+
+                # Archived re-evaluations followed by the final one
+                n_evals = rnd.randint(1, max(evaluations_per_submission, 1))
+                points = a["points_possible"]
+                for k in range(n_evals):
+                    evaluation_id += 1
+                    fraction = min(max(ability + rnd.gauss(0, 0.08), 0.0), 1.0)
+                    score = round(fraction * points, 1)
+                    skill_ratings = {
+                        skill: _level_for(min(max(fraction + rnd.gauss(0, 0.05), 0.0), 1.0))
+                        for skill in a["skills_assessed"]
+                    }
+                    skill_ratings["_ai_likelihood"] = {"score": rnd.randint(0, 40), "signals": [], "note": None}
+                    evaluated_at = submitted_at + timedelta(days=1, hours=k)
+                    buffers[Evaluation].append({
+                        "id": evaluation_id,
+                        "submission_id": submission_id,
+                        "source": EvaluationSource.HAIKU_AUTO.value,
+                        "score": score,
+                        "feedback": _text(rnd, 15, 40),
+                        "strengths": rnd.sample(STRENGTHS, 2),
+                        "areas_for_improvement": rnd.sample(IMPROVEMENTS, 2),
+                        "skill_ratings": skill_ratings,
+                        "haiku_model_version": "synthetic",
+                        "is_final": k == n_evals - 1,
+                        "created_at": evaluated_at,
+                        "updated_at": evaluated_at
+                    })
+
+                if rnd.random() < feedback_rate:
+                    feedback_id += 1
+                    fb_status = rnd.choices(
+                        [s for s, _ in FEEDBACK_STATUS_WEIGHTS],
+                        weights=[w for _, w in FEEDBACK_STATUS_WEIGHTS]
+                    )[0]
+                    content = _text(rnd, 30, 80)
+                    buffers[FeedbackQueue].append({
+                        "id": feedback_id,
+                        "feedback_type": FeedbackType.SUBMISSION_COMMENT.value,
+                        "student_id": student_id,
+                        "submission_id": submission_id,
+                        "content": content,
+                        "original_content": content,
+                        "status": fb_status,
+                        "generated_by": "haiku",
+                        "created_at": evaluated_at,
+                        "updated_at": evaluated_at
+                    })
+
+            if len(buffers[Submission]) >= CHUNK_SIZE or len(buffers[Evaluation]) >= CHUNK_SIZE:
+                flush_all()
+
+        flush_all()
+
+    counts["submissions"] = submission_id
+    counts["evaluations"] = evaluation_id
+    counts["feedback_queue"] = feedback_id
+    return counts
+
+
+def build_canvas_fixture(engine=None) -> dict:
+    """
+    Export the database as Canvas API payloads.
+
+    Returns:
+        Dict with "users", "assignments" and "submissions" lists shaped like
+        the Canvas responses canvas_fetcher reads
+    """
+    engine = engine or default_engine
+    students = Student.__table__
+    assignments = Assignment.__table__
+    submissions = Submission.__table__
+
+    def iso(value):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+    with engine.connect() as conn:
+        users = [{
+            "id": int(row.canvas_id),
+            "name": row.name,
+            "sortable_name": ", ".join(reversed(row.name.split(" ", 1))),
+            "email": row.email
+        } for row in conn.execute(students.select().order_by(students.c.id))]
+
+        assignment_rows = conn.execute(assignments.select().order_by(assignments.c.id)).all()
+        canvas_assignments = [{
+            "id": int(row.canvas_id),
+            "name": row.name,
+            "description": row.description,
+            "points_possible": row.points_possible,
+            "due_at": iso(row.due_date)
+        } for row in assignment_rows]
+
+        student_canvas_ids = {row.id: row.canvas_id for row in conn.execute(
+            students.select().with_only_columns(students.c.id, students.c.canvas_id)
+        )}
+        assignment_canvas_ids = {row.id: row.canvas_id for row in assignment_rows}
+
+        canvas_submissions = []
+        for row in conn.execute(submissions.select().order_by(submissions.c.id)):
+            has_content = bool(row.content)
+            canvas_submissions.append({
+                "id": int(row.canvas_submission_id) if row.canvas_submission_id else row.id,
+                "user_id": int(student_canvas_ids[row.student_id]),
+                "assignment_id": int(assignment_canvas_ids[row.assignment_id]),
+                "workflow_state": "submitted" if has_content else "unsubmitted",
+                "submitted_at": iso(row.submitted_at),
+                "late": row.status == SubmissionStatus.LATE.value,
+                "submission_type": "online_text_entry" if has_content else None,
+                "body": row.content,
+                "score": row.canvas_score,
+                "grade": row.canvas_grade,
+                "submission_comments": []
+            })
+
+    return {"users": users, "assignments": canvas_assignments, "submissions": canvas_submissions}
@@ -9,19 +9,30 @@ Extends the existing canvas_sync.py functionality to pull:
 """
 
 import os
-import requests
+import random
+import re
+import time
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional
+from . import metrics
 from .models import (
     get_session, Student, Assignment, Submission,
     SubmissionStatus
 )
 
+if TYPE_CHECKING:
+    import requests
+
 # Configuration
 CANVAS_BASE_URL = os.environ.get("CANVAS_BASE_URL", "https://montclair.instructure.com")
 CANVAS_API_TOKEN = os.environ.get("CANVAS_API_TOKEN", "")
 CANVAS_COURSE_ID = os.environ.get("CANVAS_COURSE_ID", "")
 
+# Retries for requests Canvas throttles, and the first backoff in seconds
+# (doubled per retry)
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 0.5
+
 
 def get_headers():
     """Get authorization headers for Canvas API."""
@@ -31,13 +42,46 @@ def get_headers():
     }
 
 
+def _rate_limited(response: "requests.Response") -> bool:
+    """Canvas throttles with a 403 whose body says "Rate Limit Exceeded"."""
+    return response.status_code == 403 and "Rate Limit Exceeded" in response.text
+
+
+def _request(method: str, url: str, endpoint: str, **kwargs) -> "requests.Response":
+    """
+    Send a Canvas API request, recording count and latency metrics.
+
+    Throttled requests are retried up to RATE_LIMIT_RETRIES times with
+    jittered exponential backoff.
+    """
+    import requests  # loaded on first request so commands that never call Canvas skip it
+
+    # Collapse IDs so metrics have one series per endpoint, not per object
+    endpoint_label = re.sub(r"/\d+", "/:id", endpoint.split("?")[0])
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        status = "error"
+        started = time.perf_counter()
+        try:
+            response = requests.request(method, url, headers=get_headers(), **kwargs)
+            status = str(response.status_code)
+        finally:
+            metrics.CANVAS_REQUESTS.labels(endpoint=endpoint_label, method=method, status=status).inc()
+            metrics.CANVAS_LATENCY.labels(endpoint=endpoint_label, method=method).observe(
+                time.perf_counter() - started
+            )
+
+        if attempt == RATE_LIMIT_RETRIES or not _rate_limited(response):
+            return response
+        time.sleep(RATE_LIMIT_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.0))
+
+
 def api_get(endpoint: str, params: dict = None) -> dict:
     """Make a GET request to Canvas API with pagination support."""
     url = f"{CANVAS_BASE_URL}/api/v1{endpoint}"
     all_results = []
 
     while url:
-        response = requests.get(url, headers=get_headers(), params=params)
+        response = _request("GET", url, endpoint, params=params)
         response.raise_for_status()
 
         data = response.json()
@@ -167,6 +211,9 @@ def sync_students_to_db() -> int:
     session.commit()
     session.close()
 
+    metrics.SYNC_ROWS.labels(entity="students", action="created").inc(synced_count)
+    metrics.SYNC_ROWS.labels(entity="students", action="updated").inc(len(students_data) - synced_count)
+
     print(f"Synced {synced_count} new students ({len(students_data)} total)")
     return synced_count
 
@@ -234,17 +281,31 @@ def sync_assignments_to_db() -> int:
     session.commit()
     session.close()
 
+    metrics.SYNC_ROWS.labels(entity="assignments", action="created").inc(synced_count)
+    metrics.SYNC_ROWS.labels(entity="assignments", action="updated").inc(len(assignments_data) - synced_count)
+
     print(f"Synced {synced_count} new assignments ({len(assignments_data)} total)")
     return synced_count
 
 
-def sync_submissions_to_db(assignment_id: Optional[int] = None) -> int:
-    """Sync Canvas submissions to local database."""
+def sync_submissions_to_db(
+    assignment_id: Optional[int] = None,
+    progress_callback: Optional[Callable[[dict], None]] = None
+) -> int:
+    """
+    Sync Canvas submissions to local database.
+
+    Args:
+        assignment_id: Optional local assignment ID to sync only that assignment
+        progress_callback: Optional callable receiving one event dict per
+            Canvas submission processed (see progress.py)
+    """
     if not check_configuration():
         return 0
 
     session = get_session()
     synced_count = 0
+    skipped_count = 0
 
     if assignment_id:
         # Fetch for specific assignment
@@ -258,6 +319,9 @@ def sync_submissions_to_db(assignment_id: Optional[int] = None) -> int:
         # Fetch all submissions
         submissions_data = fetch_all_submissions()
 
+    if progress_callback:
+        progress_callback({"type": "start", "total": len(submissions_data)})
+
     for s in submissions_data:
         canvas_submission_id = str(s.get("id"))
         canvas_user_id = str(s.get("user_id"))
@@ -268,7 +332,15 @@ def sync_submissions_to_db(assignment_id: Optional[int] = None) -> int:
         assignment = session.query(Assignment).filter_by(canvas_id=canvas_assignment_id).first()
 
         if not student or not assignment:
-            continue  # Skip if student/assignment not synced yet
+            # Skip if student/assignment not synced yet
+            skipped_count += 1
+            if progress_callback:
+                progress_callback({
+                    "type": "item",
+                    "status": "skipped",
+                    "canvas_submission_id": canvas_submission_id
+                })
+            continue
 
         # Determine submission status
         workflow_state = s.get("workflow_state", "")
@@ -325,6 +397,7 @@ def sync_submissions_to_db(assignment_id: Optional[int] = None) -> int:
             assignment_id=assignment.id
         ).first()
 
+        created = submission is None
         if submission:
             # Update existing
             submission.canvas_submission_id = canvas_submission_id
@@ -352,24 +425,51 @@ def sync_submissions_to_db(assignment_id: Optional[int] = None) -> int:
             session.add(submission)
             synced_count += 1
 
+        if progress_callback:
+            progress_callback({
+                "type": "item",
+                "status": "created" if created else "updated",
+                "canvas_submission_id": canvas_submission_id,
+                "student_name": student.name,
+                "assignment_name": assignment.name
+            })
+
     session.commit()
     session.close()
 
+    metrics.SYNC_ROWS.labels(entity="submissions", action="created").inc(synced_count)
+    metrics.SYNC_ROWS.labels(entity="submissions", action="updated").inc(
+        len(submissions_data) - synced_count - skipped_count
+    )
+    metrics.SYNC_ROWS.labels(entity="submissions", action="skipped").inc(skipped_count)
+
     print(f"Synced {synced_count} new submissions ({len(submissions_data)} total)")
     return synced_count
 
 
-def full_sync() -> dict:
-    """Perform a full sync of students, assignments, and submissions."""
+def full_sync(progress_callback: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Perform a full sync of students, assignments, and submissions.
+
+    Args:
+        progress_callback: Optional callable receiving stage and per-submission
+            progress events (see progress.py)
+    """
     print("=" * 50)
     print("Starting full Canvas sync...")
     print("=" * 50)
 
-    results = {
-        "students": sync_students_to_db(),
-        "assignments": sync_assignments_to_db(),
-        "submissions": sync_submissions_to_db()
-    }
+    def stage(name: str, message: str):
+        if progress_callback:
+            progress_callback({"type": "stage", "stage": name, "message": message})
+
+    results = {}
+    stage("students", "Syncing student roster")
+    results["students"] = sync_students_to_db()
+    stage("assignments", f"{results['students']} new students. Syncing assignments")
+    results["assignments"] = sync_assignments_to_db()
+    stage("submissions", f"{results['assignments']} new assignments. Syncing submissions")
+    results["submissions"] = sync_submissions_to_db(progress_callback=progress_callback)
 
     print("=" * 50)
     print("Sync complete!")
@@ -388,7 +488,7 @@ def full_sync() -> dict:
 def api_post(endpoint: str, data: dict = None) -> dict:
     """Make a POST request to Canvas API."""
     url = f"{CANVAS_BASE_URL}/api/v1{endpoint}"
-    response = requests.post(url, headers=get_headers(), json=data)
+    response = _request("POST", url, endpoint, json=data)
     response.raise_for_status()
     return response.json()
 
@@ -396,7 +496,7 @@ def api_post(endpoint: str, data: dict = None) -> dict:
 def api_put(endpoint: str, data: dict = None) -> dict:
     """Make a PUT request to Canvas API."""
     url = f"{CANVAS_BASE_URL}/api/v1{endpoint}"
-    response = requests.put(url, headers=get_headers(), json=data)
+    response = _request("PUT", url, endpoint, json=data)
     response.raise_for_status()
     return response.json()
 
@@ -427,6 +527,32 @@ def post_submission_comment(
     return result
 
 
+def fetch_submission_comments(assignment_canvas_id: str, student_canvas_id: str) -> dict:
+    """Fetch a student's submission with its comments (submission_comments)."""
+    if not check_configuration():
+        return {"error": "Canvas not configured"}
+
+    return api_get(
+        f"/courses/{CANVAS_COURSE_ID}/assignments/{assignment_canvas_id}/submissions/{student_canvas_id}",
+        params={"include[]": "submission_comments"}
+    )
+
+
+def find_discussion_topic(title: str, message: str, is_announcement: bool = False) -> Optional[dict]:
+    """Find an existing discussion topic (or announcement) with this title and message."""
+    if not check_configuration():
+        return None
+
+    topics = api_get(
+        f"/courses/{CANVAS_COURSE_ID}/discussion_topics",
+        params={"per_page": 100, "only_announcements": "true" if is_announcement else "false"}
+    )
+    for topic in topics:
+        if topic.get("title") == title and (topic.get("message") or "").strip() == message.strip():
+            return topic
+    return None
+
+
 def create_discussion_topic(
     title: str,
     message: str,
@@ -14,34 +14,26 @@ Commands:
     import        Import data from files
     student       Student management commands
     analyze       Run analysis and generate insights
+    publish       Publish approved feedback to Canvas
 """
 
 import argparse
 import sys
 import os
+import time
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from student_tracker.models import init_db, get_session, Student, Assignment, Submission
-from student_tracker.canvas_fetcher import full_sync as canvas_sync
-from student_tracker.evaluator import evaluate_submission, evaluate_all_pending
-from student_tracker.manual_input import (
-    add_student, list_students, import_students_csv,
-    add_submission, import_submissions_csv,
-    add_manual_evaluation, export_grades_csv, export_student_report
-)
-from student_tracker.analyzer import (
-    get_student_summary, get_class_overview, identify_student_groups,
-    generate_student_insights, generate_class_insights, create_progress_snapshot
-)
-from student_tracker.recommendations import (
-    generate_student_recommendations, generate_class_recommendations
-)
+# Each command imports what it needs when it runs: anthropic, requests and
+# SQLAlchemy are slow to import, and cron-run commands shouldn't pay for the
+# ones they never use.
 
 
 def cmd_init(args):
     """Initialize the database."""
+    from student_tracker.models import init_db
+
     print("Initializing database...")
     init_db()
     print("Database initialized successfully.")
@@ -49,6 +41,8 @@ def cmd_init(args):
 
 def cmd_sync(args):
     """Sync data from Canvas."""
+    from student_tracker.canvas_fetcher import full_sync as canvas_sync
+
     print("Syncing from Canvas...")
     results = canvas_sync()
     print(f"\nSync complete:")
@@ -59,6 +53,8 @@ def cmd_sync(args):
 
 def cmd_evaluate(args):
     """Run evaluations on submissions."""
+    from student_tracker.evaluator import evaluate_submission, evaluate_all_pending
+
     if args.submission_id:
         print(f"Evaluating submission {args.submission_id}...")
         result = evaluate_submission(args.submission_id, force=args.force)
@@ -77,16 +73,26 @@ def cmd_evaluate(args):
 
 def cmd_dashboard(args):
     """Start the web dashboard."""
+    if args.profile:
+        from student_tracker import perf
+        perf.enable()
+
     from student_tracker.dashboard import run_dashboard
     run_dashboard(
         host=args.host,
         port=args.port,
-        debug=args.debug
+        debug=args.debug,
+        production=args.production,
+        workers=args.workers,
+        threads=args.threads,
+        timeout=args.timeout
     )
 
 
 def cmd_export(args):
     """Export data."""
+    from student_tracker.manual_input import export_grades_csv, export_student_report
+
     if args.type == "grades":
         filepath = args.output or "grades.csv"
         export_grades_csv(filepath)
@@ -102,17 +108,68 @@ def cmd_export(args):
 
 def cmd_import(args):
     """Import data from files."""
+    from student_tracker.manual_input import (
+        import_students_csv, import_submissions_csv, import_assignments_json, bulk_import_text_files
+    )
+
+    resume = not args.restart
     if args.type == "students":
         count = import_students_csv(args.file)
         print(f"Imported {count} students.")
     elif args.type == "submissions":
-        count = import_submissions_csv(args.file)
+        count = import_submissions_csv(args.file, batch_size=args.batch_size, resume=resume, fuzzy=args.fuzzy)
         print(f"Imported {count} submissions.")
+    elif args.type == "assignments":
+        count = import_assignments_json(args.file, batch_size=args.batch_size, resume=resume)
+        print(f"Imported {count} assignments.")
+    elif args.type == "folder":
+        if not args.assignment_id:
+            print("Error: --assignment-id required for folder import")
+            return
+        count = bulk_import_text_files(
+            args.file, args.assignment_id, filename_pattern=args.pattern, workers=args.workers, fuzzy=args.fuzzy
+        )
+        print(f"Imported {count} submissions.")
+
+
+def cmd_publish(args):
+    """Publish approved feedback to Canvas."""
+    from student_tracker import feedback_queue
+
+    if args.worker:
+        import signal
+        import threading
+
+        stop = threading.Event()
+        # systemd stops the service with SIGTERM; finish in-flight posts first
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            feedback_queue.run_publisher(concurrency=args.concurrency, poll_seconds=args.poll, stop=stop)
+        except KeyboardInterrupt:
+            pass
+    elif args.failed:
+        failed = feedback_queue.get_failed_feedback()
+        if not failed:
+            print("No failed feedback.")
+        for item in failed:
+            target = item["student_name"] or item["title"] or item["type"]
+            print(f"#{item['id']} {target}: {len(item['attempts'])} attempts, last error: {item['last_error']}")
+            for attempt in item["attempts"]:
+                print(f"    {attempt['attempt']}  {attempt['started_at'][:19]}  {attempt['error'] or 'ok'}")
+    elif args.retry_failed:
+        feedback_queue.retry_failed()
+    else:
+        results = feedback_queue.publish_all_approved()
+        print(f"Published {results['success']} ({results['reconciled']} already on Canvas), "
+              f"{results['failed']} failed, {results['skipped']} skipped")
+        for error in results["errors"]:
+            print(f"  #{error['id']}: {error['error']}")
 
 
 def cmd_student(args):
     """Student management commands."""
     if args.action == "list":
+        from student_tracker.manual_input import list_students
         students = list_students(args.search)
         print(f"\n{'ID':<6} {'Name':<30} {'Email':<30} {'Submissions':<12}")
         print("-" * 80)
@@ -121,10 +178,12 @@ def cmd_student(args):
         print(f"\nTotal: {len(students)} students")
 
     elif args.action == "add":
+        from student_tracker.manual_input import add_student
         student = add_student(args.name, args.email)
         print(f"Added student: {student.name} (ID: {student.id})")
 
     elif args.action == "summary":
+        from student_tracker.analyzer import get_student_summary
         if not args.student_id:
             print("Error: --student-id required")
             return
@@ -144,11 +203,12 @@ def cmd_student(args):
                 print(f"  {skill}: {level}")
 
     elif args.action == "insights":
+        from student_tracker.analyzer import generate_student_insights
         if not args.student_id:
             print("Error: --student-id required")
             return
         print("Generating insights...")
-        insights = generate_student_insights(args.student_id)
+        insights = generate_student_insights(args.student_id, refresh=args.refresh)
         if "error" in insights:
             print(f"Error: {insights['error']}")
             return
@@ -167,6 +227,7 @@ def cmd_student(args):
                 print(f"  - {concern}")
 
     elif args.action == "recommendations":
+        from student_tracker.recommendations import generate_student_recommendations
         if not args.student_id:
             print("Error: --student-id required")
             return
@@ -190,6 +251,7 @@ def cmd_student(args):
 def cmd_analyze(args):
     """Run analysis and generate insights."""
     if args.type == "overview":
+        from student_tracker.analyzer import get_class_overview
         overview = get_class_overview()
         print("\n=== Class overview ===")
         print(f"Students: {overview['summary']['total_students']}")
@@ -201,6 +263,7 @@ def cmd_analyze(args):
             print(f"  {grade}: {count}")
 
     elif args.type == "groups":
+        from student_tracker.analyzer import identify_student_groups
         groups = identify_student_groups()
         print("\n=== Student groups ===")
         for group, students in groups.items():
@@ -211,8 +274,9 @@ def cmd_analyze(args):
                 print(f"  ... and {len(students) - 5} more")
 
     elif args.type == "insights":
+        from student_tracker.analyzer import generate_class_insights
         print("Generating class insights...")
-        insights = generate_class_insights()
+        insights = generate_class_insights(refresh=args.refresh)
         if "error" in insights:
             print(f"Error: {insights['error']}")
             return
@@ -229,6 +293,7 @@ def cmd_analyze(args):
                 print(f"  {i}. {intervention}")
 
     elif args.type == "recommendations":
+        from student_tracker.recommendations import generate_class_recommendations
         print("Generating class recommendations...")
         recs = generate_class_recommendations()
 
@@ -248,10 +313,21 @@ def cmd_analyze(args):
             for adj in class_recs['teaching_adjustments']:
                 print(f"  - {adj}")
 
+    elif args.type == "skills":
+        from student_tracker.analyzer import rebuild_skill_history, update_all_skill_assessments
+        update_all_skill_assessments()
+        if args.rebuild_history:
+            rebuild_skill_history()
+
     elif args.type == "snapshot":
+        from student_tracker.analyzer import create_progress_snapshot
         print("Creating progress snapshot...")
-        snapshot = create_progress_snapshot()
-        print(f"Snapshot created at {snapshot.snapshot_date}")
+        snapshot = create_progress_snapshot(
+            include_insights=not args.no_insights,
+            min_age_hours=args.min_hours
+        )
+        if snapshot:
+            print(f"Snapshot created at {snapshot.snapshot_date}")
 
 
 def main():
@@ -259,6 +335,9 @@ def main():
         description="STCM140 Student Tracking System",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
+    parser.add_argument("--metrics-dir", default=os.environ.get("STUDENT_TRACKER_METRICS_DIR"),
+        help="Write student_tracker_<command>.prom here for node_exporter's textfile collector "
+             "(default: $STUDENT_TRACKER_METRICS_DIR)")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Init command
@@ -279,6 +358,13 @@ def main():
     dash_parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     dash_parser.add_argument("--port", type=int, default=5000, help="Port to run on")
     dash_parser.add_argument("--debug", action="store_true", help="Run in debug mode")
+    dash_parser.add_argument("--production", action="store_true",
+        help="Serve with gunicorn (waitress on Windows) instead of the Flask dev server")
+    dash_parser.add_argument("--workers", type=int, default=2, help="Worker processes (production mode)")
+    dash_parser.add_argument("--threads", type=int, default=8, help="Threads per worker (production mode)")
+    dash_parser.add_argument("--timeout", type=int, default=120, help="Worker timeout in seconds (production mode)")
+    dash_parser.add_argument("--profile", action="store_true",
+        help="Record per-request query counts and timings (see /debug/perf)")
 
     # Export command
     export_parser = subparsers.add_parser("export", help="Export data")
@@ -288,8 +374,19 @@ def main():
 
     # Import command
     import_parser = subparsers.add_parser("import", help="Import data from files")
-    import_parser.add_argument("type", choices=["students", "submissions"], help="Import type")
-    import_parser.add_argument("file", help="File to import")
+    import_parser.add_argument("type", choices=["students", "submissions", "assignments", "folder"], help="Import type")
+    import_parser.add_argument("file",
+        help="File to import (CSV; JSON or NDJSON for assignments and submissions), or a folder of submission files")
+    import_parser.add_argument("--batch-size", type=int,
+        help="Rows per commit for submissions/assignments (default STUDENT_TRACKER_IMPORT_BATCH_SIZE)")
+    import_parser.add_argument("--restart", action="store_true",
+        help="Ignore the checkpoint of an interrupted import and start from the top")
+    import_parser.add_argument("--fuzzy", action="store_true",
+        help="Also match student/assignment names by closest spelling (for submissions and folder; every match is listed)")
+    import_parser.add_argument("--assignment-id", type=int, help="Assignment the files belong to (for folder)")
+    import_parser.add_argument("--pattern", default="{student_name}",
+        help='File name layout (for folder), e.g. "{student_name} - {title}"')
+    import_parser.add_argument("--workers", type=int, help="Text extraction processes (for folder; default: one per CPU)")
 
     # Student command
     student_parser = subparsers.add_parser("student", help="Student management")
@@ -300,12 +397,33 @@ def main():
     student_parser.add_argument("--email", help="Student email (for add)")
     student_parser.add_argument("--student-id", type=int, help="Student ID")
     student_parser.add_argument("--search", help="Search term (for list)")
+    student_parser.add_argument("--refresh", action="store_true",
+        help="With insights: regenerate even if cached insights are current")
 
     # Analyze command
     analyze_parser = subparsers.add_parser("analyze", help="Run analysis")
     analyze_parser.add_argument("type",
-        choices=["overview", "groups", "insights", "recommendations", "snapshot"],
+        choices=["overview", "groups", "insights", "recommendations", "skills", "snapshot"],
         help="Analysis type")
+    analyze_parser.add_argument("--rebuild-history", action="store_true",
+        help="With skills: rebuild the skill history from evaluations")
+    analyze_parser.add_argument("--refresh", action="store_true",
+        help="With insights: regenerate even if cached insights are current")
+    analyze_parser.add_argument("--no-insights", action="store_true",
+        help="With snapshot: skip the LLM insights (for scheduled runs)")
+    analyze_parser.add_argument("--min-hours", type=float,
+        help="With snapshot: skip if the latest snapshot is newer than this")
+
+    # Publish command
+    publish_parser = subparsers.add_parser("publish", help="Publish approved feedback to Canvas")
+    publish_parser.add_argument("--worker", action="store_true",
+        help="Run the long-running publisher that drains approved feedback as it arrives")
+    publish_parser.add_argument("--concurrency", type=int, help="Canvas posts in flight (worker)")
+    publish_parser.add_argument("--poll", type=float, help="Seconds between checks when idle (worker)")
+    publish_parser.add_argument("--failed", action="store_true",
+        help="List feedback the publisher gave up on, with its attempts")
+    publish_parser.add_argument("--retry-failed", action="store_true",
+        help="Put failed feedback back in the outbox")
 
     args = parser.parse_args()
 
@@ -322,13 +440,32 @@ def main():
         "export": cmd_export,
         "import": cmd_import,
         "student": cmd_student,
-        "analyze": cmd_analyze
+        "analyze": cmd_analyze,
+        "publish": cmd_publish
     }
 
-    if args.command in commands:
-        commands[args.command](args)
-    else:
+    if args.command not in commands:
         parser.print_help()
+        return
+
+    # The dashboard serves /metrics itself; the publisher worker never finishes
+    if not args.metrics_dir or args.command == "dashboard" or getattr(args, "worker", False):
+        commands[args.command](args)
+        return
+
+    from student_tracker import feedback_queue, metrics  # feedback_queue registers the queue-depth gauge
+
+    started = time.time()
+    success = False
+    try:
+        commands[args.command](args)
+        success = True
+    finally:
+        metrics.record_run(started, success)
+        metrics.REGISTRY.write_textfile(
+            os.path.join(args.metrics_dir, f"student_tracker_{args.command}.prom"),
+            extra_labels={"command": args.command}
+        )
 
 
 if __name__ == "__main__":
@@ -10,20 +10,25 @@ Provides:
 """
 
 import os
+import gzip
 from datetime import datetime
-from flask import Flask, render_template_string, jsonify, request, redirect, url_for
+from typing import Iterator
+from flask import Flask, Response, render_template_string, jsonify, request, redirect, url_for
 from .models import (
-    get_session, init_db, Student, Assignment, Submission,
-    Evaluation, StudentNote, SkillAssessment
+    engine, Session, get_session, init_db, Student, Assignment, Submission,
+    StudentNote, SkillAssessment
 )
 from .analyzer import (
-    get_student_summary, get_student_progression,
-    get_student_strengths_weaknesses, get_class_overview,
+    AnalyticsContext,
+    get_student_summary, get_student_profile, get_class_overview,
     identify_student_groups, generate_student_insights,
     generate_class_insights, create_progress_snapshot,
-    get_progress_history
+    get_progress_history, get_skill_history, get_skill_deltas
+)
+from .evaluator import (
+    evaluate_submission, evaluate_all_pending,
+    get_pending_evaluations, count_pending_evaluations
 )
-from .evaluator import evaluate_submission, evaluate_all_pending
 from .canvas_fetcher import full_sync as canvas_full_sync
 from .manual_input import (
     add_student, add_manual_evaluation, add_student_note,
@@ -31,14 +36,40 @@ from .manual_input import (
 )
 from .feedback_queue import (
     get_pending_feedback, get_feedback_by_id, get_feedback_stats,
-    update_feedback_content, approve_feedback, reject_feedback,
-    publish_feedback, publish_all_approved, queue_submission_feedback,
-    generate_submission_feedback_for_queue
+    update_feedback_content, approve_feedback, reject_feedback, bulk_update_feedback,
+    request_publish, retry_failed, queue_submission_feedback,
+    generate_submission_feedback_for_queue, generate_batch_feedback
 )
+from .progress import start_job, stream_job
+from . import metrics, perf
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional: falls back to gzip
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "student-tracker-dev-key")
 
+# Opt-in request profiling (STUDENT_TRACKER_PERF=1); a no-op when disabled
+perf.install(app, engine, Session)
+
+# Responses smaller than this aren't worth compressing
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_MIMETYPES = {
+    "text/html", "text/css", "text/csv", "text/plain",
+    "application/json", "application/javascript"
+}
+
+# Rows per page on the evaluation work list
+EVALUATE_PAGE_SIZE = 20
+
+# Items per page on the feedback review queue
+FEEDBACK_PAGE_SIZE = 50
+
+# Most submissions one dashboard-started evaluation run may take on
+EVALUATE_BATCH_MAX = 50
+
 # ============================================================================
 # HTML Templates
 # ============================================================================
@@ -157,7 +188,7 @@ BASE_TEMPLATE = """
                 <a href="/students" class="nav-link relative">Students</a>
                 <a href="/assignments" class="nav-link relative">Assignments</a>
                 <a href="/evaluate" class="nav-link relative">Evaluate</a>
-                <a href="/feedback" class="nav-link relative">Feedback</a>
+                <a href="/feedback" class="nav-link relative">Feedback <span id="feedbackPending" class="badge badge-risk ml-1 hidden"></span></a>
                 <a href="/insights" class="nav-link relative">Insights</a>
                 <a href="/settings" class="nav-link relative">Settings</a>
             </div>
@@ -188,6 +219,20 @@ BASE_TEMPLATE = """
     </div>
 
     <script>
+        // Review-queue counter in the nav, served from the in-memory counts
+        function refreshFeedbackBadge() {
+            fetch('/api/feedback/stats')
+                .then(r => r.json())
+                .then(stats => {
+                    const badge = document.getElementById('feedbackPending');
+                    badge.textContent = stats.pending;
+                    badge.classList.toggle('hidden', !stats.pending);
+                })
+                .catch(() => {});
+        }
+        refreshFeedbackBadge();
+        setInterval(refreshFeedbackBadge, 30000);
+
         {% block scripts %}{% endblock %}
     </script>
 </body>
@@ -488,27 +533,15 @@ STUDENT_DETAIL_TEMPLATE = """
         <h2 class="text-lg mb-5">Patterns</h2>
         <div class="mb-5">
             <h3 class="text-accent mb-3">Recurring strengths</h3>
-            {% if strengths.recurring_strengths %}
-            <ul class="space-y-2">
-                {% for s in strengths.recurring_strengths[:3] %}
-                <li class="text-sm pl-4 border-l-2 border-accent/30">{{ s.text|replace('**', '')|replace('*', '') }}</li>
-                {% endfor %}
+            <ul id="strengthsList" class="space-y-2">
+                <li class="text-sm text-mist">Loading...</li>
             </ul>
-            {% else %}
-            <p class="text-sm text-mist">No patterns identified yet</p>
-            {% endif %}
         </div>
         <div>
             <h3 class="text-yellow-700 mb-3">Areas for growth</h3>
-            {% if strengths.recurring_improvements %}
-            <ul class="space-y-2">
-                {% for i in strengths.recurring_improvements[:3] %}
-                <li class="text-sm pl-4 border-l-2 border-yellow-400/50">{{ i.text|replace('**', '')|replace('*', '') }}</li>
-                {% endfor %}
+            <ul id="improvementsList" class="space-y-2">
+                <li class="text-sm text-mist">Loading...</li>
             </ul>
-            {% else %}
-            <p class="text-sm text-mist">No patterns identified yet</p>
-            {% endif %}
         </div>
     </div>
 </div>
@@ -516,6 +549,7 @@ STUDENT_DETAIL_TEMPLATE = """
 <!-- Progression Chart -->
 <div class="deckle-card rounded-lg p-6 mb-10">
     <h2 class="text-lg mb-5">Score progression</h2>
+    <p id="progressionStatus" class="text-sm text-mist">Loading...</p>
     <canvas id="progressionChart" height="100"></canvas>
 </div>
 
@@ -534,35 +568,10 @@ STUDENT_DETAIL_TEMPLATE = """
                 <th class="text-right">Actions</th>
             </tr>
         </thead>
-        <tbody>
-            {% for sub in submissions %}
+        <tbody id="submissionsBody">
             <tr>
-                <td class="font-medium">{{ sub.assignment_name }}</td>
-                <td>
-                    <span class="badge {% if sub.status == 'submitted' %}badge-good{% elif sub.status == 'late' %}badge-warn{% elif sub.status == 'missing' %}badge-risk{% else %}badge-neutral{% endif %}">
-                        {{ sub.status|capitalize }}
-                    </span>
-                </td>
-                <td class="text-mist">
-                    {% if sub.canvas_score is not none %}
-                    <span class="font-medium text-ink">{{ "%.1f"|format(sub.canvas_score) }}</span>/{{ "%.0f"|format(sub.max_score) }}
-                    <span class="text-xs text-mist ml-1">Canvas</span>
-                    {% elif sub.score is not none %}
-                    {{ "%.1f"|format(sub.score) }}/{{ "%.0f"|format(sub.max_score) }}
-                    <span class="text-xs text-mist ml-1">AI</span>
-                    {% else %}
-                    —
-                    {% endif %}
-                </td>
-                <td class="text-mist">{{ sub.submitted_at or '—' }}</td>
-                <td class="text-right">
-                    <a href="/submission/{{ sub.id }}" class="text-sm hover:text-crimson">View</a>
-                    {% if sub.status != 'pending' and sub.score is none %}
-                    <a href="/submission/{{ sub.id }}/evaluate" class="text-sm text-accent hover:text-crimson ml-3">Evaluate</a>
-                    {% endif %}
-                </td>
+                <td colspan="5" class="text-mist">Loading...</td>
             </tr>
-            {% endfor %}
         </tbody>
     </table>
 </div>
@@ -604,9 +613,122 @@ STUDENT_DETAIL_TEMPLATE = """
 {% endblock %}
 
 {% block scripts %}
-const progressionData = {{ progression | tojson }};
+// Patterns, progression and submission history load after first paint
+fetch('/api/student/{{ student.id }}/profile')
+    .then(r => r.json())
+    .then(profile => {
+        if (profile.error) {
+            document.getElementById('progressionStatus').textContent = profile.error;
+            return;
+        }
+        renderPatternList('strengthsList', profile.strengths.recurring_strengths, 'border-accent/30');
+        renderPatternList('improvementsList', profile.strengths.recurring_improvements, 'border-yellow-400/50');
+        renderProgressionChart(profile.progression);
+        renderSubmissions(profile.submissions);
+    });
+
+function stripMarkdown(text) {
+    return text.replaceAll('**', '').replaceAll('*', '');
+}
+
+function capitalize(text) {
+    return text ? text.charAt(0).toUpperCase() + text.slice(1) : '';
+}
+
+function renderPatternList(listId, items, borderClass) {
+    const list = document.getElementById(listId);
+    list.replaceChildren();
+
+    if (!items || items.length === 0) {
+        const li = document.createElement('li');
+        li.className = 'text-sm text-mist';
+        li.textContent = 'No patterns identified yet';
+        list.appendChild(li);
+        return;
+    }
+
+    items.slice(0, 3).forEach(item => {
+        const li = document.createElement('li');
+        li.className = 'text-sm pl-4 border-l-2 ' + borderClass;
+        li.textContent = stripMarkdown(item.text);
+        list.appendChild(li);
+    });
+}
+
+function renderSubmissions(submissions) {
+    const body = document.getElementById('submissionsBody');
+    const badgeClass = {submitted: 'badge-good', late: 'badge-warn', missing: 'badge-risk'};
+    body.replaceChildren();
+
+    submissions.forEach(sub => {
+        const tr = document.createElement('tr');
+
+        const nameTd = document.createElement('td');
+        nameTd.className = 'font-medium';
+        nameTd.textContent = sub.assignment_name;
+        tr.appendChild(nameTd);
+
+        const statusTd = document.createElement('td');
+        const badge = document.createElement('span');
+        badge.className = 'badge ' + (badgeClass[sub.status] || 'badge-neutral');
+        badge.textContent = capitalize(sub.status);
+        statusTd.appendChild(badge);
+        tr.appendChild(statusTd);
+
+        const scoreTd = document.createElement('td');
+        scoreTd.className = 'text-mist';
+        const source = document.createElement('span');
+        source.className = 'text-xs text-mist ml-1';
+        if (sub.canvas_score !== null) {
+            const score = document.createElement('span');
+            score.className = 'font-medium text-ink';
+            score.textContent = sub.canvas_score.toFixed(1);
+            scoreTd.appendChild(score);
+            scoreTd.appendChild(document.createTextNode('/' + sub.max_score.toFixed(0)));
+            source.textContent = 'Canvas';
+            scoreTd.appendChild(source);
+        } else if (sub.score !== null) {
+            scoreTd.appendChild(document.createTextNode(sub.score.toFixed(1) + '/' + sub.max_score.toFixed(0)));
+            source.textContent = 'AI';
+            scoreTd.appendChild(source);
+        } else {
+            scoreTd.textContent = '—';
+        }
+        tr.appendChild(scoreTd);
+
+        const dateTd = document.createElement('td');
+        dateTd.className = 'text-mist';
+        dateTd.textContent = sub.submitted_at || '—';
+        tr.appendChild(dateTd);
+
+        const actionsTd = document.createElement('td');
+        actionsTd.className = 'text-right';
+        const view = document.createElement('a');
+        view.href = '/submission/' + sub.id;
+        view.className = 'text-sm hover:text-crimson';
+        view.textContent = 'View';
+        actionsTd.appendChild(view);
+        if (sub.status !== 'pending' && sub.score === null) {
+            const evaluate = document.createElement('a');
+            evaluate.href = '/submission/' + sub.id + '/evaluate';
+            evaluate.className = 'text-sm text-accent hover:text-crimson ml-3';
+            evaluate.textContent = 'Evaluate';
+            actionsTd.appendChild(evaluate);
+        }
+        tr.appendChild(actionsTd);
+
+        body.appendChild(tr);
+    });
+}
+
+function renderProgressionChart(progressionData) {
+    const status = document.getElementById('progressionStatus');
+    if (!progressionData.timeline || progressionData.timeline.length === 0) {
+        status.textContent = 'No evaluated submissions yet';
+        return;
+    }
+    status.remove();
 
-if (progressionData.timeline && progressionData.timeline.length > 0) {
     new Chart(document.getElementById('progressionChart'), {
         type: 'line',
         data: {
@@ -815,11 +937,13 @@ ASSIGNMENT_DETAIL_TEMPLATE = """
 </div>
 {% endif %}
 
+{% include "progress_panel.html" %}
+
 <!-- Submissions Table -->
 <div class="deckle-card rounded-lg overflow-hidden">
     <div class="p-5 border-b border-ink/5 flex justify-between items-center">
         <h2 class="text-lg">Submissions</h2>
-        <a href="/assignment/{{ assignment.id }}/evaluate-all" class="px-4 py-2 bg-crimson text-canvas rounded-lg hover:bg-crimson/90 transition text-sm font-medium">
+        <a href="/assignment/{{ assignment.id }}/evaluate-all" onclick="return evaluateAllPending()" class="px-4 py-2 bg-crimson text-canvas rounded-lg hover:bg-crimson/90 transition text-sm font-medium">
             Evaluate all pending
         </a>
     </div>
@@ -870,6 +994,17 @@ ASSIGNMENT_DETAIL_TEMPLATE = """
     </table>
 </div>
 {% endblock %}
+
+{% block scripts %}
+{% include "progress_script.js" %}
+
+function evaluateAllPending() {
+    streamProgress('/api/stream/evaluate', {assignment_id: {{ assignment.id }}, limit: 50}, 'Evaluating pending submissions', () => {
+        setTimeout(() => location.reload(), 2000);
+    });
+    return false;
+}
+{% endblock %}
 """
 
 SUBMISSION_DETAIL_TEMPLATE = """
@@ -1165,7 +1300,7 @@ EVALUATE_TEMPLATE = """
         <h2 class="text-lg mb-4">Automated evaluation</h2>
         <p class="text-sm text-mist mb-5 leading-relaxed">Use Claude Haiku to evaluate pending submissions against rubrics.</p>
 
-        <form action="/api/evaluate/batch" method="POST" class="space-y-4">
+        <form action="/api/evaluate/batch" method="POST" class="space-y-4" onsubmit="return startBatchEvaluation(this)">
             <div>
                 <label class="block text-sm font-medium mb-2">Assignment (optional)</label>
                 <select name="assignment_id" class="w-full px-3 py-2 bg-white/50 border border-ink/10 rounded-lg focus:outline-none focus:border-accent text-sm">
@@ -1224,10 +1359,12 @@ EVALUATE_TEMPLATE = """
     </div>
 </div>
 
+{% include "progress_panel.html" %}
+
 <!-- Pending Evaluations -->
 <div class="deckle-card rounded-lg overflow-hidden">
     <div class="p-5 border-b border-ink/5">
-        <h2 class="text-lg">Pending evaluations <span class="text-mist font-normal">({{ pending|length }})</span></h2>
+        <h2 class="text-lg">Pending evaluations <span class="text-mist font-normal">({{ pending_count }})</span></h2>
     </div>
     {% if pending %}
     <table>
@@ -1240,7 +1377,7 @@ EVALUATE_TEMPLATE = """
             </tr>
         </thead>
         <tbody>
-            {% for p in pending[:20] %}
+            {% for p in pending %}
             <tr>
                 <td>{{ p.student_name }}</td>
                 <td class="text-mist">{{ p.assignment_name }}</td>
@@ -1252,6 +1389,13 @@ EVALUATE_TEMPLATE = """
             {% endfor %}
         </tbody>
     </table>
+    {% if page > 1 or has_next %}
+    <div class="p-4 border-t border-ink/5 flex justify-between text-sm">
+        {% if page > 1 %}<a href="/evaluate?page={{ page - 1 }}" class="hover:text-crimson">← Previous</a>{% else %}<span></span>{% endif %}
+        <span class="text-mist">Page {{ page }}</span>
+        {% if has_next %}<a href="/evaluate?page={{ page + 1 }}" class="hover:text-crimson">Next →</a>{% else %}<span></span>{% endif %}
+    </div>
+    {% endif %}
     {% else %}
     <p class="p-5 text-sm text-mist">No pending evaluations</p>
     {% endif %}
@@ -1259,6 +1403,17 @@ EVALUATE_TEMPLATE = """
 {% endblock %}
 
 {% block scripts %}
+{% include "progress_script.js" %}
+
+function startBatchEvaluation(form) {
+    const data = new FormData(form);
+    const body = {assignment_id: data.get('assignment_id') || null, limit: data.get('limit')};
+    streamProgress('/api/stream/evaluate', body, 'Evaluating submissions', () => {
+        setTimeout(() => location.reload(), 2000);
+    });
+    return false;
+}
+
 function loadStudentSubmissions() {
     const studentId = document.getElementById('manual-student').value;
     const submissionSelect = document.getElementById('manual-submission');
@@ -1333,6 +1488,9 @@ INSIGHTS_TEMPLATE = """
         <h2 class="text-lg">Progress history</h2>
     </div>
     {% if snapshots %}
+    <div class="p-5 border-b border-ink/5">
+        <canvas id="historyChart" height="80"></canvas>
+    </div>
     <table>
         <thead>
             <tr>
@@ -1343,7 +1501,7 @@ INSIGHTS_TEMPLATE = """
             </tr>
         </thead>
         <tbody>
-            {% for s in snapshots %}
+            {% for s in (snapshots[-20:] | reverse) %}
             <tr>
                 <td>{{ s.date }}</td>
                 <td class="text-mist">{{ "%.1f"|format(s.class_average or 0) }}%</td>
@@ -1360,6 +1518,28 @@ INSIGHTS_TEMPLATE = """
 {% endblock %}
 
 {% block scripts %}
+const history = {{ snapshots | tojson }};
+if (history.length) {
+    new Chart(document.getElementById('historyChart'), {
+        type: 'line',
+        data: {
+            labels: history.map(s => s.date.slice(0, 10)),
+            datasets: [
+                { label: 'Class average', data: history.map(s => s.class_average), borderColor: '#CA3553', tension: 0.2, pointRadius: 0 },
+                { label: 'Submission rate', data: history.map(s => s.submission_rate), borderColor: '#3d4b40', tension: 0.2, pointRadius: 0 }
+            ]
+        },
+        options: {
+            responsive: true,
+            plugins: { legend: { labels: { font: { family: 'Plus Jakarta Sans', size: 11 } } } },
+            scales: {
+                y: { min: 0, max: 100, grid: { color: 'rgba(18,18,18,0.05)' } },
+                x: { grid: { display: false }, ticks: { maxTicksLimit: 12 } }
+            }
+        }
+    });
+}
+
 function generateClassInsights() {
     const display = document.getElementById('insightsDisplay');
     const content = document.getElementById('insightsContent');
@@ -1468,6 +1648,8 @@ SETTINGS_TEMPLATE = """
     <p class="text-mist text-sm">Configure integrations and sync data</p>
 </div>
 
+{% include "progress_panel.html" %}
+
 <div class="grid grid-cols-1 md:grid-cols-2 gap-6">
     <!-- Canvas Sync -->
     <div class="deckle-card rounded-lg p-6">
@@ -1485,7 +1667,7 @@ SETTINGS_TEMPLATE = """
             </div>
         </div>
 
-        <form action="/api/sync/canvas" method="POST">
+        <form action="/api/sync/canvas" method="POST" onsubmit="return startCanvasSync()">
             <button type="submit" {% if not canvas_configured %}disabled{% endif %}
                     class="w-full px-4 py-2 bg-crimson text-canvas rounded-lg hover:bg-crimson/90 transition text-sm font-medium disabled:opacity-50 disabled:cursor-not-allowed">
                 Sync from Canvas
@@ -1570,6 +1752,15 @@ SETTINGS_TEMPLATE = """
     </div>
 </div>
 {% endblock %}
+
+{% block scripts %}
+{% include "progress_script.js" %}
+
+function startCanvasSync() {
+    streamProgress('/api/stream/sync', {}, 'Syncing from Canvas');
+    return false;
+}
+{% endblock %}
 """
 
 FEEDBACK_QUEUE_TEMPLATE = """
@@ -1579,7 +1770,7 @@ FEEDBACK_QUEUE_TEMPLATE = """
 <div class="flex justify-between items-center mb-10">
     <div>
         <h1 class="text-4xl mb-2">Feedback queue</h1>
-        <p class="text-mist text-sm">Review and publish AI-generated feedback to Canvas</p>
+        <p class="text-mist text-sm">Review AI-generated feedback; approved items are posted to Canvas in the background</p>
     </div>
     <div class="flex gap-3">
         <button onclick="location.reload()" class="px-4 py-2 border border-ink/10 rounded-lg hover:bg-white/50 transition text-sm">
@@ -1596,7 +1787,7 @@ FEEDBACK_QUEUE_TEMPLATE = """
 </div>
 
 <!-- Stats -->
-<div class="grid grid-cols-2 md:grid-cols-5 gap-4 mb-10">
+<div class="grid grid-cols-2 md:grid-cols-6 gap-4 mb-10">
     <div class="stat-card rounded-lg p-4 text-center">
         <div class="text-2xl font-display font-black text-crimson">{{ stats.pending }}</div>
         <h3 class="mt-1">Pending</h3>
@@ -1617,27 +1808,60 @@ FEEDBACK_QUEUE_TEMPLATE = """
         <div class="text-2xl font-display font-black text-mist">{{ stats.rejected }}</div>
         <h3 class="mt-1">Rejected</h3>
     </div>
+    <div class="stat-card rounded-lg p-4 text-center">
+        <div class="text-2xl font-display font-black text-crimson">{{ stats.failed }}</div>
+        <h3 class="mt-1">Failed</h3>
+        {% if stats.failed > 0 %}
+        <form action="/api/feedback/retry-failed" method="POST" class="mt-2">
+            <button type="submit" class="text-xs text-crimson hover:underline">Retry</button>
+        </form>
+        {% endif %}
+    </div>
 </div>
 
 <!-- Pending Feedback Items -->
 {% if pending %}
+<div class="flex justify-between items-center mb-4 text-sm">
+    <label class="flex items-center gap-2 cursor-pointer">
+        <input type="checkbox" id="selectAll" onchange="selectAll(this.checked)">
+        Select all on this page
+    </label>
+    <div class="flex items-center gap-3">
+        <span id="selectedCount" class="text-mist">0 selected</span>
+        <button onclick="bulkAction('reject')"
+            class="bulk-button px-4 py-2 text-crimson border border-crimson/30 rounded-lg hover:bg-crimson/10 transition disabled:opacity-40" disabled>
+            Reject selected
+        </button>
+        <button onclick="bulkAction('edit')"
+            class="bulk-button px-4 py-2 border border-ink/10 rounded-lg hover:bg-white/50 transition disabled:opacity-40" disabled>
+            Save selected edits
+        </button>
+        <button onclick="bulkAction('approve')"
+            class="bulk-button px-4 py-2 bg-accent text-canvas rounded-lg hover:bg-accent/90 transition font-medium disabled:opacity-40" disabled>
+            Approve selected
+        </button>
+    </div>
+</div>
 <div class="space-y-6">
     {% for item in pending %}
-    <div class="deckle-card rounded-lg p-6" id="feedback-{{ item.id }}">
+    <div class="deckle-card rounded-lg p-6" id="feedback-{{ item.id }}" data-updated-at="{{ item.updated_at or '' }}">
         <div class="flex justify-between items-start mb-4">
-            <div>
-                {% if item.student_name %}
-                <span class="badge badge-neutral">{{ item.type|replace('_', ' ')|title }}</span>
-                <h2 class="text-lg mt-2">{{ item.student_name }}</h2>
-                {% if item.assignment_name %}
-                <p class="text-mist text-sm">{{ item.assignment_name }}</p>
-                {% endif %}
-                {% else %}
-                <span class="badge badge-neutral">{{ item.type|replace('_', ' ')|title }}</span>
-                {% if item.title %}
-                <h2 class="text-lg mt-2">{{ item.title }}</h2>
-                {% endif %}
-                {% endif %}
+            <div class="flex items-start gap-4">
+                <input type="checkbox" class="feedback-select mt-1" value="{{ item.id }}" onchange="updateSelection()">
+                <div>
+                    {% if item.student_name %}
+                    <span class="badge badge-neutral">{{ item.type|replace('_', ' ')|title }}</span>
+                    <h2 class="text-lg mt-2">{{ item.student_name }}</h2>
+                    {% if item.assignment_name %}
+                    <p class="text-mist text-sm">{{ item.assignment_name }}</p>
+                    {% endif %}
+                    {% else %}
+                    <span class="badge badge-neutral">{{ item.type|replace('_', ' ')|title }}</span>
+                    {% if item.title %}
+                    <h2 class="text-lg mt-2">{{ item.title }}</h2>
+                    {% endif %}
+                    {% endif %}
+                </div>
             </div>
             <div class="text-xs text-mist">
                 {{ item.created_at[:10] if item.created_at else '' }}
@@ -1671,6 +1895,12 @@ FEEDBACK_QUEUE_TEMPLATE = """
     </div>
     {% endfor %}
 </div>
+{% if newer or next_cursor %}
+<div class="mt-6 flex justify-between text-sm">
+    {% if newer %}<a href="/feedback" class="hover:text-crimson">← Newest</a>{% else %}<span></span>{% endif %}
+    {% if next_cursor %}<a href="/feedback?before={{ next_cursor|urlencode }}" class="hover:text-crimson">Older →</a>{% else %}<span></span>{% endif %}
+</div>
+{% endif %}
 {% else %}
 <div class="deckle-card rounded-lg p-10 text-center">
     <p class="text-mist">No pending feedback to review.</p>
@@ -1680,15 +1910,86 @@ FEEDBACK_QUEUE_TEMPLATE = """
 {% endblock %}
 
 {% block scripts %}
+function selectedIds() {
+    return Array.from(document.querySelectorAll('.feedback-select:checked')).map(box => parseInt(box.value));
+}
+
+function updateSelection() {
+    const count = selectedIds().length;
+    document.getElementById('selectedCount').textContent = count + ' selected';
+    document.querySelectorAll('.bulk-button').forEach(button => button.disabled = count === 0);
+}
+
+function selectAll(checked) {
+    document.querySelectorAll('.feedback-select').forEach(box => box.checked = checked);
+    updateSelection();
+}
+
+function bulkAction(action) {
+    const ids = selectedIds();
+    if (!ids.length) return;
+    if (action === 'reject' && !confirm('Reject ' + ids.length + ' feedback items?')) return;
+
+    const items = ids.map(id => {
+        const card = document.getElementById('feedback-' + id);
+        const textarea = document.getElementById('content-' + id);
+        const item = {id: id, action: action, updated_at: card.dataset.updatedAt || null};
+        // Send the text only when the reviewer changed it
+        if (textarea.value !== textarea.defaultValue) item.content = textarea.value;
+        return item;
+    }).filter(item => action !== 'edit' || item.content);
+    if (!items.length) {
+        showToast('No edits to save');
+        return;
+    }
+
+    fetch('/api/feedback/bulk', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({items: items})
+    }).then(r => r.json()).then(data => {
+        if (data.error) {
+            showToast('Error: ' + data.error, true);
+            return;
+        }
+        Object.entries(data.updated).forEach(([id, updatedAt]) => {
+            const card = document.getElementById('feedback-' + id);
+            if (action === 'edit') {
+                card.dataset.updatedAt = updatedAt;
+                const textarea = document.getElementById('content-' + id);
+                textarea.defaultValue = textarea.value;
+            } else {
+                card.remove();
+            }
+        });
+        const done = Object.keys(data.updated).length;
+        const labels = {approve: 'Approved', reject: 'Rejected', edit: 'Saved'};
+        if (data.conflicts.length) {
+            showToast(labels[action] + ' ' + done + '; ' + data.conflicts.length +
+                ' changed by someone else, reload to review them', true);
+        } else {
+            showToast(labels[action] + ' ' + done);
+        }
+        updateSelection();
+    });
+}
+
 function saveFeedback(id) {
-    const content = document.getElementById('content-' + id).value;
-    fetch('/api/feedback/' + id + '/update', {
+    const card = document.getElementById('feedback-' + id);
+    const textarea = document.getElementById('content-' + id);
+    fetch('/api/feedback/bulk', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({content: content})
+        body: JSON.stringify({items: [
+            {id: id, action: 'edit', content: textarea.value, updated_at: card.dataset.updatedAt || null}
+        ]})
     }).then(r => r.json()).then(data => {
-        if (data.success) {
+        if (data.updated && data.updated[id]) {
+            card.dataset.updatedAt = data.updated[id];
+            textarea.defaultValue = textarea.value;
             showToast('Saved');
+        } else if (data.conflicts && data.conflicts.length) {
+            showToast('Changed by someone else, reload to review it', true);
         } else {
             showToast('Error: ' + (data.error || 'Unknown'), true);
         }
@@ -1703,6 +2004,8 @@ function approveFeedback(id) {
                 document.getElementById('feedback-' + id).style.opacity = '0.5';
                 showToast('Approved');
                 setTimeout(() => location.reload(), 1000);
+            } else {
+                showToast('Already published or being published, reload to review it', true);
             }
         });
 }
@@ -1715,28 +2018,34 @@ function rejectFeedback(id) {
             if (data.success) {
                 document.getElementById('feedback-' + id).remove();
                 showToast('Rejected');
+            } else {
+                showToast('Already published or being published, reload to review it', true);
             }
         });
 }
 
 function approveAndPublish(id) {
     const content = document.getElementById('content-' + id).value;
+    // Each step refuses an item that is published or being published; stop there
+    const stale = new Error('Already published or being published, reload to review it');
     fetch('/api/feedback/' + id + '/update', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({content: content})
-    }).then(() => {
+    }).then(r => r.json()).then(data => {
+        if (!data.success) throw stale;
         return fetch('/api/feedback/' + id + '/approve', {method: 'POST'});
-    }).then(() => {
+    }).then(r => r.json()).then(data => {
+        if (!data.success) throw stale;
         return fetch('/api/feedback/' + id + '/publish', {method: 'POST'});
     }).then(r => r.json()).then(data => {
         if (data.error) {
             showToast('Error: ' + data.error, true);
         } else {
             document.getElementById('feedback-' + id).remove();
-            showToast('Published to Canvas');
+            showToast('Queued for Canvas');
         }
-    });
+    }).catch(err => showToast(err.message, true));
 }
 
 function showToast(msg, isError) {
@@ -1750,6 +2059,238 @@ function showToast(msg, isError) {
 {% endblock %}
 """
 
+# Shared live-progress panel for long-running actions (evaluate, sync)
+PROGRESS_PANEL_TEMPLATE = """
+<div id="progressPanel" class="deckle-card rounded-lg p-6 mb-10 hidden">
+    <div class="flex justify-between items-center mb-4">
+        <h2 class="text-lg" id="progressTitle">Working...</h2>
+        <span id="progressCount" class="text-sm text-mist"></span>
+    </div>
+    <div class="w-full h-2 bg-ink/5 rounded-full overflow-hidden mb-5">
+        <div id="progressBar" class="h-full bg-accent transition-all" style="width: 0%"></div>
+    </div>
+    <div class="grid grid-cols-3 gap-4 mb-5">
+        <div>
+            <h3 class="mb-1">Failed</h3>
+            <div id="progressFailed" class="text-sm font-semibold">0</div>
+        </div>
+        <div>
+            <h3 class="mb-1">Tokens</h3>
+            <div id="progressTokens" class="text-sm font-semibold">0</div>
+        </div>
+        <div>
+            <h3 class="mb-1">ETA</h3>
+            <div id="progressEta" class="text-sm font-semibold">—</div>
+        </div>
+    </div>
+    <p id="progressStatus" class="text-sm text-mist mb-3"></p>
+    <ul id="progressLog" class="space-y-1 text-sm max-h-64 overflow-y-auto"></ul>
+</div>
+"""
+
+PROGRESS_SCRIPT_TEMPLATE = """
+function formatSeconds(seconds) {
+    if (seconds === null || seconds === undefined) return '—';
+    if (seconds < 60) return Math.round(seconds) + 's';
+    return Math.floor(seconds / 60) + 'm ' + Math.round(seconds % 60) + 's';
+}
+
+// POST starts the job; its progress then streams over EventSource (GET only)
+function streamProgress(url, body, title, onDone) {
+    const panel = document.getElementById('progressPanel');
+    const log = document.getElementById('progressLog');
+    const status = document.getElementById('progressStatus');
+
+    panel.classList.remove('hidden');
+    panel.scrollIntoView({behavior: 'smooth'});
+    document.getElementById('progressTitle').textContent = title;
+    status.textContent = 'Starting...';
+    status.className = 'text-sm text-mist mb-3';
+    log.replaceChildren();
+
+    function updateTotals(p) {
+        if (!p) return;
+        const pct = p.total > 0 ? Math.min(100, p.done / p.total * 100) : 0;
+        document.getElementById('progressBar').style.width = pct + '%';
+        document.getElementById('progressCount').textContent = p.done + '/' + p.total;
+        document.getElementById('progressFailed').textContent = p.failed;
+        document.getElementById('progressTokens').textContent = (p.input_tokens + p.output_tokens).toLocaleString();
+        document.getElementById('progressEta').textContent = formatSeconds(p.eta_seconds);
+    }
+
+    function addLine(text, isError) {
+        const li = document.createElement('li');
+        li.className = 'pl-4 border-l-2 ' + (isError ? 'border-crimson text-crimson' : 'border-ink/10');
+        li.textContent = text;
+        log.prepend(li);
+        while (log.children.length > 200) log.lastChild.remove();
+    }
+
+    function fail(message) {
+        status.textContent = 'Error: ' + message;
+        status.className = 'text-sm text-crimson mb-3';
+    }
+
+    fetch(url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body || {})
+    }).then(r => r.json().then(data => {
+        if (r.ok) {
+            follow(data.stream_url);
+        } else {
+            fail(data.error || r.statusText);
+        }
+    })).catch(() => fail('Could not start the job'));
+
+    function follow(streamUrl) {
+        const source = new EventSource(streamUrl);
+
+        source.addEventListener('start', e => updateTotals(JSON.parse(e.data).progress));
+
+        source.addEventListener('stage', e => {
+            const data = JSON.parse(e.data);
+            status.textContent = data.message;
+            updateTotals(data.progress);
+        });
+
+        source.addEventListener('item', e => {
+            const data = JSON.parse(e.data);
+            updateTotals(data.progress);
+            if (data.status === 'skipped') return;
+
+            const who = [data.student_name, data.assignment_name].filter(Boolean).join(' · ');
+            if (data.status === 'failed') {
+                addLine(who + ': ' + (data.error || 'failed'), true);
+            } else if (data.score !== undefined && data.score !== null) {
+                addLine(who + ': ' + data.score + '/' + data.points_possible);
+            } else {
+                addLine(who + ': ' + data.status);
+            }
+        });
+
+        source.addEventListener('done', e => {
+            const data = JSON.parse(e.data);
+            source.close();
+            updateTotals(data.progress);
+            status.textContent = 'Finished in ' + formatSeconds(data.progress.elapsed_seconds);
+            if (onDone) onDone(data);
+        });
+
+        source.addEventListener('error', e => {
+            source.close();
+            // Server-sent error events carry data; connection errors do not
+            status.textContent = e.data ? 'Error: ' + JSON.parse(e.data).error : 'Connection lost. The job keeps running on the server.';
+            status.className = 'text-sm text-crimson mb-3';
+        });
+    }
+}
+"""
+
+DEBUG_PERF_TEMPLATE = """
+{% extends "base.html" %}
+{% block title %}Performance{% endblock %}
+{% block content %}
+<div class="flex justify-between items-center mb-10">
+    <div>
+        <h1 class="text-4xl mb-2">Performance</h1>
+        <p class="text-mist text-sm">Request profiling for worker process {{ report.pid }}</p>
+    </div>
+    {% if report.enabled %}
+    <form action="/debug/perf/reset" method="POST">
+        <button type="submit" class="px-4 py-2 border border-ink/10 rounded-lg hover:bg-white/50 transition text-sm">
+            Reset
+        </button>
+    </form>
+    {% endif %}
+</div>
+
+{% if not report.enabled %}
+<div class="deckle-card rounded-lg p-6">
+    <p class="text-sm text-mist">Profiling is disabled. Start the dashboard with
+    <code class="bg-white/50 px-2 py-1 rounded text-xs">STUDENT_TRACKER_PERF=1</code> or
+    <code class="bg-white/50 px-2 py-1 rounded text-xs">dashboard --profile</code>.</p>
+</div>
+{% else %}
+<div class="deckle-card rounded-lg overflow-hidden mb-10">
+    <div class="p-5 border-b border-ink/5">
+        <h2 class="text-lg">Endpoints</h2>
+    </div>
+    {% if report.endpoints %}
+    <table>
+        <thead>
+            <tr>
+                <th>Endpoint</th>
+                <th class="text-right">Requests</th>
+                <th class="text-right">Avg ms</th>
+                <th class="text-right">Max ms</th>
+                <th class="text-right">Avg queries</th>
+                <th class="text-right">N+1 requests</th>
+            </tr>
+        </thead>
+        <tbody>
+            {% for e in report.endpoints %}
+            <tr>
+                <td>{{ e.endpoint }}</td>
+                <td class="text-right text-mist">{{ e.count }}</td>
+                <td class="text-right">{{ e.avg_ms }}</td>
+                <td class="text-right text-mist">{{ e.max_ms }}</td>
+                <td class="text-right">{{ e.avg_queries }}</td>
+                <td class="text-right {% if e.n_plus_one %}text-crimson font-semibold{% endif %}">{{ e.n_plus_one }}</td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+    {% else %}
+    <p class="p-5 text-sm text-mist">No requests recorded yet</p>
+    {% endif %}
+</div>
+
+{% for title, entries in [("Slow requests (over " ~ report.slow_request_ms|int ~ " ms)", report.slow_requests), ("Recent requests", report.recent_requests)] %}
+<div class="deckle-card rounded-lg overflow-hidden mb-10">
+    <div class="p-5 border-b border-ink/5">
+        <h2 class="text-lg">{{ title }}</h2>
+    </div>
+    {% if entries %}
+    <table>
+        <thead>
+            <tr>
+                <th>Request</th>
+                <th class="text-right">Total</th>
+                <th class="text-right">DB</th>
+                <th class="text-right">Template</th>
+                <th class="text-right">LLM</th>
+                <th class="text-right">Queries</th>
+            </tr>
+        </thead>
+        <tbody>
+            {% for r in entries %}
+            <tr>
+                <td>
+                    <div>{{ r.method }} {{ r.path }} <span class="text-mist">{{ r.status }}</span></div>
+                    <div class="text-xs text-mist">{{ r.at }}</div>
+                    {% for n in r.n_plus_one %}
+                    <div class="text-xs text-crimson">N+1: {{ n.relationship }} loaded {{ n.loads }} times</div>
+                    {% endfor %}
+                </td>
+                <td class="text-right font-semibold">{{ r.total_ms }}</td>
+                <td class="text-right text-mist">{{ r.db_ms }}</td>
+                <td class="text-right text-mist">{{ r.template_ms }}</td>
+                <td class="text-right text-mist">{{ r.llm_ms }}</td>
+                <td class="text-right">{{ r.queries }}</td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+    {% else %}
+    <p class="p-5 text-sm text-mist">None yet</p>
+    {% endif %}
+</div>
+{% endfor %}
+{% endif %}
+{% endblock %}
+"""
+
 
 # ============================================================================
 # Template rendering helper
@@ -1769,6 +2310,9 @@ def render(template_name: str, **kwargs):
         "evaluate.html": EVALUATE_TEMPLATE,
         "insights.html": INSIGHTS_TEMPLATE,
         "settings.html": SETTINGS_TEMPLATE,
+        "progress_panel.html": PROGRESS_PANEL_TEMPLATE,
+        "progress_script.js": PROGRESS_SCRIPT_TEMPLATE,
+        "debug_perf.html": DEBUG_PERF_TEMPLATE,
     }
 
     # Create a custom Jinja environment with the base template
@@ -1781,9 +2325,52 @@ def render(template_name: str, **kwargs):
                 return source, template, lambda: True
             raise TemplateNotFound(template)
 
-    env = Environment(loader=DictLoader())
-    template = env.get_template(template_name)
-    return template.render(**kwargs)
+    with perf.span("template"):
+        env = Environment(loader=DictLoader())
+        template = env.get_template(template_name)
+        return template.render(**kwargs)
+
+
+def sse_response(events: Iterator[str]) -> Response:
+    """Wrap a job's event stream in a Server-Sent Events response."""
+    return Response(
+        events,
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Don't let proxies buffer the stream
+        }
+    )
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large HTML/JSON/CSV responses with brotli or gzip."""
+    if (response.direct_passthrough
+            or response.is_streamed  # Leave SSE progress streams alone
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or "Content-Encoding" in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if brotli is not None and "br" in request.accept_encodings:
+        body = brotli.compress(data, quality=4)
+        encoding = "br"
+    elif "gzip" in request.accept_encodings:
+        body = gzip.compress(data, compresslevel=6)
+        encoding = "gzip"
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
 
 
 # ============================================================================
@@ -1792,8 +2379,9 @@ def render(template_name: str, **kwargs):
 
 @app.route("/")
 def dashboard():
-    overview = get_class_overview()
-    groups = identify_student_groups()
+    ctx = AnalyticsContext()
+    overview = get_class_overview(ctx)
+    groups = identify_student_groups(ctx)
     groups_counts = {k: len(v) for k, v in groups.items()}
 
     return render("dashboard.html",
@@ -1804,11 +2392,11 @@ def dashboard():
 
 @app.route("/students")
 def students_list():
-    session = get_session()
-    students_raw = session.query(Student).order_by(Student.name).all()
+    ctx = AnalyticsContext()
+    students_raw = sorted(ctx.students(), key=lambda s: s.name)
 
     students = []
-    groups = identify_student_groups()
+    groups = identify_student_groups(ctx)
 
     # Create lookup for status
     status_lookup = {}
@@ -1817,17 +2405,16 @@ def students_list():
             status_lookup[s["id"]] = group_name
 
     for s in students_raw:
-        summary = get_student_summary(s.id)
+        summary = get_student_summary(s.id, ctx)
         students.append({
             "id": s.id,
             "name": s.name,
             "email": s.email,
-            "submission_count": len(s.submissions),
+            "submission_count": len(ctx.submissions(s.id)),
             "average": summary["metrics"]["overall_percentage"] if "metrics" in summary else 0,
             "status": status_lookup.get(s.id, "active")
         })
 
-    session.close()
     return render("students.html", students=students)
 
 
@@ -1840,30 +2427,6 @@ def student_detail(student_id: int):
         session.close()
         return "Student not found", 404
 
-    summary = get_student_summary(student_id)
-    progression = get_student_progression(student_id)
-    strengths = get_student_strengths_weaknesses(student_id)
-
-    # Get submissions with evaluations
-    submissions = []
-    for sub in student.submissions:
-        final_eval = None
-        for e in sub.evaluations:
-            if e.is_final:
-                final_eval = e
-                break
-
-        submissions.append({
-            "id": sub.id,
-            "assignment_name": sub.assignment.name,
-            "status": sub.status,
-            "score": final_eval.score if final_eval else None,
-            "max_score": sub.assignment.points_possible,
-            "canvas_score": sub.canvas_score,
-            "canvas_grade": sub.canvas_grade,
-            "submitted_at": sub.submitted_at.strftime("%Y-%m-%d") if sub.submitted_at else None
-        })
-
     # Get notes
     notes = [{
         "type": n.note_type,
@@ -1874,12 +2437,13 @@ def student_detail(student_id: int):
     student_dict = {"id": student.id, "name": student.name, "email": student.email}
     session.close()
 
+    # Only the headline stats render server-side. Patterns, the progression
+    # chart and submission history load from /api/student/<id>/profile.
+    summary = get_student_summary(student_id)
+
     return render("student_detail.html",
                   student=student_dict,
                   summary=summary,
-                  progression=progression,
-                  strengths=strengths,
-                  submissions=submissions,
                   notes=notes)
 
 
@@ -2123,33 +2687,31 @@ def evaluate_page():
         "name": s.name
     } for s in session.query(Student).order_by(Student.name).all()]
 
-    # Get pending evaluations (submissions without final evaluation)
-    pending = []
-    submissions = session.query(Submission).filter(
-        Submission.content.isnot(None),
-        Submission.content != ""
-    ).all()
-
-    for sub in submissions:
-        has_final = any(e.is_final for e in sub.evaluations)
-        if not has_final:
-            pending.append({
-                "id": sub.id,
-                "student_name": sub.student.name,
-                "assignment_name": sub.assignment.name,
-                "submitted_at": sub.submitted_at.strftime("%Y-%m-%d") if sub.submitted_at else None
-            })
-
     session.close()
+
+    # Page through the evaluation work list instead of loading every submission
+    page = max(request.args.get("page", 1, type=int), 1)
+    pending = get_pending_evaluations(
+        limit=EVALUATE_PAGE_SIZE + 1,
+        offset=(page - 1) * EVALUATE_PAGE_SIZE
+    )
+    has_next = len(pending) > EVALUATE_PAGE_SIZE
+    pending = pending[:EVALUATE_PAGE_SIZE]
+    for p in pending:
+        p["submitted_at"] = p["submitted_at"].strftime("%Y-%m-%d") if p["submitted_at"] else None
+
     return render("evaluate.html",
                   assignments=assignments,
                   students=students,
-                  pending=pending)
+                  pending=pending,
+                  pending_count=count_pending_evaluations(),
+                  page=page,
+                  has_next=has_next)
 
 
 @app.route("/insights")
 def insights_page():
-    snapshots = get_progress_history(days=90)
+    snapshots = get_progress_history(days=365, detail=False)
     return render("insights.html", snapshots=snapshots)
 
 
@@ -2161,12 +2723,45 @@ def settings_page():
                   anthropic_configured=bool(os.environ.get("ANTHROPIC_API_KEY")))
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape endpoint (see metrics.py)."""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/debug/perf")
+def debug_perf_page():
+    """Request profiling results (see perf.py)."""
+    report = perf.get_report()
+    if request.args.get("format") == "json":
+        return jsonify(report)
+    return render("debug_perf.html", report=report)
+
+
+@app.route("/debug/perf/reset", methods=["POST"])
+def debug_perf_reset():
+    perf.reset()
+    return redirect(url_for("debug_perf_page"))
+
+
 @app.route("/feedback")
 def feedback_queue_page():
     """Feedback review queue page."""
-    pending = get_pending_feedback(limit=50)
+    before = request.args.get("before")
+    try:
+        pending = get_pending_feedback(limit=FEEDBACK_PAGE_SIZE + 1, before=before)
+    except ValueError:
+        before = None
+        pending = get_pending_feedback(limit=FEEDBACK_PAGE_SIZE + 1)
+    has_next = len(pending) > FEEDBACK_PAGE_SIZE
+    pending = pending[:FEEDBACK_PAGE_SIZE]
+
     stats = get_feedback_stats()
-    return render("feedback_queue.html", pending=pending, stats=stats)
+    return render("feedback_queue.html",
+                  pending=pending,
+                  stats=stats,
+                  newer=bool(before),
+                  next_cursor=pending[-1]["cursor"] if has_next else None)
 
 
 # ============================================================================
@@ -2175,7 +2770,28 @@ def feedback_queue_page():
 
 @app.route("/api/student/<int:student_id>/insights")
 def api_student_insights(student_id: int):
-    return jsonify(generate_student_insights(student_id))
+    refresh = request.args.get("refresh") == "1"
+    return jsonify(generate_student_insights(student_id, refresh=refresh))
+
+
+@app.route("/api/student/<int:student_id>/profile")
+def api_student_profile(student_id: int):
+    """Summary, progression, strengths and submission history in one payload."""
+    profile = get_student_profile(student_id)
+    if "error" in profile:
+        return jsonify(profile), 404
+    return jsonify(profile)
+
+
+@app.route("/api/student/<int:student_id>/skills/history")
+def api_student_skill_history(student_id: int):
+    """Assessed skill levels over time, plus the change over the last ?days= (default 30)."""
+    days = request.args.get("days", 30, type=int)
+    return jsonify({
+        "history": get_skill_history(student_id, request.args.get("skill")),
+        "deltas": get_skill_deltas(student_id, days=days),
+        "days": days
+    })
 
 
 @app.route("/api/student/<int:student_id>/submissions")
@@ -2199,7 +2815,8 @@ def api_student_submissions(student_id: int):
 
 @app.route("/api/class/insights")
 def api_class_insights():
-    return jsonify(generate_class_insights())
+    refresh = request.args.get("refresh") == "1"
+    return jsonify(generate_class_insights(refresh=refresh))
 
 
 @app.route("/api/evaluate/batch", methods=["POST"])
@@ -2213,6 +2830,27 @@ def api_evaluate_batch():
     return redirect(url_for("evaluate_page"))
 
 
+@app.route("/api/stream/evaluate", methods=["POST"])
+def api_stream_evaluate():
+    """
+    Start evaluating pending submissions; stream the job from the returned URL.
+
+    Body: {"assignment_id", "limit"} as JSON, which a cross-site form can't
+    send. limit is capped at EVALUATE_BATCH_MAX.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON body"}), 400
+    try:
+        assignment_id = int(data["assignment_id"]) if data.get("assignment_id") else None
+        limit = int(data.get("limit") or 10)
+    except (TypeError, ValueError):
+        return jsonify({"error": "assignment_id and limit must be numbers"}), 400
+
+    limit = max(1, min(limit, EVALUATE_BATCH_MAX))
+    return _job_started(start_job(evaluate_all_pending, assignment_id=assignment_id, limit=limit))
+
+
 @app.route("/api/evaluate/manual", methods=["POST"])
 def api_evaluate_manual():
     submission_id = int(request.form.get("submission_id"))
@@ -2235,6 +2873,31 @@ def api_sync_canvas():
     return redirect(url_for("settings_page"))
 
 
+@app.route("/api/stream/sync", methods=["POST"])
+def api_stream_sync():
+    """Start a full Canvas sync (JSON body, may be {}); stream the job from the returned URL."""
+    if not isinstance(request.get_json(silent=True), dict):
+        return jsonify({"error": "Expected a JSON body"}), 400
+    return _job_started(start_job(canvas_full_sync))
+
+
+def _job_started(job_id: str):
+    return jsonify({"job_id": job_id, "stream_url": url_for("api_job_stream", job_id=job_id)}), 202
+
+
+@app.route("/api/jobs/<job_id>/stream")
+def api_job_stream(job_id: str):
+    """
+    Stream an evaluation or sync job's per-item progress (SSE).
+
+    Only follows a job started by a POST above; EventSource can only GET.
+    """
+    events = stream_job(job_id, after=request.headers.get("Last-Event-ID", 0, type=int))
+    if events is None:
+        return jsonify({"error": "Job not found"}), 404
+    return sse_response(events)
+
+
 @app.route("/api/db/init", methods=["POST"])
 def api_init_db():
     init_db()
@@ -2331,17 +2994,49 @@ def api_feedback_reject(feedback_id: int):
     return jsonify({"success": success})
 
 
+@app.route("/api/feedback/bulk", methods=["POST"])
+def api_feedback_bulk():
+    """
+    Approve, reject or edit many feedback items at once.
+
+    Body: {"items": [{"id", "action", "updated_at", "content", "title"}]}
+    """
+    data = request.get_json() or {}
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items is required"}), 400
+
+    try:
+        result = bulk_update_feedback(items)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+
 @app.route("/api/feedback/<int:feedback_id>/publish", methods=["POST"])
 def api_feedback_publish(feedback_id: int):
-    """Publish a single feedback item to Canvas."""
-    result = publish_feedback(feedback_id)
-    return jsonify(result)
+    """Hand an approved feedback item to the publisher worker."""
+    if not request_publish([feedback_id]):
+        return jsonify({"error": "Feedback must be approved first"}), 400
+    return jsonify({"queued": True})
+
+
+@app.route("/api/feedback/stats")
+def api_feedback_stats():
+    return jsonify(get_feedback_stats(cached=True))
 
 
 @app.route("/api/feedback/publish-all", methods=["POST"])
 def api_feedback_publish_all():
-    """Publish all approved feedback to Canvas."""
-    result = publish_all_approved()
+    """Hand all approved feedback to the publisher worker, retrying any that are backing off."""
+    request_publish()
+    return redirect(url_for("feedback_queue_page"))
+
+
+@app.route("/api/feedback/retry-failed", methods=["POST"])
+def api_feedback_retry_failed():
+    """Put feedback the publisher gave up on back in the outbox."""
+    retry_failed()
     return redirect(url_for("feedback_queue_page"))
 
 
@@ -2357,41 +3052,33 @@ def api_generate_feedback(submission_id: int):
 @app.route("/api/feedback/generate-batch", methods=["POST"])
 def api_generate_feedback_batch():
     """Generate feedback for all evaluated submissions without queued feedback."""
-    session = get_session()
-
-    # Find submissions with final evaluations but no pending feedback
-    from .models import FeedbackQueue, FeedbackQueueStatus
-
-    submissions_with_evals = session.query(Submission).join(Evaluation).filter(
-        Evaluation.is_final == True
-    ).all()
-
-    generated = 0
-    for sub in submissions_with_evals:
-        # Check if feedback already queued
-        existing = session.query(FeedbackQueue).filter(
-            FeedbackQueue.submission_id == sub.id,
-            FeedbackQueue.status.in_([
-                FeedbackQueueStatus.PENDING.value,
-                FeedbackQueueStatus.APPROVED.value,
-                FeedbackQueueStatus.EDITED.value
-            ])
-        ).first()
-
-        if not existing:
-            session.close()
-            result = generate_submission_feedback_for_queue(sub.id)
-            if result:
-                generated += 1
-            session = get_session()
-
-    session.close()
+    generate_batch_feedback()
     return redirect(url_for("feedback_queue_page"))
 
 
-def run_dashboard(host: str = "0.0.0.0", port: int = 5000, debug: bool = False):
-    """Run the dashboard server."""
+def run_dashboard(
+    host: str = "0.0.0.0",
+    port: int = 5000,
+    debug: bool = False,
+    production: bool = False,
+    workers: int = 2,
+    threads: int = 8,
+    timeout: int = 120
+):
+    """
+    Run the dashboard server.
+
+    By default this uses Flask's development server. With production=True
+    it runs under gunicorn (or waitress on Windows) with the given number
+    of worker processes and threads per worker.
+    """
     init_db()
+
+    if production:
+        from .server import run_production
+        run_production(host=host, port=port, workers=workers, threads=threads, timeout=timeout)
+        return
+
     print(f"Starting Student Tracker dashboard at http://{host}:{port}")
     app.run(host=host, port=port, debug=debug)
 
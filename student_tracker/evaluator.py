@@ -10,17 +10,23 @@ Uses Claude Haiku to:
 
 import os
 import json
+import time
 from datetime import datetime
-from typing import Optional
-import anthropic
+from typing import TYPE_CHECKING, Callable, Optional
+from . import metrics
 from .models import (
-    get_session, Submission, Evaluation, Assignment,
+    get_session, Student, Submission, Evaluation, Assignment,
     EvaluationSource, SkillLevel
 )
 from .teaching_context import get_teaching_context
 
+if TYPE_CHECKING:
+    import anthropic
+
 # Anthropic API configuration
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+# Messages API endpoint override, e.g. the local fake in bench/fake_llm.py
+LLM_BASE_URL = os.environ.get("STUDENT_TRACKER_LLM_BASE_URL", "")
 EVAL_MODEL = "claude-sonnet-4-5-20250929"  # Upgraded to Sonnet 4.5 for better feedback
 PROMPT_VERSION = "2.0"
 
@@ -38,8 +44,12 @@ Write feedback in Joe's voice:
 """
 
 
-def get_client() -> anthropic.Anthropic:
-    """Get Anthropic client."""
+def get_client() -> "anthropic.Anthropic":
+    """Get Anthropic client (pointed at LLM_BASE_URL when that is set)."""
+    import anthropic  # slow to import; only commands that call the API need it
+
+    if LLM_BASE_URL:
+        return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY or "local", base_url=LLM_BASE_URL)
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY environment variable not set")
     return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
@@ -365,7 +375,8 @@ Respond ONLY with the JSON object, no other text."""
 def evaluate_submission(
     submission_id: int,
     force: bool = False,
-    custom_rubric: dict = None
+    custom_rubric: dict = None,
+    report: Optional[dict] = None
 ) -> Optional[int]:
     """
     Evaluate a submission using Claude Sonnet.
@@ -374,15 +385,21 @@ def evaluate_submission(
         submission_id: Database ID of the submission to evaluate
         force: If True, create new evaluation even if one exists
         custom_rubric: Optional custom rubric to use instead of default
+        report: Optional dict filled with score, token usage and any error
+            (used for progress reporting)
 
     Returns:
         Evaluation ID or None if evaluation failed
     """
+    if report is None:
+        report = {}
+
     session = get_session()
 
     submission = session.query(Submission).get(submission_id)
     if not submission:
         print(f"Submission {submission_id} not found")
+        report["error"] = "Submission not found"
         session.close()
         return None
 
@@ -406,6 +423,7 @@ def evaluate_submission(
     assignment = submission.assignment
     if not submission.content:
         print(f"Submission {submission_id} has no content to evaluate")
+        report["error"] = "No content to evaluate"
         session.close()
         return None
 
@@ -430,11 +448,18 @@ def evaluate_submission(
     # Call Haiku
     try:
         client = get_client()
-        response = client.messages.create(
-            model=EVAL_MODEL,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("evaluator", EVAL_MODEL) as call:
+            response = client.messages.create(
+                model=EVAL_MODEL,
+                max_tokens=2000,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            report["input_tokens"] = usage.input_tokens
+            report["output_tokens"] = usage.output_tokens
 
         # Parse response
         response_text = response.content[0].text
@@ -469,6 +494,9 @@ def evaluate_submission(
         eval_id = evaluation.id
         score = result.get('overall_score')
 
+        report["score"] = score
+        report["points_possible"] = assignment.points_possible
+
         print(f"Evaluated submission {submission_id}: {score}/{assignment.points_possible}")
         session.close()
 
@@ -477,10 +505,12 @@ def evaluate_submission(
 
     except json.JSONDecodeError as e:
         print(f"Failed to parse Haiku response: {e}")
+        report["error"] = f"Could not parse response: {e}"
         session.close()
         return None
     except Exception as e:
         print(f"Evaluation failed: {e}")
+        report["error"] = str(e)
         session.close()
         return None
 
@@ -627,11 +657,13 @@ Respond ONLY with the JSON object, no other text."""
     # Call API
     try:
         client = get_client()
-        response = client.messages.create(
-            model=EVAL_MODEL,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("evaluator", EVAL_MODEL) as call:
+            response = client.messages.create(
+                model=EVAL_MODEL,
+                max_tokens=2000,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         # Parse response
         response_text = response.content[0].text
@@ -686,49 +718,111 @@ Respond ONLY with the JSON object, no other text."""
         return None
 
 
-def evaluate_all_pending(
+def _pending_evaluations_query(session, assignment_id: Optional[int] = None):
+    """Submissions with content and no final evaluation, oldest first."""
+    query = session.query(Submission).filter(Submission.needs_evaluation == True)
+    if assignment_id:
+        query = query.filter(Submission.assignment_id == assignment_id)
+    return query
+
+
+def get_pending_evaluations(
     assignment_id: Optional[int] = None,
-    limit: int = 50
-) -> list[Evaluation]:
+    limit: int = 50,
+    offset: int = 0
+) -> list[dict]:
     """
-    Evaluate all submissions that don't have final evaluations.
+    Get a page of the evaluation work list.
+
+    Reads the maintained Submission.needs_evaluation flag through its partial
+    index, so the cost depends on the number of pending submissions rather
+    than the total number of submissions.
 
     Args:
         assignment_id: Optional filter to specific assignment
-        limit: Maximum number of submissions to evaluate
+        limit: Maximum number of submissions to return
+        offset: Number of pending submissions to skip
 
     Returns:
-        List of created Evaluation objects
+        List of dicts with id, student_name, assignment_name, submitted_at
     """
     session = get_session()
+    try:
+        rows = _pending_evaluations_query(session, assignment_id).join(
+            Student, Submission.student_id == Student.id
+        ).join(
+            Assignment, Submission.assignment_id == Assignment.id
+        ).with_entities(
+            Submission.id, Student.name, Assignment.name, Submission.submitted_at
+        ).order_by(
+            Submission.submitted_at, Submission.id
+        ).offset(offset).limit(limit).all()
+
+        return [{
+            "id": row[0],
+            "student_name": row[1],
+            "assignment_name": row[2],
+            "submitted_at": row[3]
+        } for row in rows]
+    finally:
+        session.close()
 
-    # Find submissions without final evaluations
-    query = session.query(Submission).filter(
-        Submission.content.isnot(None),
-        Submission.content != ""
-    )
 
-    if assignment_id:
-        query = query.filter(Submission.assignment_id == assignment_id)
+def count_pending_evaluations(assignment_id: Optional[int] = None) -> int:
+    """Count submissions that still need a final evaluation."""
+    session = get_session()
+    try:
+        return _pending_evaluations_query(session, assignment_id).count()
+    finally:
+        session.close()
 
-    # Exclude submissions that already have final evaluations
-    evaluated_ids = session.query(Evaluation.submission_id).filter(
-        Evaluation.is_final == True
-    ).scalar_subquery()
 
-    query = query.filter(~Submission.id.in_(evaluated_ids))
+def evaluate_all_pending(
+    assignment_id: Optional[int] = None,
+    limit: int = 50,
+    progress_callback: Optional[Callable[[dict], None]] = None
+) -> list[Evaluation]:
+    """
+    Evaluate all submissions that don't have final evaluations.
 
-    submissions = query.limit(limit).all()
-    session.close()
+    Args:
+        assignment_id: Optional filter to specific assignment
+        limit: Maximum number of submissions to evaluate
+        progress_callback: Optional callable receiving one event dict per
+            evaluated submission (see progress.py)
+
+    Returns:
+        List of created Evaluation objects
+    """
+    submissions = get_pending_evaluations(assignment_id=assignment_id, limit=limit)
 
     print(f"Found {len(submissions)} submissions to evaluate")
+    if progress_callback:
+        progress_callback({"type": "start", "total": len(submissions)})
 
     evaluations = []
     for sub in submissions:
-        eval_result = evaluate_submission(sub.id)
+        report = {}
+        started = time.monotonic()
+        eval_result = evaluate_submission(sub["id"], report=report)
         if eval_result:
             evaluations.append(eval_result)
 
+        if progress_callback:
+            progress_callback({
+                "type": "item",
+                "status": "evaluated" if eval_result else "failed",
+                "submission_id": sub["id"],
+                "student_name": sub["student_name"],
+                "assignment_name": sub["assignment_name"],
+                "score": report.get("score"),
+                "points_possible": report.get("points_possible"),
+                "error": report.get("error"),
+                "input_tokens": report.get("input_tokens"),
+                "output_tokens": report.get("output_tokens"),
+                "seconds": round(time.monotonic() - started, 2)
+            })
+
     print(f"Completed {len(evaluations)} evaluations")
     return evaluations
 
@@ -763,11 +857,13 @@ def batch_evaluate_text(
 
         try:
             client = get_client()
-            response = client.messages.create(
-                model=EVAL_MODEL,
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with metrics.track_llm_call("evaluator", EVAL_MODEL) as call:
+                response = client.messages.create(
+                    model=EVAL_MODEL,
+                    max_tokens=2000,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                call.record(response)
 
             result = json.loads(response.content[0].text)
             result["student_name"] = item.get("student_name", "Unknown")
@@ -5,18 +5,60 @@ This module handles:
 - Adding AI-generated feedback to the review queue
 - Instructor review and approval workflow
 - Publishing approved feedback to Canvas
+
+Approved feedback forms an outbox: approving only marks an item ready, and
+the publisher worker (run_publisher(), `cli publish --worker`) drains it,
+leasing each item, retrying failures with backoff and dead-lettering items
+that keep failing.
 """
 
-from datetime import datetime
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy import func, insert, or_, tuple_
+from sqlalchemy.orm import load_only
 from .models import (
     get_session, FeedbackQueue, FeedbackQueueStatus, FeedbackType,
-    Student, Submission, Assignment, Evaluation
+    PublishAttempt, Student, Submission, Assignment, Evaluation
 )
 from .canvas_fetcher import (
     post_submission_comment, create_discussion_topic,
-    post_discussion_entry, create_announcement
+    post_discussion_entry, create_announcement,
+    fetch_submission_comments, find_discussion_topic
 )
+from . import metrics
+
+# Statuses of feedback still on its way to Canvas; a submission with one of
+# these doesn't get another generated
+ACTIVE_STATUSES = [
+    FeedbackQueueStatus.PENDING.value,
+    FeedbackQueueStatus.APPROVED.value,
+    FeedbackQueueStatus.EDITED.value,
+    FeedbackQueueStatus.FAILED.value
+]
+
+# Statuses that are ready to publish
+PUBLISHABLE_STATUSES = [FeedbackQueueStatus.APPROVED.value, FeedbackQueueStatus.EDITED.value]
+
+# Canvas posts in flight at once in the publisher worker and publish_all_approved()
+PUBLISH_CONCURRENCY = int(os.environ.get("STUDENT_TRACKER_PUBLISH_CONCURRENCY", "4"))
+
+# A publish claim (lease) older than this is treated as abandoned (crashed publisher)
+PUBLISH_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Give up on an item (status FAILED) after this many failed attempts
+PUBLISH_MAX_ATTEMPTS = int(os.environ.get("STUDENT_TRACKER_PUBLISH_MAX_ATTEMPTS", "5"))
+
+# Delay before retrying after the first failure, doubling up to PUBLISH_RETRY_MAX
+PUBLISH_RETRY_BASE = timedelta(seconds=30)
+PUBLISH_RETRY_MAX = timedelta(hours=1)
+
+# How often an idle publisher worker checks for newly approved feedback
+PUBLISH_POLL_SECONDS = float(os.environ.get("STUDENT_TRACKER_PUBLISH_POLL_SECONDS", "2"))
 
 
 def queue_submission_feedback(
@@ -54,6 +96,7 @@ def queue_submission_feedback(
 
     session.add(feedback)
     session.commit()
+    queue_counts.move(None, FeedbackQueueStatus.PENDING.value)
 
     feedback_id = feedback.id
     session.close()
@@ -97,6 +140,7 @@ def queue_class_insight(
 
     session.add(feedback)
     session.commit()
+    queue_counts.move(None, FeedbackQueueStatus.PENDING.value)
 
     feedback_id = feedback.id
     session.close()
@@ -105,21 +149,54 @@ def queue_class_insight(
     return feedback
 
 
-def get_pending_feedback(limit: int = 50) -> list[dict]:
+def _feedback_query(session):
+    """Feedback items with their student and assignment (names and Canvas ids) in one query."""
+    return session.query(
+        FeedbackQueue, Student.name, Student.canvas_id, Assignment.name, Assignment.canvas_id
+    ).outerjoin(
+        Student, FeedbackQueue.student_id == Student.id
+    ).outerjoin(
+        Submission, FeedbackQueue.submission_id == Submission.id
+    ).outerjoin(
+        Assignment, Submission.assignment_id == Assignment.id
+    )
+
+
+def _parse_feedback_cursor(cursor: str) -> tuple[datetime, int]:
+    """Split a "<created_at>_<id>" cursor from get_pending_feedback()."""
+    created_at, _, feedback_id = cursor.rpartition("_")
+    return datetime.fromisoformat(created_at), int(feedback_id)
+
+
+def get_pending_feedback(limit: int = 50, before: Optional[str] = None) -> list[dict]:
     """
-    Get all pending feedback items awaiting review.
+    Get a page of pending feedback items awaiting review, newest first.
+
+    Pages by keyset on (created_at, id) rather than offset, so later pages
+    cost the same as the first however long the queue gets.
+
+    Args:
+        limit: Maximum number of items to return
+        before: The "cursor" of the last item on the previous page
 
     Returns a list of dicts with feedback details and related info.
     """
     session = get_session()
 
-    pending = session.query(FeedbackQueue).filter(
+    query = _feedback_query(session).filter(
         FeedbackQueue.status == FeedbackQueueStatus.PENDING.value
-    ).order_by(FeedbackQueue.created_at.desc()).limit(limit).all()
+    )
+    if before:
+        query = query.filter(
+            tuple_(FeedbackQueue.created_at, FeedbackQueue.id) < _parse_feedback_cursor(before)
+        )
+    rows = query.order_by(
+        FeedbackQueue.created_at.desc(), FeedbackQueue.id.desc()
+    ).limit(limit).all()
 
     results = []
-    for fb in pending:
-        item = {
+    for fb, student_name, _, assignment_name, _ in rows:
+        results.append({
             "id": fb.id,
             "type": fb.feedback_type,
             "title": fb.title,
@@ -127,21 +204,11 @@ def get_pending_feedback(limit: int = 50) -> list[dict]:
             "original_content": fb.original_content,
             "generated_by": fb.generated_by,
             "created_at": fb.created_at.isoformat() if fb.created_at else None,
-            "student_name": None,
-            "assignment_name": None
-        }
-
-        if fb.student_id:
-            student = session.query(Student).get(fb.student_id)
-            if student:
-                item["student_name"] = student.name
-
-        if fb.submission_id:
-            submission = session.query(Submission).get(fb.submission_id)
-            if submission and submission.assignment:
-                item["assignment_name"] = submission.assignment.name
-
-        results.append(item)
+            "updated_at": fb.updated_at.isoformat() if fb.updated_at else None,
+            "student_name": student_name,
+            "assignment_name": assignment_name,
+            "cursor": f"{fb.created_at.isoformat()}_{fb.id}" if fb.created_at else None
+        })
 
     session.close()
     return results
@@ -151,12 +218,13 @@ def get_feedback_by_id(feedback_id: int) -> Optional[dict]:
     """Get a single feedback item by ID."""
     session = get_session()
 
-    fb = session.query(FeedbackQueue).get(feedback_id)
-    if not fb:
-        session.close()
+    row = _feedback_query(session).filter(FeedbackQueue.id == feedback_id).first()
+    session.close()
+    if not row:
         return None
 
-    item = {
+    fb, student_name, student_canvas_id, assignment_name, assignment_canvas_id = row
+    return {
         "id": fb.id,
         "type": fb.feedback_type,
         "title": fb.title,
@@ -165,231 +233,760 @@ def get_feedback_by_id(feedback_id: int) -> Optional[dict]:
         "status": fb.status,
         "generated_by": fb.generated_by,
         "created_at": fb.created_at.isoformat() if fb.created_at else None,
+        "updated_at": fb.updated_at.isoformat() if fb.updated_at else None,
         "student_id": fb.student_id,
         "submission_id": fb.submission_id,
-        "student_name": None,
-        "assignment_name": None,
-        "student_canvas_id": None,
-        "assignment_canvas_id": None
+        "student_name": student_name,
+        "assignment_name": assignment_name,
+        "student_canvas_id": student_canvas_id,
+        "assignment_canvas_id": assignment_canvas_id
     }
 
-    if fb.student_id:
-        student = session.query(Student).get(fb.student_id)
-        if student:
-            item["student_name"] = student.name
-            item["student_canvas_id"] = student.canvas_id
-
-    if fb.submission_id:
-        submission = session.query(Submission).get(fb.submission_id)
-        if submission and submission.assignment:
-            item["assignment_name"] = submission.assignment.name
-            item["assignment_canvas_id"] = submission.assignment.canvas_id
-
-    session.close()
-    return item
-
 
 def update_feedback_content(feedback_id: int, new_content: str, new_title: str = None) -> bool:
     """
     Update the content of a feedback item (instructor edit).
 
-    Sets status to EDITED if content was changed.
+    Sets status to EDITED if content was changed. Like bulk_update_feedback(),
+    leaves published items and items a publisher is posting alone; returns
+    False for those as for a missing item.
     """
-    session = get_session()
+    if _update_one(feedback_id, "edit", content=new_content, title=new_title):
+        print(f"Updated feedback #{feedback_id}")
+        return True
+    return False
 
-    fb = session.query(FeedbackQueue).get(feedback_id)
-    if not fb:
-        session.close()
-        return False
 
-    fb.content = new_content
-    if new_title is not None:
-        fb.title = new_title
+def approve_feedback(feedback_id: int) -> bool:
+    """Mark feedback as approved (ready to publish), unless published or being posted."""
+    if _update_one(feedback_id, "approve"):
+        print(f"Approved feedback #{feedback_id}")
+        return True
+    return False
 
-    if fb.content != fb.original_content:
-        fb.status = FeedbackQueueStatus.EDITED.value
 
-    fb.updated_at = datetime.utcnow()
-    session.commit()
-    session.close()
+def reject_feedback(feedback_id: int) -> bool:
+    """Mark feedback as rejected, unless published or being posted."""
+    if _update_one(feedback_id, "reject"):
+        print(f"Rejected feedback #{feedback_id}")
+        return True
+    return False
 
-    print(f"Updated feedback #{feedback_id}")
-    return True
 
+def _update_one(feedback_id: int, action: str, **values) -> bool:
+    """One change through the bulk path's guarded UPDATE, without a version check."""
+    result = _apply_feedback_changes([{"id": feedback_id, "action": action, **values}])
+    if result["conflicts"]:
+        print(f"Feedback #{feedback_id} not changed: published or being published "
+              f"(status {result['conflicts'][0]['status']})")
+    return bool(result["updated"])
 
-def approve_feedback(feedback_id: int) -> bool:
-    """Mark feedback as approved (ready to publish)."""
-    session = get_session()
 
-    fb = session.query(FeedbackQueue).get(feedback_id)
-    if not fb:
-        session.close()
-        return False
+BULK_ACTIONS = ("approve", "reject", "edit")
 
-    fb.status = FeedbackQueueStatus.APPROVED.value
-    fb.reviewed_at = datetime.utcnow()
-    session.commit()
-    session.close()
 
-    print(f"Approved feedback #{feedback_id}")
-    return True
+def bulk_update_feedback(changes: list[dict]) -> dict:
+    """
+    Approve, reject or edit many feedback items in one transaction.
+
+    Each change is {"id", "action", "updated_at", "content", "title"}, where
+    action is "approve", "reject" or "edit" and content/title are optional
+    edits (applied before approving). updated_at is the version the reviewer
+    saw, as returned by get_pending_feedback(); if the item has changed since
+    (another reviewer, a publish) the change is skipped and reported as a
+    conflict. Published items, and items a publisher is posting, are never
+    changed.
+
+    Returns:
+        Dict with updated ({id: new updated_at}), conflicts ([{id, status,
+        updated_at}]) and missing ([id])
+    """
+    result = _apply_feedback_changes(changes)
+    print(f"Bulk update: {len(result['updated'])} changed, {len(result['conflicts'])} conflicts, "
+          f"{len(result['missing'])} missing")
+    return result
 
 
-def reject_feedback(feedback_id: int) -> bool:
-    """Mark feedback as rejected."""
+def _apply_feedback_changes(changes: list[dict]) -> dict:
+    for change in changes:
+        if change.get("action") not in BULK_ACTIONS:
+            raise ValueError(f"Unknown action {change.get('action')!r} for feedback {change.get('id')}")
+        if change["action"] == "edit" and not change.get("content"):
+            raise ValueError(f"Content is required to edit feedback {change.get('id')}")
+
     session = get_session()
+    try:
+        ids = [int(change["id"]) for change in changes]
+        items = {
+            row.id: row for row in session.query(
+                FeedbackQueue.id, FeedbackQueue.status, FeedbackQueue.original_content,
+                FeedbackQueue.updated_at
+            ).filter(FeedbackQueue.id.in_(ids))
+        }
 
-    fb = session.query(FeedbackQueue).get(feedback_id)
-    if not fb:
+        now = datetime.utcnow()
+        moves = []
+        conflicts = []
+        missing = []
+        changed = []
+        for change in changes:
+            feedback_id = int(change["id"])
+            fb = items.get(feedback_id)
+            if not fb:
+                missing.append(feedback_id)
+                continue
+
+            seen = change.get("updated_at")
+            values = {}
+            if change.get("content"):
+                values["content"] = change["content"]
+                if change["content"] != fb.original_content:
+                    values["status"] = FeedbackQueueStatus.EDITED.value
+            if change.get("title") is not None:
+                values["title"] = change["title"]
+            if change["action"] == "approve":
+                values.update(status=FeedbackQueueStatus.APPROVED.value, reviewed_at=now)
+                if fb.status == FeedbackQueueStatus.FAILED.value:
+                    values.update(publish_attempts=0, next_attempt_at=None)
+            elif change["action"] == "reject":
+                values.update(status=FeedbackQueueStatus.REJECTED.value, reviewed_at=now)
+            values["updated_at"] = now
+
+            # The version check is part of the UPDATE, so a change committed
+            # by someone else after the read above still counts as a conflict.
+            # Items a publisher is posting right now are left alone too.
+            applied = 0
+            if fb.status != FeedbackQueueStatus.PUBLISHED.value and (
+                not seen or fb.updated_at == datetime.fromisoformat(seen)
+            ):
+                applied = session.query(FeedbackQueue).filter(
+                    FeedbackQueue.id == feedback_id,
+                    FeedbackQueue.updated_at == fb.updated_at,
+                    FeedbackQueue.status != FeedbackQueueStatus.PUBLISHED.value,
+                    or_(
+                        FeedbackQueue.publish_started_at.is_(None),
+                        FeedbackQueue.publish_started_at < now - PUBLISH_CLAIM_TIMEOUT
+                    )
+                ).update(values, synchronize_session=False)
+
+            if not applied:
+                current = session.query(FeedbackQueue.status, FeedbackQueue.updated_at).filter(
+                    FeedbackQueue.id == feedback_id
+                ).first() or fb
+                conflicts.append({
+                    "id": feedback_id,
+                    "status": current.status,
+                    "updated_at": current.updated_at.isoformat() if current.updated_at else None
+                })
+                continue
+
+            moves.append((fb.status, values.get("status", fb.status)))
+            changed.append(feedback_id)
+
+        session.commit()
+    finally:
         session.close()
-        return False
 
-    fb.status = FeedbackQueueStatus.REJECTED.value
-    fb.reviewed_at = datetime.utcnow()
-    session.commit()
-    session.close()
+    for previous, status in moves:
+        queue_counts.move(previous, status)
 
-    print(f"Rejected feedback #{feedback_id}")
-    return True
+    return {
+        "updated": {feedback_id: now.isoformat() for feedback_id in changed},
+        "conflicts": conflicts,
+        "missing": missing
+    }
 
 
-def publish_feedback(feedback_id: int) -> dict:
+def _publish_jobs(
+    session,
+    feedback_ids: Optional[list[int]] = None,
+    due: bool = False,
+    limit: Optional[int] = None,
+    exclude: Optional[set[int]] = None
+) -> list[dict]:
     """
-    Publish approved feedback to Canvas.
+    Load publishable feedback with every Canvas ID it needs, in one query.
 
-    Returns the Canvas API response or error details.
+    The jobs are plain dicts so workers can post them without touching the
+    session.
+
+    Args:
+        feedback_ids: Only these items
+        due: Skip items that are backing off after a failure or claimed by
+            another publisher
+        limit: Maximum number of jobs, oldest first
+        exclude: Item IDs to leave out (already in flight here)
     """
-    session = get_session()
+    query = _feedback_query(session).filter(FeedbackQueue.status.in_(PUBLISHABLE_STATUSES))
+    if feedback_ids is not None:
+        query = query.filter(FeedbackQueue.id.in_(feedback_ids))
+    if due:
+        now = datetime.utcnow()
+        query = query.filter(
+            or_(FeedbackQueue.next_attempt_at.is_(None), FeedbackQueue.next_attempt_at <= now),
+            or_(
+                FeedbackQueue.publish_started_at.is_(None),
+                FeedbackQueue.publish_started_at < now - PUBLISH_CLAIM_TIMEOUT
+            )
+        )
+    if exclude:
+        query = query.filter(FeedbackQueue.id.notin_(exclude))
+    query = query.order_by(FeedbackQueue.id)
+    if limit:
+        query = query.limit(limit)
+
+    return [{
+        "id": fb.id,
+        "feedback_type": fb.feedback_type,
+        "status": fb.status,
+        "title": fb.title,
+        "content": fb.content,
+        "discussion_topic_id": fb.discussion_topic_id,
+        "submission_id": fb.submission_id,
+        "last_error": fb.last_error,
+        "student_canvas_id": student_canvas_id,
+        "assignment_canvas_id": assignment_canvas_id
+    } for fb, _, student_canvas_id, _, assignment_canvas_id in query]
 
-    fb = session.query(FeedbackQueue).get(feedback_id)
-    if not fb:
-        session.close()
-        return {"error": "Feedback not found"}
 
-    if fb.status not in [FeedbackQueueStatus.APPROVED.value, FeedbackQueueStatus.EDITED.value]:
+def _claim_for_publish(feedback_id: int) -> Optional[dict]:
+    """
+    Lease an item for publishing before posting it.
+
+    The lease is committed before the Canvas call, so a crash mid-call
+    leaves a record that the post may have gone through. Other publishers
+    skip a leased item until the lease is PUBLISH_CLAIM_TIMEOUT old, and
+    reviewers can't edit it (see bulk_update_feedback()), so the text read
+    with the claim is the text to post.
+
+    Returns:
+        Dict with earlier_attempts (for deciding whether to reconcile) and
+        the item's current status, title and content, or None if the item
+        is no longer publishable or another publisher holds it
+    """
+    now = datetime.utcnow()
+    session = get_session()
+    try:
+        claimed = session.query(FeedbackQueue).filter(
+            FeedbackQueue.id == feedback_id,
+            FeedbackQueue.status.in_(PUBLISHABLE_STATUSES),
+            or_(
+                FeedbackQueue.publish_started_at.is_(None),
+                FeedbackQueue.publish_started_at < now - PUBLISH_CLAIM_TIMEOUT
+            )
+        ).update({
+            FeedbackQueue.publish_started_at: now,
+            FeedbackQueue.publish_attempts: FeedbackQueue.publish_attempts + 1
+        }, synchronize_session=False)
+        if not claimed:
+            session.rollback()
+            return None
+
+        # Read in the claim's transaction: an edit made since the job was
+        # loaded is what gets posted, not the text loaded with the job
+        current = session.query(
+            FeedbackQueue.publish_attempts, FeedbackQueue.status, FeedbackQueue.title, FeedbackQueue.content
+        ).filter(FeedbackQueue.id == feedback_id).one()
+        session.commit()
+        return {
+            "earlier_attempts": current.publish_attempts - 1,
+            "status": current.status,
+            "title": current.title,
+            "content": current.content
+        }
+    finally:
         session.close()
-        return {"error": f"Feedback must be approved first (current status: {fb.status})"}
 
-    result = {"error": "Unknown feedback type"}
 
-    try:
-        if fb.feedback_type == FeedbackType.SUBMISSION_COMMENT.value:
-            # Get Canvas IDs
-            submission = session.query(Submission).get(fb.submission_id)
-            if not submission:
-                session.close()
-                return {"error": "Submission not found"}
-
-            student = session.query(Student).get(fb.student_id)
-            if not student or not student.canvas_id:
-                session.close()
-                return {"error": "Student Canvas ID not found"}
-
-            if not submission.assignment or not submission.assignment.canvas_id:
-                session.close()
-                return {"error": "Assignment Canvas ID not found"}
-
-            result = post_submission_comment(
-                assignment_canvas_id=submission.assignment.canvas_id,
-                student_canvas_id=student.canvas_id,
-                comment_text=fb.content
-            )
+def _unpublishable(job: dict) -> Optional[str]:
+    """Why a job can never be posted as it stands (retrying won't help), if so."""
+    if job["feedback_type"] == FeedbackType.SUBMISSION_COMMENT.value:
+        if not job["submission_id"]:
+            return "Submission not found"
+        if not job["student_canvas_id"]:
+            return "Student Canvas ID not found"
+        if not job["assignment_canvas_id"]:
+            return "Assignment Canvas ID not found"
+    elif job["feedback_type"] == FeedbackType.DISCUSSION_ENTRY.value:
+        if not job["discussion_topic_id"]:
+            return "No discussion topic ID specified"
+    elif job["feedback_type"] not in (FeedbackType.DISCUSSION_POST.value, FeedbackType.ANNOUNCEMENT.value):
+        return "Unknown feedback type"
+    return None
+
+
+def _reconcile(job: dict) -> Optional[dict]:
+    """
+    Look for the post an earlier attempt may already have made.
 
-        elif fb.feedback_type == FeedbackType.DISCUSSION_POST.value:
-            result = create_discussion_topic(
-                title=fb.title or "Class Insight",
-                message=fb.content
-            )
+    Returns the Canvas object if found. Discussion entries can't be looked
+    up cheaply, so they are posted again.
+    """
+    if job["feedback_type"] == FeedbackType.SUBMISSION_COMMENT.value:
+        submission = fetch_submission_comments(job["assignment_canvas_id"], job["student_canvas_id"])
+        comments = submission.get("submission_comments") or []
+        if any((c.get("comment") or "").strip() == job["content"].strip() for c in comments):
+            return submission
+
+    elif job["feedback_type"] == FeedbackType.DISCUSSION_POST.value:
+        return find_discussion_topic(job["title"] or "Class Insight", job["content"])
+
+    elif job["feedback_type"] == FeedbackType.ANNOUNCEMENT.value:
+        return find_discussion_topic(job["title"] or "Course Announcement", job["content"], is_announcement=True)
+
+    return None
+
+
+def _post(job: dict) -> dict:
+    """Post one job (already checked by _unpublishable) to Canvas."""
+    if job["feedback_type"] == FeedbackType.SUBMISSION_COMMENT.value:
+        return post_submission_comment(
+            assignment_canvas_id=job["assignment_canvas_id"],
+            student_canvas_id=job["student_canvas_id"],
+            comment_text=job["content"]
+        )
+
+    elif job["feedback_type"] == FeedbackType.DISCUSSION_POST.value:
+        return create_discussion_topic(
+            title=job["title"] or "Class Insight",
+            message=job["content"]
+        )
+
+    elif job["feedback_type"] == FeedbackType.ANNOUNCEMENT.value:
+        return create_announcement(
+            title=job["title"] or "Course Announcement",
+            message=job["content"]
+        )
+
+    return post_discussion_entry(
+        topic_id=job["discussion_topic_id"],
+        message=job["content"]
+    )
 
-        elif fb.feedback_type == FeedbackType.ANNOUNCEMENT.value:
-            result = create_announcement(
-                title=fb.title or "Course Announcement",
-                message=fb.content
-            )
 
-        elif fb.feedback_type == FeedbackType.DISCUSSION_ENTRY.value:
-            if not fb.discussion_topic_id:
-                session.close()
-                return {"error": "No discussion topic ID specified"}
+def _retry_delay(attempt: int) -> timedelta:
+    """Backoff before retrying after the given (1-based) failed attempt, with jitter."""
+    delay = min(PUBLISH_RETRY_BASE * 2 ** (attempt - 1), PUBLISH_RETRY_MAX)
+    return delay * random.uniform(0.5, 1.0)
 
-            result = post_discussion_entry(
-                topic_id=fb.discussion_topic_id,
-                message=fb.content
-            )
 
-        # Mark as published
-        if "error" not in result:
-            fb.status = FeedbackQueueStatus.PUBLISHED.value
-            fb.published_at = datetime.utcnow()
-            fb.canvas_response_id = str(result.get("id", ""))
-            session.commit()
+def _publish_job(job: dict) -> dict:
+    """
+    Claim, (reconcile,) post and record one job. Safe to run concurrently.
+
+    A failed attempt is retried after an exponential backoff; after
+    PUBLISH_MAX_ATTEMPTS failures, or straight away if the item can never be
+    posted, it is marked FAILED (the dead letter status). Every attempt is
+    logged in publish_attempts.
+    """
+    started = datetime.utcnow()
+    claim = _claim_for_publish(job["id"])
+    if claim is None:
+        return {"error": "Already published or being published", "skipped": True}
+    earlier_attempts = claim.pop("earlier_attempts")
+    # Post (and reconcile against) the text as of the claim
+    job = dict(job, **claim)
+
+    result = None
+    permanent = _unpublishable(job)
+    if permanent:
+        result = {"error": permanent}
+    else:
+        try:
+            # An earlier attempt may have reached Canvas even if it failed
+            if earlier_attempts or job["last_error"]:
+                existing = _reconcile(job)
+                if existing:
+                    result = dict(existing, reconciled=True)
+            if result is None:
+                result = _post(job)
+        except Exception as e:
+            result = {"error": str(e)}
+
+    attempt = earlier_attempts + 1
+    finished = datetime.utcnow()
+    failed = "error" in result
+    status = job["status"]
+    values = {FeedbackQueue.publish_started_at: None}
+    if not failed:
+        status = FeedbackQueueStatus.PUBLISHED.value
+        values.update({
+            FeedbackQueue.published_at: finished,
+            FeedbackQueue.canvas_response_id: str(result.get("id", "")),
+            FeedbackQueue.next_attempt_at: None,
+            FeedbackQueue.last_error: None
+        })
+    else:
+        values[FeedbackQueue.last_error] = result["error"]
+        if permanent or attempt >= PUBLISH_MAX_ATTEMPTS:
+            status = FeedbackQueueStatus.FAILED.value
+            values[FeedbackQueue.next_attempt_at] = None
+            result["dead_letter"] = True
+        else:
+            values[FeedbackQueue.next_attempt_at] = finished + _retry_delay(attempt)
+            result["retry_at"] = values[FeedbackQueue.next_attempt_at].isoformat()
+    if status != job["status"]:
+        values[FeedbackQueue.status] = status
 
-    except Exception as e:
-        result = {"error": str(e)}
+    session = get_session()
+    try:
+        session.query(FeedbackQueue).filter(FeedbackQueue.id == job["id"]).update(
+            values, synchronize_session=False
+        )
+        session.add(PublishAttempt(
+            feedback_id=job["id"],
+            attempt=attempt,
+            started_at=started,
+            finished_at=finished,
+            success=not failed,
+            reconciled=bool(result.get("reconciled")),
+            error=result.get("error"),
+            canvas_response_id=None if failed else str(result.get("id", ""))
+        ))
+        session.commit()
+    finally:
+        session.close()
 
-    session.close()
+    queue_counts.move(job["status"], status)
+    metrics.FEEDBACK_PUBLISHED.labels(
+        feedback_type=job["feedback_type"],
+        result="failure" if failed else "success"
+    ).inc()
     return result
 
 
-def publish_all_approved() -> dict:
-    """Publish all approved feedback items to Canvas."""
+def publish_feedback(feedback_id: int) -> dict:
+    """
+    Publish approved feedback to Canvas now, in this process.
+
+    The dashboard leaves this to the publisher worker (request_publish());
+    this is for scripts and the CLI. Returns the Canvas API response or
+    error details.
+    """
     session = get_session()
 
-    approved = session.query(FeedbackQueue).filter(
-        FeedbackQueue.status.in_([
-            FeedbackQueueStatus.APPROVED.value,
-            FeedbackQueueStatus.EDITED.value
-        ])
-    ).all()
+    fb = session.query(FeedbackQueue).get(feedback_id)
+    if not fb:
+        session.close()
+        return {"error": "Feedback not found"}
+
+    if fb.status not in PUBLISHABLE_STATUSES:
+        session.close()
+        return {"error": f"Feedback must be approved first (current status: {fb.status})"}
+
+    jobs = _publish_jobs(session, [feedback_id])
+    session.close()
+
+    if not jobs:
+        return {"error": "Feedback not found"}
+    return _publish_job(jobs[0])
+
 
+def publish_all_approved() -> dict:
+    """
+    Publish all approved feedback items to Canvas now, including any that
+    are backing off after a failure.
+
+    Canvas IDs are resolved for every item in one query up front, then items
+    are posted PUBLISH_CONCURRENCY at a time. Each item is claimed before its
+    post. An item whose earlier attempt may have reached Canvas is checked
+    against Canvas first, so a retry after a crash doesn't post twice.
+    """
+    session = get_session()
+    jobs = _publish_jobs(session)
     session.close()
 
     results = {
         "success": 0,
         "failed": 0,
+        "skipped": 0,
+        "reconciled": 0,
         "errors": []
     }
+    if not jobs:
+        return results
 
-    for fb in approved:
-        result = publish_feedback(fb.id)
-        if "error" in result:
+    with ThreadPoolExecutor(max_workers=max(1, PUBLISH_CONCURRENCY)) as pool:
+        outcomes = list(pool.map(_publish_job, jobs))
+
+    for job, result in zip(jobs, outcomes):
+        if result.get("skipped"):
+            results["skipped"] += 1
+        elif "error" in result:
             results["failed"] += 1
             results["errors"].append({
-                "id": fb.id,
+                "id": job["id"],
                 "error": result["error"]
             })
         else:
             results["success"] += 1
+            if result.get("reconciled"):
+                results["reconciled"] += 1
 
     return results
 
 
-def get_feedback_stats() -> dict:
-    """Get statistics about the feedback queue."""
+def request_publish(feedback_ids: Optional[list[int]] = None) -> int:
+    """
+    Ask the publisher worker to post approved feedback as soon as it can.
+
+    Approved items are already in the outbox; this only clears the backoff
+    of any that failed before, so the next poll picks them up. Returns
+    immediately without calling Canvas.
+
+    Args:
+        feedback_ids: Items to publish, or None for every approved item
+
+    Returns:
+        Number of publishable items matched
+    """
+    session = get_session()
+    try:
+        query = session.query(FeedbackQueue).filter(FeedbackQueue.status.in_(PUBLISHABLE_STATUSES))
+        if feedback_ids is not None:
+            query = query.filter(FeedbackQueue.id.in_(feedback_ids))
+        matched = query.count()
+        query.filter(FeedbackQueue.next_attempt_at.isnot(None)).update(
+            {FeedbackQueue.next_attempt_at: None}, synchronize_session=False
+        )
+        session.commit()
+    finally:
+        session.close()
+    return matched
+
+
+def retry_failed(feedback_ids: Optional[list[int]] = None) -> int:
+    """
+    Put dead-lettered (FAILED) feedback back in the outbox.
+
+    The attempt count starts again, but the last error is kept, so the first
+    retry still checks Canvas for an earlier post before posting.
+
+    Returns:
+        Number of items requeued
+    """
     session = get_session()
+    try:
+        query = session.query(FeedbackQueue).filter(
+            FeedbackQueue.status == FeedbackQueueStatus.FAILED.value
+        )
+        if feedback_ids is not None:
+            query = query.filter(FeedbackQueue.id.in_(feedback_ids))
+        requeued = query.update({
+            FeedbackQueue.status: FeedbackQueueStatus.APPROVED.value,
+            FeedbackQueue.publish_attempts: 0,
+            FeedbackQueue.next_attempt_at: None
+        }, synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
 
-    stats = {
-        "pending": session.query(FeedbackQueue).filter(
-            FeedbackQueue.status == FeedbackQueueStatus.PENDING.value
-        ).count(),
-        "approved": session.query(FeedbackQueue).filter(
-            FeedbackQueue.status == FeedbackQueueStatus.APPROVED.value
-        ).count(),
-        "edited": session.query(FeedbackQueue).filter(
-            FeedbackQueue.status == FeedbackQueueStatus.EDITED.value
-        ).count(),
-        "published": session.query(FeedbackQueue).filter(
-            FeedbackQueue.status == FeedbackQueueStatus.PUBLISHED.value
-        ).count(),
-        "rejected": session.query(FeedbackQueue).filter(
-            FeedbackQueue.status == FeedbackQueueStatus.REJECTED.value
-        ).count()
-    }
+    queue_counts.move(FeedbackQueueStatus.FAILED.value, FeedbackQueueStatus.APPROVED.value, requeued)
+    print(f"Requeued {requeued} failed feedback items")
+    return requeued
 
-    session.close()
+
+def get_failed_feedback(limit: int = 100) -> list[dict]:
+    """Dead-lettered feedback with its attempt log, newest failure first."""
+    session = get_session()
+    try:
+        rows = _feedback_query(session).filter(
+            FeedbackQueue.status == FeedbackQueueStatus.FAILED.value
+        ).order_by(FeedbackQueue.updated_at.desc()).limit(limit).all()
+
+        attempts = {}
+        for attempt in session.query(PublishAttempt).filter(
+            PublishAttempt.feedback_id.in_([fb.id for fb, *_ in rows])
+        ).order_by(PublishAttempt.id):
+            attempts.setdefault(attempt.feedback_id, []).append({
+                "attempt": attempt.attempt,
+                "started_at": attempt.started_at.isoformat(),
+                "finished_at": attempt.finished_at.isoformat(),
+                "success": attempt.success,
+                "error": attempt.error
+            })
+    finally:
+        session.close()
+
+    return [{
+        "id": fb.id,
+        "type": fb.feedback_type,
+        "title": fb.title,
+        "student_name": student_name,
+        "assignment_name": assignment_name,
+        "last_error": fb.last_error,
+        "attempts": attempts.get(fb.id, [])
+    } for fb, student_name, _, assignment_name, _ in rows]
+
+
+def run_publisher(
+    concurrency: Optional[int] = None,
+    poll_seconds: Optional[float] = None,
+    stop: Optional[threading.Event] = None
+):
+    """
+    Drain the outbox until stopped: the long-running publisher worker.
+
+    Keeps up to concurrency posts in flight, topping up from the due items
+    (approved, not backing off, not leased elsewhere) as each finishes, and
+    checks for newly approved feedback every poll_seconds when idle. Several
+    workers can run at once; the leases keep them from posting the same item.
+
+    Args:
+        concurrency: Posts in flight (default PUBLISH_CONCURRENCY)
+        poll_seconds: Idle poll interval (default PUBLISH_POLL_SECONDS)
+        stop: Set this to stop after the in-flight posts finish
+    """
+    concurrency = max(1, concurrency or PUBLISH_CONCURRENCY)
+    poll_seconds = poll_seconds or PUBLISH_POLL_SECONDS
+    stop = stop or threading.Event()
+
+    print(f"Publisher running ({concurrency} concurrent posts, polling every {poll_seconds}s)")
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not stop.is_set() or in_flight:
+            if not stop.is_set() and len(in_flight) < concurrency:
+                session = get_session()
+                try:
+                    jobs = _publish_jobs(
+                        session, due=True, limit=concurrency - len(in_flight), exclude=set(in_flight.values())
+                    )
+                finally:
+                    session.close()
+                for job in jobs:
+                    in_flight[pool.submit(_publish_job, job)] = job["id"]
+
+            if not in_flight:
+                stop.wait(poll_seconds)
+                continue
+
+            done, _ = wait(in_flight, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            for future in done:
+                feedback_id = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"error": str(e)}
+                if result.get("skipped"):
+                    continue
+                if "error" not in result:
+                    print(f"Published feedback #{feedback_id}" + (" (already on Canvas)" if result.get("reconciled") else ""))
+                elif result.get("dead_letter"):
+                    print(f"Gave up on feedback #{feedback_id}: {result['error']}")
+                else:
+                    print(f"Feedback #{feedback_id} failed, retrying at {result['retry_at']}: {result['error']}")
+    print("Publisher stopped")
+
+
+def _count_by_status() -> dict:
+    """Count feedback items per status with one grouped query."""
+    session = get_session()
+    try:
+        counts = dict(session.query(
+            FeedbackQueue.status, func.count(FeedbackQueue.id)
+        ).group_by(FeedbackQueue.status).all())
+    finally:
+        session.close()
+    return {status.value: counts.get(status.value, 0) for status in FeedbackQueueStatus}
+
+
+class QueueCounts:
+    """
+    Per-status feedback counts kept in memory.
+
+    Seeded with one grouped query, then adjusted by the queue, edit,
+    approve, reject and publish functions as they commit. Other processes
+    (CLI runs, other gunicorn workers) change the queue too, so the counts
+    are re-read from the database once they are resync_seconds old.
+    """
+
+    def __init__(self, resync_seconds: float = 30.0):
+        self.resync_seconds = resync_seconds
+        self._counts = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        with self._lock:
+            if self._counts is None or time.monotonic() - self._loaded_at > self.resync_seconds:
+                self._set(_count_by_status())
+            return dict(self._counts)
+
+    def reset(self, counts: dict):
+        """Replace the counts with fresh ones from the database."""
+        with self._lock:
+            self._set(dict(counts))
+
+    def move(self, old: Optional[str], new: Optional[str], count: int = 1):
+        """Record count items changing status (None for created or deleted)."""
+        if old == new or not count:
+            return
+        with self._lock:
+            if self._counts is None:
+                return  # the first get() loads current counts
+            if old:
+                self._counts[old] = max(self._counts.get(old, 0) - count, 0)
+            if new:
+                self._counts[new] = self._counts.get(new, 0) + count
+
+    def _set(self, counts: dict):
+        self._counts = counts
+        self._loaded_at = time.monotonic()
+
+
+queue_counts = QueueCounts()
+
+
+def get_feedback_stats(cached: bool = False) -> dict:
+    """
+    Get statistics about the feedback queue.
+
+    Args:
+        cached: Serve the in-memory counts (may lag other processes by up
+            to QueueCounts.resync_seconds) instead of querying
+    """
+    if cached:
+        return queue_counts.get()
+
+    stats = _count_by_status()
+    queue_counts.reset(stats)
     return stats
 
 
+@metrics.REGISTRY.on_collect
+def _collect_queue_depths():
+    """Refresh the queue-depth gauge from the database before each scrape."""
+    for status, count in get_feedback_stats().items():
+        metrics.FEEDBACK_QUEUE_DEPTH.labels(status=status).set(count)
+
+
+def _evaluation_feedback(evaluation: Evaluation, points_possible: Optional[float]) -> str:
+    """Build the student-facing comment from a final evaluation."""
+    content_parts = []
+
+    if evaluation.feedback:
+        content_parts.append(evaluation.feedback)
+
+    if evaluation.strengths:
+        strengths = evaluation.strengths if isinstance(evaluation.strengths, list) else [evaluation.strengths]
+        if strengths:
+            content_parts.append("\n**Strengths:**")
+            for s in strengths[:3]:
+                content_parts.append(f"- {s}")
+
+    if evaluation.areas_for_improvement:
+        areas = evaluation.areas_for_improvement if isinstance(evaluation.areas_for_improvement, list) else [evaluation.areas_for_improvement]
+        if areas:
+            content_parts.append("\n**Areas for growth:**")
+            for a in areas[:3]:
+                content_parts.append(f"- {a}")
+
+    if evaluation.score is not None:
+        content_parts.append(f"\n**Score:** {evaluation.score}/{points_possible}")
+
+    return "\n".join(content_parts)
+
+
 def generate_submission_feedback_for_queue(submission_id: int) -> Optional[FeedbackQueue]:
     """
     Generate AI feedback for a submission and add to queue.
@@ -415,30 +1012,7 @@ def generate_submission_feedback_for_queue(submission_id: int) -> Optional[Feedb
         print(f"No evaluation found for submission {submission_id}")
         return None
 
-    # Build feedback content from evaluation
-    content_parts = []
-
-    if final_eval.feedback:
-        content_parts.append(final_eval.feedback)
-
-    if final_eval.strengths:
-        strengths = final_eval.strengths if isinstance(final_eval.strengths, list) else [final_eval.strengths]
-        if strengths:
-            content_parts.append("\n**Strengths:**")
-            for s in strengths[:3]:
-                content_parts.append(f"- {s}")
-
-    if final_eval.areas_for_improvement:
-        areas = final_eval.areas_for_improvement if isinstance(final_eval.areas_for_improvement, list) else [final_eval.areas_for_improvement]
-        if areas:
-            content_parts.append("\n**Areas for growth:**")
-            for a in areas[:3]:
-                content_parts.append(f"- {a}")
-
-    if final_eval.score is not None:
-        content_parts.append(f"\n**Score:** {final_eval.score}/{submission.assignment.points_possible}")
-
-    content = "\n".join(content_parts)
+    content = _evaluation_feedback(final_eval, submission.assignment.points_possible)
 
     session.close()
 
@@ -452,3 +1026,73 @@ def generate_submission_feedback_for_queue(submission_id: int) -> Optional[Feedb
             "generated_from": "existing_evaluation"
         }
     )
+
+
+def generate_batch_feedback() -> int:
+    """
+    Queue feedback for every evaluated submission that has none in flight.
+
+    One anti-join query finds submissions with a final evaluation and no
+    pending, approved, edited or failed feedback (ACTIVE_STATUSES; a
+    dead-lettered item still blocks regeneration until it is retried or
+    rejected); the comments are built from those evaluation rows and
+    inserted in a single executemany.
+
+    Returns:
+        Number of feedback items queued
+    """
+    session = get_session()
+    try:
+        active = session.query(FeedbackQueue.id).filter(
+            FeedbackQueue.submission_id == Submission.id,
+            FeedbackQueue.status.in_(ACTIVE_STATUSES)
+        ).exists()
+        rows = session.query(Evaluation, Submission.student_id, Assignment.points_possible).join(
+            Submission, Evaluation.submission_id == Submission.id
+        ).join(
+            Assignment, Submission.assignment_id == Assignment.id
+        ).options(
+            load_only(
+                Evaluation.submission_id, Evaluation.source, Evaluation.score, Evaluation.feedback,
+                Evaluation.strengths, Evaluation.areas_for_improvement
+            )
+        ).filter(
+            Evaluation.is_final == True,
+            ~active
+        ).order_by(Evaluation.submission_id, Evaluation.id).all()
+
+        now = datetime.utcnow()
+        items = []
+        seen = set()
+        for evaluation, student_id, points_possible in rows:
+            # Same choice as the single-submission path: the first final evaluation
+            if evaluation.submission_id in seen:
+                continue
+            seen.add(evaluation.submission_id)
+
+            content = _evaluation_feedback(evaluation, points_possible)
+            items.append({
+                "feedback_type": FeedbackType.SUBMISSION_COMMENT.value,
+                "student_id": student_id,
+                "submission_id": evaluation.submission_id,
+                "content": content,
+                "original_content": content,
+                "generated_by": evaluation.source or "haiku",
+                "generation_context": {
+                    "evaluation_id": evaluation.id,
+                    "generated_from": "existing_evaluation"
+                },
+                "status": FeedbackQueueStatus.PENDING.value,
+                "created_at": now,
+                "updated_at": now
+            })
+
+        if items:
+            session.execute(insert(FeedbackQueue), items)
+            session.commit()
+    finally:
+        session.close()
+
+    queue_counts.move(None, FeedbackQueueStatus.PENDING.value, len(items))
+    print(f"Queued feedback for {len(items)} evaluated submissions")
+    return len(items)
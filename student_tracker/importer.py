@@ -0,0 +1,737 @@
+"""
+Bulk import engine for submissions and assignments.
+
+Resolving each row with its own queries (an ILIKE '%name%' for the student
+and assignment, another for the existing submission) makes imports
+O(rows) round trips that no index can help. Instead the engine loads
+students, assignments and existing submissions into memory once, resolves
+names against those maps, and writes new and changed submissions in
+chunked executemany statements.
+
+import_file() streams a CSV, JSON or NDJSON file through the engine,
+committing in batches with a checkpoint so an interrupted import resumes.
+ingest_folder() imports a folder of submission documents.
+"""
+
+import csv
+import itertools
+import json
+import os
+import re
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from xml.etree import ElementTree
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import insert, tuple_, update
+
+from .models import (
+    get_session, Student, Assignment, Submission, ImportCheckpoint, refresh_needs_evaluation
+)
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # Optional: JSON arrays are then loaded whole (NDJSON still streams)
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None  # Optional: PDF submissions are reported as errors without it
+
+# Rows per INSERT/UPDATE executemany
+IMPORT_CHUNK_SIZE = 500
+
+# Rows per transaction (and checkpoint) in file imports
+IMPORT_BATCH_SIZE = int(os.environ.get("STUDENT_TRACKER_IMPORT_BATCH_SIZE", "5000"))
+
+# Error messages kept per import; the count is always exact
+MAX_ERROR_MESSAGES = 100
+
+# Submission files ingest_folder() reads
+SUBMISSION_EXTENSIONS = (".txt", ".md", ".docx", ".pdf")
+
+# Fuzzy matches below this trigram similarity (0-1) count as not found
+FUZZY_MIN_SIMILARITY = 0.6
+
+
+def normalize_name(name: str) -> str:
+    """Casefold, strip accents and punctuation, and collapse whitespace."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", name.casefold()).split())
+
+
+def _trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Resolve free-text names to IDs.
+
+    A name matches exactly after normalize_name(); failing that, a name that
+    contains it (what the old ILIKE '%name%' lookup found). With fuzzy, a
+    name that still doesn't match goes to the most similar name by trigram
+    overlap, if it is at least FUZZY_MIN_SIMILARITY; that can pick a
+    different person ("Maria Lopez" -> "Mario Lopez"), so it is opt-in and
+    callers should report it. Ties go to the lowest ID, as the old lookup's
+    first() did. Results are cached, since an import repeats the same
+    names many times.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[tuple[int, str]] = (),
+        fuzzy: bool = False,
+        min_similarity: float = FUZZY_MIN_SIMILARITY
+    ):
+        self.fuzzy = fuzzy
+        self.min_similarity = min_similarity
+        self._exact = {}      # normalized name -> lowest ID
+        self._names = {}      # ID -> normalized name
+        self._display = {}    # ID -> name as given
+        self._postings = {}   # trigram -> set of IDs
+        self._cache = {}
+        for id_, name in names:
+            self.add(id_, name)
+
+    def add(self, id_: int, name: str):
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        if id_ < self._exact.get(normalized, id_ + 1):
+            self._exact[normalized] = id_
+        self._names[id_] = normalized
+        self._display[id_] = name
+        for gram in _trigrams(normalized):
+            self._postings.setdefault(gram, set()).add(id_)
+        self._cache.clear()
+
+    def resolve(self, name: str) -> Optional[int]:
+        return self.match(name)[0]
+
+    def match(self, name: str) -> tuple[Optional[int], bool]:
+        """(ID or None, whether the ID came from the fuzzy tier)."""
+        normalized = normalize_name(name)
+        if not normalized:
+            return None, False
+        if normalized not in self._cache:
+            self._cache[normalized] = self._lookup(normalized)
+        return self._cache[normalized]
+
+    def name(self, id_: int) -> str:
+        return self._display[id_]
+
+    def _lookup(self, normalized: str) -> tuple[Optional[int], bool]:
+        if normalized in self._exact:
+            return self._exact[normalized], False
+
+        # Candidates share at least one trigram; count how many each shares
+        grams = _trigrams(normalized)
+        shared = {}
+        for gram in grams:
+            for id_ in self._postings.get(gram, ()):
+                shared[id_] = shared.get(id_, 0) + 1
+
+        containing = [id_ for id_ in shared if normalized in self._names[id_]]
+        if containing:
+            return min(containing), False
+        if not self.fuzzy:
+            return None, False
+
+        best, best_score = None, 0.0
+        for id_, count in shared.items():
+            # Dice coefficient over the two trigram sets
+            score = 2 * count / (len(grams) + len(_trigrams(self._names[id_])))
+            if score > best_score or (score == best_score and id_ < best):
+                best, best_score = id_, score
+        return (best, True) if best_score >= self.min_similarity else (None, False)
+
+
+class ImportLookups:
+    """
+    Students, assignments and existing submissions, loaded once per import.
+
+    With fuzzy, names may resolve by spelling similarity; each such match is
+    kept as (given name, matched name) until take_fuzzy() so the caller can
+    report it against the row.
+    """
+
+    def __init__(self, session, fuzzy: bool = False):
+        students = session.query(Student.id, Student.name).all()
+        assignments = session.query(Assignment.id, Assignment.name).all()
+
+        self.student_ids = {id_ for id_, _ in students}
+        self.assignment_ids = {id_ for id_, _ in assignments}
+        self.students = NameIndex(students, fuzzy=fuzzy)
+        self.assignments = NameIndex(assignments, fuzzy=fuzzy)
+        self._fuzzy = []
+
+        # (student_id, assignment_id) -> submission ID; the first if duplicated
+        self.submissions = {}
+        for id_, student_id, assignment_id in session.query(
+            Submission.id, Submission.student_id, Submission.assignment_id
+        ).order_by(Submission.id.desc()):
+            self.submissions[(student_id, assignment_id)] = id_
+
+    def student(self, student_id: Optional[str], name: Optional[str]) -> Optional[int]:
+        return self._resolve(student_id, name, self.student_ids, self.students)
+
+    def assignment(self, assignment_id: Optional[str], name: Optional[str]) -> Optional[int]:
+        return self._resolve(assignment_id, name, self.assignment_ids, self.assignments)
+
+    def _resolve(self, id_: Optional[str], name: Optional[str], ids: set[int], index: NameIndex) -> Optional[int]:
+        if id_:
+            try:
+                return int(id_) if int(id_) in ids else None
+            except ValueError:
+                return None
+        if not name:
+            return None
+        resolved, fuzzy = index.match(name)
+        if fuzzy:
+            self._fuzzy.append((name, index.name(resolved)))
+        return resolved
+
+    def take_fuzzy(self) -> list[tuple[str, str]]:
+        """Fuzzy matches made since the last call, as (given name, matched name)."""
+        matches, self._fuzzy = self._fuzzy, []
+        return matches
+
+
+class SubmissionWriter:
+    """
+    Buffer submission upserts and write them in chunks.
+
+    A second row for the same student and assignment replaces the first,
+    whether that row is still buffered or already written.
+    """
+
+    def __init__(self, session, lookups: ImportLookups, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.session = session
+        self.lookups = lookups
+        self.chunk_size = chunk_size
+        self._inserts = {}  # (student_id, assignment_id) -> row
+        self._updates = {}  # submission ID -> row
+        self.inserted = 0
+        self.updated = 0
+
+    def add(self, student_id: int, assignment_id: int, values: dict, insert_values: Optional[dict] = None):
+        """Upsert values; insert_values are only set on a new submission."""
+        key = (student_id, assignment_id)
+        existing = self.lookups.submissions.get(key)
+        if existing:
+            self._updates[existing] = dict(values, id=existing)
+        else:
+            self._inserts[key] = dict(
+                insert_values or {}, **values, student_id=student_id, assignment_id=assignment_id
+            )
+
+        if len(self._inserts) + len(self._updates) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows (inside the session's transaction)."""
+        now = datetime.utcnow()
+        if self._inserts:
+            rows = [
+                # Bulk inserts skip the ORM's before_insert hook, so set this here
+                dict(row, needs_evaluation=bool(row.get("content")), created_at=now, updated_at=now)
+                for row in self._inserts.values()
+            ]
+            self.session.execute(insert(Submission), rows)
+            # Record the new IDs so later rows for the same pair update them.
+            # (RETURNING would make SQLite insert one row per statement.)
+            for id_, student_id, assignment_id in self.session.query(
+                Submission.id, Submission.student_id, Submission.assignment_id
+            ).filter(tuple_(Submission.student_id, Submission.assignment_id).in_(list(self._inserts))):
+                self.lookups.submissions[(student_id, assignment_id)] = id_
+            self.inserted += len(rows)
+            self._inserts.clear()
+
+        if self._updates:
+            rows = [dict(row, updated_at=now) for row in self._updates.values()]
+            self.session.execute(update(Submission), rows)
+            # ...and the before_update hook, which would recompute needs_evaluation
+            refresh_needs_evaluation(self.session, list(self._updates))
+            self.updated += len(rows)
+            self._updates.clear()
+
+
+class ImportProgress:
+    """Counts for one import run, with a bounded list of error messages."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self.fuzzy_matches = []
+
+    def error(self, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERROR_MESSAGES:
+            self.errors.append(message)
+
+    def fuzzy(self, label: str, matches: list[tuple[str, str]], existing: Optional[int] = None):
+        """Record one row's fuzzy name matches (all of them, uncapped)."""
+        for given, matched in matches:
+            message = f"{label}: '{given}' → '{matched}'"
+            if existing:
+                message += f" (replaces submission {existing})"
+            self.fuzzy_matches.append(message)
+
+    def result(self, **extra) -> dict:
+        seconds = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "errors": self.errors,
+            "error_count": self.error_count,
+            "fuzzy_matches": self.fuzzy_matches,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.rows / seconds) if seconds else None,
+            **extra
+        }
+
+
+def import_submission_rows(
+    session,
+    rows: Iterable[tuple[int, dict]],
+    source: str = "csv_import",
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[ImportProgress], None]] = None,
+    fuzzy: bool = False
+) -> dict:
+    """
+    Import submission rows (from a CSV reader or similar) in bulk.
+
+    Each row has student_id or student_name, assignment_id or
+    assignment_name, content, and optionally submitted_at (ISO) and status.
+    The caller commits; with batch_size, on_batch is called after every
+    batch_size rows are written, to commit and checkpoint.
+
+    Args:
+        session: Session to load lookups and write through
+        rows: (row number, row dict) pairs; the number is used in errors
+        source: Submission.input_source for the rows
+        batch_size: Rows per on_batch call
+        on_batch: Called with the progress so far once a batch is written
+        fuzzy: Also match names by spelling similarity (see NameIndex)
+
+    Returns:
+        Dict with rows, imported, inserted, updated, errors (the first
+        MAX_ERROR_MESSAGES messages), error_count, fuzzy_matches (every
+        fuzzy name match, as "Row N: 'given' → 'matched'"), seconds and
+        rows_per_second
+    """
+    progress = ImportProgress()
+    lookups = ImportLookups(session, fuzzy=fuzzy)
+    writer = SubmissionWriter(session, lookups)
+
+    for row_num, row in rows:
+        progress.rows += 1
+        _import_submission_row(row_num, row, source, lookups, writer, progress)
+        if batch_size and on_batch and progress.rows % batch_size == 0:
+            writer.flush()
+            on_batch(progress)
+
+    writer.flush()
+    return progress.result(inserted=writer.inserted, updated=writer.updated)
+
+
+def _import_submission_row(row_num, row, source, lookups, writer, progress):
+    content = str(row.get("content") or "").strip()
+    student_id = lookups.student(row.get("student_id"), row.get("student_name"))
+    assignment_id = student_id and lookups.assignment(row.get("assignment_id"), row.get("assignment_name"))
+    existing = lookups.submissions.get((student_id, assignment_id)) if content else None
+    progress.fuzzy(f"Row {row_num}", lookups.take_fuzzy(), existing)
+
+    if not student_id:
+        progress.error(f"Row {row_num}: Student not found")
+        return
+
+    if not assignment_id:
+        progress.error(f"Row {row_num}: Assignment not found")
+        return
+
+    if not content:
+        progress.error(f"Row {row_num}: No content")
+        return
+
+    submitted_at = None
+    if row.get("submitted_at"):
+        try:
+            submitted_at = datetime.fromisoformat(row["submitted_at"])
+        except (ValueError, TypeError):
+            pass
+
+    writer.add(student_id, assignment_id, {
+        "content": content,
+        "submitted_at": submitted_at or datetime.utcnow(),
+        "status": row.get("status") or "submitted",
+        "input_source": source
+    })
+    progress.imported += 1
+
+
+def import_assignment_items(
+    session,
+    items: Iterable[tuple[int, dict]],
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[ImportProgress], None]] = None
+) -> dict:
+    """
+    Insert assignments (see manual_input.import_assignments_json for the
+    fields) IMPORT_CHUNK_SIZE at a time. Batching works as in
+    import_submission_rows().
+    """
+    progress = ImportProgress()
+    pending = []
+
+    def flush():
+        if pending:
+            session.execute(insert(Assignment), pending)
+            pending.clear()
+
+    for item_num, item in items:
+        progress.rows += 1
+        name = str(item.get("name") or "").strip()
+        if not name:
+            progress.error(f"Item {item_num}: No name")
+        else:
+            due_date = None
+            if item.get("due_date"):
+                try:
+                    due_date = datetime.fromisoformat(item["due_date"])
+                except (ValueError, TypeError):
+                    pass
+
+            pending.append({
+                "name": name,
+                "points_possible": item.get("points_possible", 0),
+                "due_date": due_date,
+                "assignment_type": item.get("assignment_type"),
+                "description": item.get("description"),
+                "rubric": item.get("rubric"),
+                "skills_assessed": item.get("skills_assessed")
+            })
+            progress.imported += 1
+            if len(pending) >= IMPORT_CHUNK_SIZE:
+                flush()
+
+        if batch_size and on_batch and progress.rows % batch_size == 0:
+            flush()
+            on_batch(progress)
+
+    flush()
+    return progress.result()
+
+
+# ============================================================================
+# Streaming file imports
+# ============================================================================
+
+def iter_csv(path: str, skip: int = 0) -> Iterator[tuple[int, dict]]:
+    """Yield (row number, row) from a CSV file a row at a time, after the first skip rows."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        yield from enumerate(itertools.islice(reader, skip, None), start=skip + 2)
+
+
+def iter_json(path: str, skip: int = 0) -> Iterator[tuple[int, dict]]:
+    """
+    Yield (item number, item) from a JSON array or NDJSON file, after the
+    first skip items.
+
+    NDJSON (one object per line) always streams. An array streams with
+    ijson if it is installed and is loaded whole otherwise.
+    """
+    with open(path, "rb") as f:
+        head = f.read(4096).lstrip()
+        f.seek(0)
+
+        if not head.startswith(b"["):
+            lines = (line for line in f if line.strip())
+            items = (json.loads(line) for line in itertools.islice(lines, skip, None))
+        elif ijson is not None:
+            items = itertools.islice(ijson.items(f, "item", use_float=True), skip, None)
+        else:
+            items = iter(json.load(f)[skip:])
+
+        yield from enumerate(items, start=skip + 1)
+
+
+class Checkpoint:
+    """
+    How far an import of one file got, saved in the same transaction as
+    each batch so the two can't disagree.
+    """
+
+    def __init__(self, session, kind: str, path: str):
+        self.session = session
+        stat = os.stat(path)
+        self.row = session.query(ImportCheckpoint).filter_by(kind=kind, path=os.path.abspath(path)).first()
+        self.fields = {
+            "kind": kind,
+            "path": os.path.abspath(path),
+            "file_size": stat.st_size,
+            "file_mtime": stat.st_mtime
+        }
+
+    def start(self, resume: bool = True) -> ImportCheckpoint:
+        """The checkpoint to continue from; a fresh one unless resuming the same, unchanged file."""
+        if self.row and not (
+            resume
+            and self.row.file_size == self.fields["file_size"]
+            and self.row.file_mtime == self.fields["file_mtime"]
+        ):
+            self.session.delete(self.row)
+            self.session.flush()
+            self.row = None
+
+        if self.row is None:
+            self.row = ImportCheckpoint(**self.fields, rows_done=0, imported=0, errors=0)
+            self.session.add(self.row)
+        return self.row
+
+    def save(self, rows_done: int, imported: int, errors: int):
+        self.row.rows_done = rows_done
+        self.row.imported = imported
+        self.row.errors = errors
+
+    def finish(self):
+        self.session.delete(self.row)
+
+
+def import_file(
+    kind: str,
+    path: str,
+    batch_size: Optional[int] = None,
+    resume: bool = True,
+    fuzzy: bool = False
+) -> dict:
+    """
+    Stream a file into the database, committing every batch_size rows.
+
+    Submissions can be CSV, a JSON array or NDJSON; assignments JSON or
+    NDJSON. Memory use is bounded by the batch, not the file. Each commit
+    records a checkpoint, so if the import is interrupted, running it again
+    on the unchanged file skips the rows already committed (resume=False
+    starts over).
+
+    Args:
+        kind: "submissions" or "assignments"
+        path: File to import
+        batch_size: Rows per transaction (default IMPORT_BATCH_SIZE)
+        resume: Continue from a checkpoint left by an interrupted import
+        fuzzy: Match submission names by spelling similarity (see NameIndex)
+
+    Returns:
+        The import result (see import_submission_rows()) for this run, plus
+        resumed_from (rows skipped) and imported_total (including the runs
+        before)
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    read = iter_csv if path.lower().endswith(".csv") else iter_json
+
+    session = get_session()
+    try:
+        checkpoint = Checkpoint(session, kind, path)
+        state = checkpoint.start(resume)
+        resumed_from, imported_before, errors_before = state.rows_done, state.imported, state.errors
+        if resumed_from:
+            print(f"Resuming {path} after row {resumed_from} ({imported_before} already imported)")
+
+        def on_batch(progress: ImportProgress):
+            checkpoint.save(
+                resumed_from + progress.rows,
+                imported_before + progress.imported,
+                errors_before + progress.error_count
+            )
+            session.commit()
+
+        rows = read(path, skip=resumed_from)
+        if kind == "submissions":
+            source = "csv_import" if read is iter_csv else "json_import"
+            result = import_submission_rows(session, rows, source, batch_size, on_batch, fuzzy=fuzzy)
+        elif kind == "assignments":
+            result = import_assignment_items(session, rows, batch_size, on_batch)
+        else:
+            raise ValueError(f"Unknown import kind: {kind}")
+
+        checkpoint.finish()
+        session.commit()
+    finally:
+        session.close()
+
+    result["resumed_from"] = resumed_from
+    result["imported_total"] = imported_before + result["imported"]
+    return result
+
+
+# ============================================================================
+# Folder ingestion
+# ============================================================================
+
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as docx:
+        root = ElementTree.fromstring(docx.read("word/document.xml"))
+
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{_WORD}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_WORD}br", f"{_WORD}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _pdf_text(path: str) -> str:
+    if pypdf is None:
+        raise RuntimeError("reading PDFs needs pypdf (pip install pypdf)")
+    reader = pypdf.PdfReader(path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(path: str) -> str:
+    """Text of a .txt, .md, .docx or .pdf submission."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".docx":
+        return _docx_text(path)
+    if extension == ".pdf":
+        return _pdf_text(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _extract(path: str) -> tuple[str, Optional[str]]:
+    """extract_text() for a worker process: (text, error) instead of raising."""
+    try:
+        return extract_text(path), None
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"
+
+
+def _filename_regex(pattern: str) -> re.Pattern:
+    """'{student_name} - {title}' -> a regex capturing student_name; other fields match anything."""
+    regex = re.sub(r"\\\{(\w+)\\\}", lambda m: (
+        "(?P<student_name>.+?)" if m.group(1) == "student_name" else ".*?"
+    ), re.escape(pattern))
+    return re.compile(regex, re.IGNORECASE)
+
+
+def ingest_folder(
+    session,
+    folder: str,
+    assignment_id: int,
+    filename_pattern: str = "{student_name}",
+    workers: Optional[int] = None,
+    fuzzy: bool = False
+) -> dict:
+    """
+    Import a folder of submissions (txt, md, docx, pdf) for one assignment.
+
+    Walks the folder, matches each file name (without extension) against
+    filename_pattern and the student index, extracts text from the matched
+    files in a process pool, and upserts the submissions in bulk. The
+    caller commits. Files are processed in path order, so if two files
+    match the same student the last one wins.
+
+    Args:
+        session: Session to load lookups and write through
+        folder: Folder to walk (subfolders included)
+        assignment_id: Assignment the submissions belong to
+        filename_pattern: File name layout, e.g. "{student_name}_{title}"
+        workers: Extraction processes (default: one per CPU; 1 extracts in-process)
+        fuzzy: Also match names by spelling similarity (see NameIndex)
+
+    Returns:
+        The import result (see import_submission_rows()) with rows counting
+        supported files, plus bytes, unmatched (file paths relative to the
+        folder, sorted), skipped (unsupported files) and hidden (hidden and
+        Office lock files, which are never read); fuzzy_matches are
+        labelled with the file path
+    """
+    progress = ImportProgress()
+    lookups = ImportLookups(session, fuzzy=fuzzy)
+    writer = SubmissionWriter(session, lookups)
+    regex = _filename_regex(filename_pattern)
+    if "student_name" not in regex.groupindex:
+        raise ValueError("filename_pattern needs a {student_name} field")
+
+    matched, unmatched, skipped, hidden = [], [], 0, 0
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for filename in sorted(files):
+            # Hidden files and Office lock files ("~$essay.docx")
+            if filename.startswith((".", "~$")):
+                hidden += 1
+                continue
+            if not filename.lower().endswith(SUBMISSION_EXTENSIONS):
+                skipped += 1
+                continue
+
+            path = os.path.join(root, filename)
+            match = regex.fullmatch(os.path.splitext(filename)[0])
+            student_id = lookups.student(None, match.group("student_name")) if match else None
+            if student_id:
+                matched.append((path, student_id, lookups.take_fuzzy()))
+            else:
+                unmatched.append(os.path.relpath(path, folder))
+
+    progress.rows = len(matched) + len(unmatched)
+    paths = [path for path, _, _ in matched]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            extracted = list(pool.map(_extract, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    else:
+        extracted = [_extract(path) for path in paths]
+
+    now = datetime.utcnow()
+    total_bytes = 0
+    for (path, student_id, fuzzy_matches), (content, error) in zip(matched, extracted):
+        name = os.path.relpath(path, folder)
+        written = not error and content.strip()
+        existing = lookups.submissions.get((student_id, assignment_id)) if written else None
+        progress.fuzzy(name, fuzzy_matches, existing)
+        if error:
+            progress.error(f"{name}: {error}")
+            continue
+        if not content.strip():
+            progress.error(f"{name}: No text found")
+            continue
+
+        total_bytes += os.path.getsize(path)
+        writer.add(
+            student_id, assignment_id,
+            {"content": content, "file_path": path, "input_source": "file_import"},
+            insert_values={"submitted_at": now, "status": "submitted"}
+        )
+        progress.imported += 1
+
+    writer.flush()
+    return progress.result(
+        inserted=writer.inserted,
+        updated=writer.updated,
+        bytes=total_bytes,
+        unmatched=unmatched,
+        skipped=skipped,
+        hidden=hidden
+    )
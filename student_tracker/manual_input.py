@@ -18,6 +18,7 @@ from .models import (
     get_session, init_db, Student, Assignment, Submission,
     Evaluation, StudentNote, SubmissionStatus, EvaluationSource
 )
+from .importer import import_file, ingest_folder
 
 
 # ============================================================================
@@ -171,11 +172,11 @@ def list_assignments() -> list[dict]:
     return result
 
 
-def import_assignments_json(filepath: str) -> int:
+def import_assignments_json(filepath: str, batch_size: int = None, resume: bool = True) -> int:
     """
     Import assignments from JSON file.
 
-    Expected format:
+    Expected format (or NDJSON, one object per line):
     [
         {
             "name": "Assignment Name",
@@ -186,46 +187,17 @@ def import_assignments_json(filepath: str) -> int:
             "skills_assessed": ["writing", "research"]
         }
     ]
+
+    Large files are committed in batches and resume where they stopped;
+    see importer.import_file.
     """
     if not os.path.exists(filepath):
         print(f"File not found: {filepath}")
         return 0
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    session = get_session()
-    imported = 0
-
-    for item in data:
-        name = item.get("name", "").strip()
-        if not name:
-            continue
-
-        due_date = None
-        if item.get("due_date"):
-            try:
-                due_date = datetime.fromisoformat(item["due_date"])
-            except (ValueError, TypeError):
-                pass
-
-        assignment = Assignment(
-            name=name,
-            points_possible=item.get("points_possible", 0),
-            due_date=due_date,
-            assignment_type=item.get("assignment_type"),
-            description=item.get("description"),
-            rubric=item.get("rubric"),
-            skills_assessed=item.get("skills_assessed")
-        )
-        session.add(assignment)
-        imported += 1
-
-    session.commit()
-    session.close()
-
-    print(f"Imported {imported} assignments from {filepath}")
-    return imported
+    result = import_file("assignments", filepath, batch_size=batch_size, resume=resume)
+    _print_import_result(result, "assignments", filepath)
+    return result["imported"]
 
 
 # ============================================================================
@@ -326,178 +298,111 @@ def add_submission_by_name(
     return add_submission(student.id, assignment.id, content, submitted_at)
 
 
-def import_submissions_csv(filepath: str) -> int:
+def import_submissions_csv(
+    filepath: str,
+    batch_size: int = None,
+    resume: bool = True,
+    fuzzy: bool = False
+) -> int:
     """
-    Import submissions from CSV file.
+    Import submissions from CSV file (or a JSON array / NDJSON file of the same fields).
 
     Expected columns: student_name (or student_id), assignment_name (or assignment_id), content
     Optional columns: submitted_at, status
+
+    Names are matched exactly (ignoring case, accents and punctuation), then
+    as a partial name, and with fuzzy by closest spelling (every such match
+    is listed); see importer.NameIndex. Large files are committed in batches
+    and resume where they stopped; see importer.import_file.
     """
     if not os.path.exists(filepath):
         print(f"File not found: {filepath}")
         return 0
 
-    session = get_session()
-    imported = 0
-    errors = []
+    result = import_file("submissions", filepath, batch_size=batch_size, resume=resume, fuzzy=fuzzy)
+    _print_import_result(result, "submissions", filepath)
+    return result["imported"]
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        for row_num, row in enumerate(reader, start=2):
-            # Find student
-            student = None
-            if row.get("student_id"):
-                student = session.query(Student).get(int(row["student_id"]))
-            elif row.get("student_name"):
-                student = session.query(Student).filter(
-                    Student.name.ilike(f"%{row['student_name']}%")
-                ).first()
-
-            if not student:
-                errors.append(f"Row {row_num}: Student not found")
-                continue
-
-            # Find assignment
-            assignment = None
-            if row.get("assignment_id"):
-                assignment = session.query(Assignment).get(int(row["assignment_id"]))
-            elif row.get("assignment_name"):
-                assignment = session.query(Assignment).filter(
-                    Assignment.name.ilike(f"%{row['assignment_name']}%")
-                ).first()
-
-            if not assignment:
-                errors.append(f"Row {row_num}: Assignment not found")
-                continue
 
-            content = row.get("content", "").strip()
-            if not content:
-                errors.append(f"Row {row_num}: No content")
-                continue
+def _print_import_result(result: dict, what: str, filepath: str):
+    summary = f"Imported {result['imported']} {what} from {filepath}"
+    if "inserted" in result:
+        summary += f" ({result['inserted']} new, {result['updated']} updated)"
+    print(f"{summary} in {result['seconds']:.1f}s, {result['rows_per_second'] or 0} rows/s")
+    if result["resumed_from"]:
+        print(f"  resumed after row {result['resumed_from']}; {result['imported_total']} imported in total")
+    _print_fuzzy_matches(result)
+    _print_import_errors(result)
 
-            # Parse submitted_at
-            submitted_at = None
-            if row.get("submitted_at"):
-                try:
-                    submitted_at = datetime.fromisoformat(row["submitted_at"])
-                except (ValueError, TypeError):
-                    pass
-
-            status = row.get("status", "submitted")
-
-            # Create or update submission
-            existing = session.query(Submission).filter_by(
-                student_id=student.id,
-                assignment_id=assignment.id
-            ).first()
-
-            if existing:
-                existing.content = content
-                existing.submitted_at = submitted_at or datetime.utcnow()
-                existing.status = status
-                existing.input_source = "csv_import"
-            else:
-                submission = Submission(
-                    student_id=student.id,
-                    assignment_id=assignment.id,
-                    content=content,
-                    submitted_at=submitted_at or datetime.utcnow(),
-                    status=status,
-                    input_source="csv_import"
-                )
-                session.add(submission)
 
-            imported += 1
+def _print_fuzzy_matches(result: dict):
+    # All of them: each is a guess that may have attached text to the wrong student
+    if result["fuzzy_matches"]:
+        print(f"Matched by closest spelling ({len(result['fuzzy_matches'])}), check these:")
+        for match in result["fuzzy_matches"]:
+            print(f"  - {match}")
 
-    session.commit()
-    session.close()
 
-    print(f"Imported {imported} submissions from {filepath}")
-    if errors:
-        print(f"Errors ({len(errors)}):")
-        for err in errors[:10]:
+def _print_import_errors(result: dict):
+    if result["error_count"]:
+        print(f"Errors ({result['error_count']}):")
+        for err in result["errors"][:10]:
             print(f"  - {err}")
-        if len(errors) > 10:
-            print(f"  ... and {len(errors) - 10} more")
-
-    return imported
+        if result["error_count"] > 10:
+            print(f"  ... and {result['error_count'] - 10} more")
 
 
 def bulk_import_text_files(
     folder: str,
     assignment_id: int,
-    filename_pattern: str = "{student_name}"
+    filename_pattern: str = "{student_name}",
+    workers: int = None,
+    fuzzy: bool = False
 ) -> int:
     """
-    Import submissions from text files in a folder.
+    Import submissions from .txt, .md, .docx and .pdf files in a folder.
 
-    Files should be named according to the pattern, e.g., "John Smith.txt"
+    Files should be named according to the pattern, e.g., "John Smith.docx"
+    for "{student_name}" or "John Smith - Essay.pdf" for
+    "{student_name} - {title}". Names are matched like the CSV import's;
+    text is extracted in parallel (see importer.ingest_folder).
     """
     if not os.path.isdir(folder):
         print(f"Folder not found: {folder}")
         return 0
 
     session = get_session()
-    assignment = session.query(Assignment).get(assignment_id)
+    try:
+        if not session.query(Assignment).get(assignment_id):
+            print(f"Assignment {assignment_id} not found")
+            return 0
 
-    if not assignment:
-        print(f"Assignment {assignment_id} not found")
+        result = ingest_folder(session, folder, assignment_id, filename_pattern, workers=workers, fuzzy=fuzzy)
+        session.commit()
+    finally:
         session.close()
-        return 0
-
-    imported = 0
-
-    for filename in os.listdir(folder):
-        if not filename.endswith((".txt", ".md")):
-            continue
-
-        # Extract student name from filename
-        student_name = os.path.splitext(filename)[0]
-
-        # Find student
-        student = session.query(Student).filter(
-            Student.name.ilike(f"%{student_name}%")
-        ).first()
-
-        if not student:
-            print(f"Student not found for file: {filename}")
-            continue
-
-        # Read content
-        filepath = os.path.join(folder, filename)
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        # Create or update submission
-        existing = session.query(Submission).filter_by(
-            student_id=student.id,
-            assignment_id=assignment_id
-        ).first()
 
-        if existing:
-            existing.content = content
-            existing.file_path = filepath
-            existing.input_source = "file_import"
-        else:
-            submission = Submission(
-                student_id=student.id,
-                assignment_id=assignment_id,
-                content=content,
-                submitted_at=datetime.utcnow(),
-                status="submitted",
-                file_path=filepath,
-                input_source="file_import"
-            )
-            session.add(submission)
-
-        imported += 1
-
-    session.commit()
-    session.close()
-
-    print(f"Imported {imported} submissions from {folder}")
-    return imported
+    seconds = result["seconds"]
+    print(f"Imported {result['imported']} of {result['rows']} files from {folder} "
+          f"({result['inserted']} new, {result['updated']} updated) in {seconds:.1f}s, "
+          f"{result['rows_per_second'] or 0} files/s, "
+          f"{result['bytes'] / 1e6 / seconds if seconds else 0:.1f} MB/s")
+    if result["skipped"]:
+        print(f"  skipped {result['skipped']} files that aren't .txt, .md, .docx or .pdf")
+    if result["hidden"]:
+        print(f"  skipped {result['hidden']} hidden or Office lock (~$) files")
+
+    unmatched = result["unmatched"]
+    if unmatched:
+        print(f"No student found for {len(unmatched)} files:")
+        for name in unmatched[:20]:
+            print(f"  - {name}")
+        if len(unmatched) > 20:
+            print(f"  ... and {len(unmatched) - 20} more")
+
+    _print_fuzzy_matches(result)
+    _print_import_errors(result)
+    return result["imported"]
 
 
 # ============================================================================
@@ -0,0 +1,394 @@
+"""
+Prometheus-style metrics for the sync, evaluation and publishing pipelines.
+
+A small in-process registry of counters, gauges and histograms, rendered in
+the Prometheus text exposition format:
+- the dashboard serves it at /metrics
+- cron-run CLI commands write it to a textfile (for node_exporter's textfile
+  collector) when STUDENT_TRACKER_METRICS_DIR or --metrics-dir is set
+
+Under gunicorn every worker process has its own registry. Workers flush a
+snapshot to a shared directory every few seconds and /metrics sums the
+snapshots, so counters don't jump around depending on which worker answers
+the scrape.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from . import perf
+
+# Default latency buckets in seconds (LLM calls can take tens of seconds)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# How often worker processes write their snapshot in multiprocess mode
+FLUSH_INTERVAL = 5.0
+
+
+class _Metric:
+    """Base class: a named family of samples keyed by label values."""
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        self._registry = registry or REGISTRY
+        self._registry.register(self)
+
+    def labels(self, **labels) -> "_Child":
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return _Child(self, key)
+
+    def values(self) -> dict:
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def _copy(self, value):
+        return value
+
+    def _update(self, key: tuple, func: Callable):
+        with self._lock:
+            self._values[key] = func(self._values.get(key))
+        self._registry.dirty = True
+
+
+class _Child:
+    """A metric bound to one set of label values."""
+
+    def __init__(self, metric: _Metric, key: tuple):
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount: float = 1):
+        self.metric._update(self.key, lambda v: (v or 0) + amount)
+
+    def set(self, value: float):
+        self.metric._update(self.key, lambda v: value)
+
+    def observe(self, value: float):
+        self.metric._observe(self.key, value)
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1):
+        _Child(self, ()).inc(amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float):
+        _Child(self, ()).set(value)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float):
+        self._observe((), value)
+
+    def _copy(self, value):
+        return {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+
+    def _observe(self, key: tuple, value: float):
+        def update(current):
+            current = current or {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    current["counts"][i] += 1
+                    break
+            current["sum"] += value
+            current["count"] += 1
+            return current
+
+        self._update(key, update)
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.dirty = False
+        self.multiprocess_dir = None
+        self._flusher = None
+
+    def register(self, metric: _Metric):
+        self.metrics[metric.name] = metric
+
+    def on_collect(self, func: Callable[[], None]) -> Callable[[], None]:
+        """Register a function that refreshes gauges right before rendering."""
+        self.collectors.append(func)
+        return func
+
+    def collect(self):
+        for func in self.collectors:
+            try:
+                func()
+            except Exception as e:
+                print(f"Metrics collector {func.__name__} failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Multiprocess support (gunicorn workers)
+    # ------------------------------------------------------------------
+
+    def enable_multiprocess(self, directory: str):
+        """Share counters and histograms between processes through a directory."""
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+        self.multiprocess_dir = directory
+
+    def start_flusher(self, interval: float = FLUSH_INTERVAL):
+        """Periodically write this process's snapshot (call in each worker)."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                if self.dirty:
+                    self.flush()
+
+        self._flusher = threading.Thread(target=loop, daemon=True)
+        self._flusher.start()
+
+    def _snapshot_path(self, pid: Optional[int] = None) -> str:
+        return os.path.join(self.multiprocess_dir, f"{pid or os.getpid()}.json")
+
+    def flush(self):
+        """Write counters and histograms for this process to the shared directory."""
+        if not self.multiprocess_dir:
+            return
+        self.dirty = False
+        snapshot = {
+            name: [[list(key), value] for key, value in metric.values().items()]
+            for name, metric in self.metrics.items()
+            if metric.type != "gauge"
+        }
+        path = self._snapshot_path()
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+
+    def _merged_values(self) -> dict:
+        """Metric values for this process, plus other workers' snapshots."""
+        merged = {name: metric.values() for name, metric in self.metrics.items()}
+        if not self.multiprocess_dir:
+            return merged
+
+        own = self._snapshot_path()
+        for path in glob.glob(os.path.join(self.multiprocess_dir, "*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for key, value in samples:
+                    key = tuple(key)
+                    if metric.type == "histogram":
+                        current = values.get(key)
+                        if current is None or len(current["counts"]) != len(value["counts"]):
+                            values[key] = value
+                        else:
+                            current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                            current["sum"] += value["sum"]
+                            current["count"] += value["count"]
+                    else:
+                        values[key] = values.get(key, 0) + value
+        return merged
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def render(self, extra_labels: Optional[dict] = None) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        self.collect()
+        extra = tuple((extra_labels or {}).items())
+        lines = []
+
+        for name, values in self._merged_values().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+
+            for key, value in sorted(values.items()):
+                labels = extra + tuple(zip(metric.labelnames, key))
+                if metric.type == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value["counts"]):
+                        cumulative += count
+                        lines.append(_sample(f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+                    lines.append(_sample(f"{name}_bucket", labels + (("le", "+Inf"),), value["count"]))
+                    lines.append(_sample(f"{name}_sum", labels, value["sum"]))
+                    lines.append(_sample(f"{name}_count", labels, value["count"]))
+                else:
+                    lines.append(_sample(name, labels, value))
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str, extra_labels: Optional[dict] = None):
+        """Atomically write the metrics to a file for node_exporter's textfile collector."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            f.write(self.render(extra_labels))
+        os.replace(path + ".tmp", path)
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labels: tuple, value: float) -> str:
+    if labels:
+        label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        return f"{name}{{{label_str}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================================
+# Pipeline metrics
+# ============================================================================
+
+CANVAS_REQUESTS = Counter(
+    "student_tracker_canvas_requests_total",
+    "Canvas API requests by endpoint, method and HTTP status.",
+    ("endpoint", "method", "status")
+)
+CANVAS_LATENCY = Histogram(
+    "student_tracker_canvas_request_seconds",
+    "Canvas API request latency by endpoint.",
+    ("endpoint", "method")
+)
+SYNC_ROWS = Counter(
+    "student_tracker_sync_rows_total",
+    "Rows written by Canvas sync, by entity and action (created, updated, skipped).",
+    ("entity", "action")
+)
+LLM_REQUESTS = Counter(
+    "student_tracker_llm_requests_total",
+    "LLM API calls by module, model and outcome.",
+    ("module", "model", "status")
+)
+LLM_TOKENS = Counter(
+    "student_tracker_llm_tokens_total",
+    "LLM tokens used by module and direction (input, output).",
+    ("module", "direction")
+)
+LLM_LATENCY = Histogram(
+    "student_tracker_llm_request_seconds",
+    "LLM API call latency by module.",
+    ("module",)
+)
+FEEDBACK_PUBLISHED = Counter(
+    "student_tracker_feedback_publish_total",
+    "Feedback publish attempts by feedback type and result (success, failure).",
+    ("feedback_type", "result")
+)
+FEEDBACK_QUEUE_DEPTH = Gauge(
+    "student_tracker_feedback_queue_items",
+    "Feedback queue items by status.",
+    ("status",)
+)
+LAST_RUN_TIMESTAMP = Gauge(
+    "student_tracker_last_run_timestamp_seconds",
+    "Unix time the CLI command finished."
+)
+LAST_RUN_DURATION = Gauge(
+    "student_tracker_last_run_duration_seconds",
+    "How long the CLI command ran."
+)
+LAST_RUN_SUCCESS = Gauge(
+    "student_tracker_last_run_success",
+    "1 if the CLI command completed without an exception, else 0."
+)
+
+
+class _LLMCall:
+    """Handle yielded by track_llm_call; pass it the API response."""
+
+    def __init__(self):
+        self.usage = None
+
+    def record(self, response):
+        self.usage = getattr(response, "usage", None)
+
+
+@contextmanager
+def track_llm_call(module: str, model: str):
+    """
+    Count, time and record token usage for one LLM API call.
+
+    Usage:
+        with metrics.track_llm_call("evaluator", EVAL_MODEL) as call:
+            response = client.messages.create(...)
+            call.record(response)
+
+    The time also counts toward the request's "llm" timing when profiling
+    is enabled (see perf.py).
+    """
+    call = _LLMCall()
+    status = "ok"
+    started = time.perf_counter()
+    try:
+        with perf.span("llm"):
+            yield call
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        LLM_REQUESTS.labels(module=module, model=model, status=status).inc()
+        LLM_LATENCY.labels(module=module).observe(time.perf_counter() - started)
+        if call.usage is not None:
+            LLM_TOKENS.labels(module=module, direction="input").inc(call.usage.input_tokens or 0)
+            LLM_TOKENS.labels(module=module, direction="output").inc(call.usage.output_tokens or 0)
+
+
+def record_run(started: float, success: bool):
+    """Set the last-run gauges for a CLI command (started is a time.time() value)."""
+    finished = time.time()
+    LAST_RUN_TIMESTAMP.set(finished)
+    LAST_RUN_DURATION.set(finished - started)
+    LAST_RUN_SUCCESS.set(1 if success else 0)
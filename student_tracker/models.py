@@ -8,7 +8,8 @@ import os
 from datetime import datetime
 from sqlalchemy import (
     create_engine, Column, Integer, String, Text, Float,
-    DateTime, Boolean, ForeignKey, JSON, Enum
+    DateTime, Boolean, ForeignKey, JSON, Enum, Index,
+    and_, event, inspect, select, text, update
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
@@ -98,8 +99,8 @@ class Submission(Base):
     __tablename__ = "submissions"
 
     id = Column(Integer, primary_key=True)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
-    assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
+    assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False, index=True)
     canvas_submission_id = Column(String(50), nullable=True)
 
     # Submission content
@@ -116,6 +117,10 @@ class Submission(Base):
     # Manual input source tracking
     input_source = Column(String(50), default="canvas")  # canvas, manual, csv_import, etc.
 
+    # Evaluation work list: has content but no final evaluation.
+    # Maintained by the ORM event hooks below; bulk writes must set it themselves.
+    needs_evaluation = Column(Boolean, nullable=False, default=False, server_default=text("0"))
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -124,6 +129,14 @@ class Submission(Base):
     assignment = relationship("Assignment", back_populates="submissions")
     evaluations = relationship("Evaluation", back_populates="submission")
 
+    __table_args__ = (
+        # Partial index: only pending rows, so the work list stays small
+        Index(
+            "ix_submissions_pending_evaluation", "assignment_id", "submitted_at",
+            sqlite_where=text("needs_evaluation = 1")
+        ),
+    )
+
     def __repr__(self):
         return f"<Submission(student_id={self.student_id}, assignment_id={self.assignment_id})>"
 
@@ -133,7 +146,7 @@ class Evaluation(Base):
     __tablename__ = "evaluations"
 
     id = Column(Integer, primary_key=True)
-    submission_id = Column(Integer, ForeignKey("submissions.id"), nullable=False)
+    submission_id = Column(Integer, ForeignKey("submissions.id"), nullable=False, index=True)
 
     # Evaluation source and type
     source = Column(String(20), default=EvaluationSource.HAIKU_AUTO.value)
@@ -197,6 +210,32 @@ class SkillAssessment(Base):
         return f"<SkillAssessment(student_id={self.student_id}, skill='{self.skill_name}', level='{self.skill_level}')>"
 
 
+class SkillHistory(Base):
+    """
+    Append-only history of skill assessments.
+
+    A row is added whenever a student's assessed level, confidence or
+    evidence count for a skill changes, so past levels and trends can be read
+    without recomputing them from evaluations.
+    """
+    __tablename__ = "skill_history"
+
+    id = Column(Integer, primary_key=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    skill_name = Column(String(100), nullable=False)
+    skill_level = Column(String(20), nullable=False)
+    confidence = Column(Float, nullable=False)
+    evidence_count = Column(Integer, nullable=False)
+    assessed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_skill_history_student_skill_time", "student_id", "skill_name", "assessed_at"),
+    )
+
+    def __repr__(self):
+        return f"<SkillHistory(student_id={self.student_id}, skill='{self.skill_name}', level='{self.skill_level}', at={self.assessed_at})>"
+
+
 class StudentNote(Base):
     """Manual notes about a student (instructor observations, context, etc.)."""
     __tablename__ = "student_notes"
@@ -224,7 +263,12 @@ class ProgressSnapshot(Base):
     __tablename__ = "progress_snapshots"
 
     id = Column(Integer, primary_key=True)
-    snapshot_date = Column(DateTime, default=datetime.utcnow)
+    snapshot_date = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Snapshot this one's skill_distribution and student_values are deltas
+    # against; NULL means a full snapshot. Deltas hold only changed keys,
+    # with null for keys that were removed.
+    previous_id = Column(Integer, ForeignKey("progress_snapshots.id"), nullable=True)
 
     # Class-wide metrics
     class_average_score = Column(Float, nullable=True)
@@ -236,6 +280,9 @@ class ProgressSnapshot(Base):
     # Identified groups/clusters
     student_clusters = Column(JSON, nullable=True)  # Groupings based on performance
 
+    # Per-student values (JSON: {"12": {"group": "improving", "average": 84.5, ...}})
+    student_values = Column(JSON, nullable=True)
+
     # AI-generated insights
     insights = Column(JSON, nullable=True)  # List of insight strings
     recommendations = Column(JSON, nullable=True)  # List of recommendations
@@ -246,6 +293,55 @@ class ProgressSnapshot(Base):
         return f"<ProgressSnapshot(id={self.id}, date='{self.snapshot_date}')>"
 
 
+class InsightCache(Base):
+    """Generated AI insights, keyed by a fingerprint of the data in the prompt."""
+    __tablename__ = "insight_cache"
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(20), nullable=False)  # "student" or "class"
+    subject_id = Column(Integer, nullable=True)  # Student id; NULL for the class
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the prompt data
+
+    result = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_insight_cache_lookup", "scope", "subject_id", "fingerprint"),
+    )
+
+    def __repr__(self):
+        return f"<InsightCache(scope='{self.scope}', subject_id={self.subject_id})>"
+
+
+class ImportCheckpoint(Base):
+    """Progress of a file import, committed with each batch so it can resume."""
+    __tablename__ = "import_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(30), nullable=False)  # "submissions" or "assignments"
+    path = Column(String(500), nullable=False)  # Absolute path of the file
+
+    # The file as it was when the import started; a changed file starts over
+    file_size = Column(Integer, nullable=False)
+    file_mtime = Column(Float, nullable=False)
+
+    rows_done = Column(Integer, nullable=False, default=0)  # Rows read, including skipped ones
+    imported = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_import_checkpoints_file", "kind", "path", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<ImportCheckpoint(kind='{self.kind}', path='{self.path}', rows_done={self.rows_done})>"
+
+
 class SystemConfig(Base):
     """System configuration and settings."""
     __tablename__ = "system_config"
@@ -266,6 +362,7 @@ class FeedbackQueueStatus(enum.Enum):
     PUBLISHED = "published"    # Successfully published to Canvas
     REJECTED = "rejected"      # Rejected by instructor
     EDITED = "edited"          # Edited by instructor, ready to publish
+    FAILED = "failed"          # Gave up after repeated publish failures (dead letter)
 
 
 class FeedbackType(enum.Enum):
@@ -311,6 +408,17 @@ class FeedbackQueue(Base):
     # Canvas reference after publishing
     canvas_response_id = Column(String(50), nullable=True)  # ID from Canvas after publish
 
+    # Set while a publisher is posting this item (a claim other publishers
+    # respect), and a count of posts attempted. After an attempt that may
+    # have reached Canvas, the next one checks Canvas before posting again.
+    publish_started_at = Column(DateTime, nullable=True)
+    publish_attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    # After a failed attempt the publisher leaves the item until
+    # next_attempt_at (exponential backoff); last_error says why it failed
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
     # Metadata
     generated_by = Column(String(50), default="haiku")  # haiku, manual, system
     generation_context = Column(JSON, nullable=True)  # Context that prompted this feedback
@@ -322,13 +430,152 @@ class FeedbackQueue(Base):
     student = relationship("Student", foreign_keys=[student_id])
     submission = relationship("Submission", foreign_keys=[submission_id])
 
+    __table_args__ = (
+        # Review queue pages walk this newest first, keyed on (created_at, id)
+        Index("ix_feedback_queue_status_created", "status", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<FeedbackQueue(id={self.id}, type='{self.feedback_type}', status='{self.status}')>"
 
 
+class PublishAttempt(Base):
+    """One attempt to publish a feedback item to Canvas."""
+    __tablename__ = "publish_attempts"
+
+    id = Column(Integer, primary_key=True)
+    feedback_id = Column(Integer, ForeignKey("feedback_queue.id"), nullable=False, index=True)
+    attempt = Column(Integer, nullable=False)  # 1 for the first attempt
+
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+
+    success = Column(Boolean, nullable=False)
+    reconciled = Column(Boolean, default=False)  # Found already posted by an earlier attempt
+    error = Column(Text, nullable=True)
+    canvas_response_id = Column(String(50), nullable=True)
+
+    def __repr__(self):
+        return f"<PublishAttempt(feedback_id={self.feedback_id}, attempt={self.attempt}, success={self.success})>"
+
+
+# ============================================================================
+# Evaluation work list maintenance
+# ============================================================================
+
+def refresh_needs_evaluation(connection, submission_ids: list[int] = None):
+    """
+    Recompute Submission.needs_evaluation in SQL.
+
+    Args:
+        connection: SQLAlchemy connection (or session) to execute on
+        submission_ids: Submissions to refresh, or None for all of them
+    """
+    submissions = Submission.__table__
+    evaluations = Evaluation.__table__
+
+    has_final = select(evaluations.c.id).where(
+        evaluations.c.submission_id == submissions.c.id,
+        evaluations.c.is_final == True
+    ).exists()
+
+    stmt = update(submissions).values(
+        needs_evaluation=and_(
+            submissions.c.content.isnot(None),
+            submissions.c.content != "",
+            ~has_final
+        )
+    )
+    if submission_ids is not None:
+        stmt = stmt.where(submissions.c.id.in_(submission_ids))
+
+    connection.execute(stmt)
+
+
+@event.listens_for(Submission, "before_insert")
+def _submission_before_insert(mapper, connection, target):
+    # A new submission can't have evaluations yet
+    target.needs_evaluation = bool(target.content)
+
+
+@event.listens_for(Submission, "before_update")
+def _submission_before_update(mapper, connection, target):
+    if not inspect(target).attrs.content.history.has_changes():
+        return
+
+    if not target.content:
+        target.needs_evaluation = False
+        return
+
+    evaluations = Evaluation.__table__
+    has_final = connection.execute(
+        select(evaluations.c.id).where(
+            evaluations.c.submission_id == target.id,
+            evaluations.c.is_final == True
+        ).limit(1)
+    ).first()
+    target.needs_evaluation = has_final is None
+
+
+@event.listens_for(Evaluation, "after_insert")
+@event.listens_for(Evaluation, "after_update")
+@event.listens_for(Evaluation, "after_delete")
+def _evaluation_changed(mapper, connection, target):
+    if target.submission_id is not None:
+        refresh_needs_evaluation(connection, [target.submission_id])
+
+
+# ============================================================================
+# Database setup
+# ============================================================================
+
+def upgrade_schema() -> set[str]:
+    """
+    Add columns and indexes that are missing from an existing database.
+
+    create_all() only creates missing tables, so columns and indexes added
+    to the models later are applied here with ALTER TABLE / CREATE INDEX.
+
+    Returns:
+        Set of "table.column" names that were added
+    """
+    inspector = inspect(engine)
+    added = set()
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    default = default.text if hasattr(default, "text") else f"'{default}'"
+                    ddl += f" DEFAULT {default}"
+                conn.execute(text(ddl))
+                added.add(f"{table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        # Backfill the evaluation work list for databases created before it existed
+        if "submissions.needs_evaluation" in added:
+            refresh_needs_evaluation(conn)
+
+    for name in sorted(added):
+        print(f"Added column {name}")
+    return added
+
+
 def init_db():
     """Initialize the database, creating all tables."""
     Base.metadata.create_all(engine)
+    upgrade_schema()
     print(f"Database initialized at: {DB_PATH}")
 
 
@@ -0,0 +1,253 @@
+"""
+Opt-in request profiling for the dashboard.
+
+Set STUDENT_TRACKER_PERF=1 (or run `dashboard --profile`) to record, for
+every request:
+- SQL query count and time, with repeated relationship lazy loads flagged
+  as likely N+1 patterns (e.g. Submission.evaluations inside a loop)
+- time spent rendering templates and waiting on LLM calls
+- total time, reported as a Server-Timing header (visible in the browser
+  devtools Network tab)
+
+Slow requests are kept in a ring buffer and shown with per-endpoint totals
+at /debug/perf. When profiling is disabled no hooks are installed, so the
+only cost is the enabled check in span().
+
+Under gunicorn each worker process keeps its own numbers; /debug/perf
+shows the worker that served it.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Optional
+
+PERF_ENABLED = os.environ.get("STUDENT_TRACKER_PERF", "").lower() in ("1", "true", "yes")
+
+# Requests slower than this go into the slow-request log
+SLOW_REQUEST_MS = float(os.environ.get("STUDENT_TRACKER_SLOW_MS", "500"))
+
+# Loading the same relationship this many times in one request is flagged as N+1
+N_PLUS_ONE_THRESHOLD = 10
+
+SLOW_LOG_SIZE = 100
+RECENT_LOG_SIZE = 50
+
+# Timing categories reported in Server-Timing, in display order
+CATEGORIES = ("db", "template", "llm")
+
+_local = threading.local()
+_lock = threading.Lock()
+_installed = False
+
+_endpoint_stats = defaultdict(lambda: {
+    "count": 0, "total_ms": 0.0, "max_ms": 0.0, "queries": 0, "n_plus_one": 0
+})
+_slow_requests = deque(maxlen=SLOW_LOG_SIZE)
+_recent_requests = deque(maxlen=RECENT_LOG_SIZE)
+
+
+class RequestProfile:
+    """Timings and query counts for one request."""
+
+    def __init__(self, method: str, path: str, endpoint: Optional[str]):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint or path
+        self.started = time.perf_counter()
+        self.timings = defaultdict(float)  # category -> seconds
+        self.query_count = 0
+        self.statements = Counter()  # SQL text -> executions
+        self.relationship_loads = Counter()  # "Submission.evaluations" -> loads
+        self.duration = None
+        self.status = None
+
+    def add(self, category: str, seconds: float):
+        self.timings[category] += seconds
+
+    def finish(self, status: int):
+        self.duration = time.perf_counter() - self.started
+        self.status = status
+
+    def n_plus_one(self) -> list[dict]:
+        """Relationships lazy-loaded often enough to look like N+1 queries."""
+        return [
+            {"relationship": name, "loads": count}
+            for name, count in self.relationship_loads.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def repeated_statements(self, limit: int = 5) -> list[dict]:
+        """The most-executed SQL statements, if any ran repeatedly."""
+        return [
+            {"sql": " ".join(sql.split())[:200], "count": count}
+            for sql, count in self.statements.most_common(limit)
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def server_timing(self) -> str:
+        """Format the profile as a Server-Timing header value."""
+        parts = []
+        for category in CATEGORIES:
+            ms = self.timings.get(category, 0.0) * 1000
+            if category == "db":
+                parts.append(f'db;dur={ms:.1f};desc="{self.query_count} queries"')
+            elif ms:
+                parts.append(f"{category};dur={ms:.1f}")
+        parts.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "total_ms": round(self.duration * 1000, 1),
+            "db_ms": round(self.timings.get("db", 0.0) * 1000, 1),
+            "template_ms": round(self.timings.get("template", 0.0) * 1000, 1),
+            "llm_ms": round(self.timings.get("llm", 0.0) * 1000, 1),
+            "queries": self.query_count,
+            "n_plus_one": self.n_plus_one(),
+            "repeated_statements": self.repeated_statements(),
+            "at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+def enable():
+    """Turn profiling on (must be called before install())."""
+    global PERF_ENABLED
+    PERF_ENABLED = True
+
+
+def current() -> Optional[RequestProfile]:
+    """The profile for the request being handled on this thread, if any."""
+    return getattr(_local, "profile", None)
+
+
+@contextmanager
+def span(category: str):
+    """Attribute the time spent in the block to a timing category."""
+    profile = current()
+    if profile is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(category, time.perf_counter() - started)
+
+
+def install(app, engine, session_factory):
+    """
+    Hook profiling into a Flask app and SQLAlchemy engine/sessions.
+
+    Does nothing unless profiling is enabled.
+    """
+    global _installed
+    if not PERF_ENABLED or _installed:
+        return
+    _installed = True
+
+    from flask import request
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("perf_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["perf_query_start"].pop()
+        profile = current()
+        if profile is not None:
+            profile.add("db", time.perf_counter() - started)
+            profile.query_count += 1
+            profile.statements[statement] += 1
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def do_orm_execute(orm_execute_state):
+        profile = current()
+        if profile is not None and orm_execute_state.is_relationship_load:
+            path = orm_execute_state.loader_strategy_path
+            if path is not None and len(path) >= 2:
+                profile.relationship_loads[str(path[-1])] += 1
+
+    @app.before_request
+    def start_profile():
+        _local.profile = RequestProfile(request.method, request.path, request.endpoint)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = current()
+        if profile is None:
+            return response
+
+        profile.finish(response.status_code)
+        response.headers["Server-Timing"] = profile.server_timing()
+        _record(profile)
+        return response
+
+    @app.teardown_request
+    def clear_profile(exc):
+        _local.profile = None
+
+
+def _record(profile: RequestProfile):
+    """Add a finished request to the per-endpoint totals and logs."""
+    entry = profile.to_dict()
+    with _lock:
+        stats = _endpoint_stats[profile.endpoint]
+        stats["count"] += 1
+        stats["total_ms"] += entry["total_ms"]
+        stats["max_ms"] = max(stats["max_ms"], entry["total_ms"])
+        stats["queries"] += entry["queries"]
+        if entry["n_plus_one"]:
+            stats["n_plus_one"] += 1
+
+        _recent_requests.append(entry)
+        if entry["total_ms"] >= SLOW_REQUEST_MS:
+            _slow_requests.append(entry)
+
+    if entry["total_ms"] >= SLOW_REQUEST_MS:
+        print(f"Slow request: {profile.method} {profile.path} {entry['total_ms']:.0f}ms "
+              f"(db {entry['db_ms']:.0f}ms / {entry['queries']} queries, "
+              f"template {entry['template_ms']:.0f}ms, llm {entry['llm_ms']:.0f}ms)")
+
+
+def get_report() -> dict:
+    """Snapshot of the collected numbers for /debug/perf."""
+    with _lock:
+        endpoints = []
+        for endpoint, stats in _endpoint_stats.items():
+            endpoints.append({
+                "endpoint": endpoint,
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 1),
+                "max_ms": round(stats["max_ms"], 1),
+                "avg_queries": round(stats["queries"] / stats["count"], 1),
+                "n_plus_one": stats["n_plus_one"]
+            })
+        endpoints.sort(key=lambda e: e["avg_ms"], reverse=True)
+
+        return {
+            "enabled": PERF_ENABLED,
+            "pid": os.getpid(),
+            "slow_request_ms": SLOW_REQUEST_MS,
+            "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+            "endpoints": endpoints,
+            "slow_requests": list(reversed(_slow_requests)),
+            "recent_requests": list(reversed(_recent_requests))
+        }
+
+
+def reset():
+    """Clear the collected numbers."""
+    with _lock:
+        _endpoint_stats.clear()
+        _slow_requests.clear()
+        _recent_requests.clear()
@@ -0,0 +1,229 @@
+"""
+Progress reporting for long-running pipelines.
+
+Evaluation and Canvas sync accept an optional progress callback that
+receives one dict per event. start_job() runs a pipeline in a background
+thread with a ProgressTracker as the callback; the tracker appends each
+event to the job's log file, and stream_job() tails that file as a
+Server-Sent Events stream for the dashboard. The log is a file rather
+than an in-memory queue so any dashboard worker process can stream a job
+another one started, and so several viewers (or a reconnect) can follow
+the same job.
+
+Event types sent by the pipelines:
+- start: {"type": "start", "total": <items expected>}
+- stage: {"type": "stage", "stage": "<name>", "message": "..."}
+- item:  {"type": "item", "status": "...", ...per-item details}
+
+The tracker adds running totals (done, failed, tokens, elapsed, ETA) and
+finishes every stream with a "done" or "error" event.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Iterator, Optional
+
+# Job progress logs, shared by every dashboard worker process
+JOBS_DIR = os.environ.get("STUDENT_TRACKER_JOBS_DIR") or os.path.join(
+    tempfile.gettempdir(), "student-tracker-jobs"
+)
+
+# Logs older than this are deleted when a new job starts
+JOB_LOG_MAX_AGE = 24 * 3600
+
+# How often a stream checks the log for new events
+JOB_POLL_SECONDS = 0.25
+
+# A stream gives up on a job that has logged nothing for this long (its
+# worker process was restarted, say)
+JOB_STALE_SECONDS = 600
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProgressTracker:
+    """Collect pipeline progress events into a job log."""
+
+    # Item statuses that count as failures in the running totals
+    FAILED_STATUSES = ("failed", "error")
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._event_id = 0
+        self.started_at = time.monotonic()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def __call__(self, event: dict):
+        """Progress callback passed to the pipelines."""
+        event = dict(event)
+        event_type = event.get("type", "item")
+
+        if event_type == "start":
+            self.total += event.get("total", 0)
+        elif event_type == "item":
+            self.done += 1
+            if event.get("status") in self.FAILED_STATUSES:
+                self.failed += 1
+            self.input_tokens += event.get("input_tokens") or 0
+            self.output_tokens += event.get("output_tokens") or 0
+
+        event["progress"] = self.snapshot()
+        self._log(event_type, event)
+
+    def _log(self, event_type: str, event: dict):
+        with self._lock:
+            self._event_id += 1
+            record = {"id": self._event_id, "event": event_type, "data": event}
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def snapshot(self) -> dict:
+        """Current running totals, including a naive ETA."""
+        elapsed = time.monotonic() - self.started_at
+        eta = None
+        if self.done and self.total > self.done:
+            eta = elapsed / self.done * (self.total - self.done)
+
+        return {
+            "done": self.done,
+            "total": self.total,
+            "failed": self.failed,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        }
+
+    def run(self, func: Callable, *args, **kwargs) -> threading.Thread:
+        """
+        Run a pipeline function in a background thread.
+
+        The function is called with progress_callback=self. It keeps running
+        if the browser disconnects, so a closed tab never leaves a batch
+        half-finished.
+        """
+        def target():
+            try:
+                result = func(*args, progress_callback=self, **kwargs)
+                self._log("done", {
+                    "type": "done",
+                    "result": _summarize_result(result),
+                    "progress": self.snapshot()
+                })
+            except Exception as e:
+                self._log("error", {
+                    "type": "error",
+                    "error": str(e),
+                    "progress": self.snapshot()
+                })
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+
+def start_job(func: Callable, *args, **kwargs) -> str:
+    """
+    Run a pipeline function in the background, logging its progress.
+
+    Returns:
+        The job ID to pass to stream_job()
+    """
+    os.makedirs(JOBS_DIR, mode=0o700, exist_ok=True)
+    _prune_job_logs()
+
+    job_id = uuid.uuid4().hex
+    path = _job_log_path(job_id)
+    open(path, "a").close()  # So the job can be streamed before its first event
+    ProgressTracker(path).run(func, *args, **kwargs)
+    return job_id
+
+
+def stream_job(job_id: str, after: int = 0, heartbeat: float = 15.0) -> Optional[Iterator[str]]:
+    """
+    SSE-formatted events of a job, from the start (or after event ID
+    after, for a reconnecting EventSource) until it finishes.
+
+    Returns:
+        An iterator of events, or None if there is no such job
+    """
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    path = _job_log_path(job_id)
+    if not os.path.exists(path):
+        return None
+    return _tail_job_log(path, after, heartbeat)
+
+
+def _job_log_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, f"{job_id}.jsonl")
+
+
+def _tail_job_log(path: str, after: int, heartbeat: float) -> Iterator[str]:
+    last_event = last_sent = time.monotonic()
+    pending = ""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read()
+            if chunk:
+                # Only whole lines; the writer may be mid-way through one
+                *lines, pending = (pending + chunk).split("\n")
+                for line in lines:
+                    record = json.loads(line)
+                    finished = record["event"] in ("done", "error")
+                    if record["id"] > after:
+                        yield format_sse(record["data"], event_type=record["event"], event_id=record["id"])
+                    if finished:
+                        return
+                last_event = last_sent = time.monotonic()
+                continue
+
+            now = time.monotonic()
+            if now - last_event > JOB_STALE_SECONDS:
+                yield format_sse({"type": "error", "error": "The job stopped reporting progress"}, event_type="error")
+                return
+            if now - last_sent >= heartbeat:
+                # Comment line keeps proxies (Cloudflare Tunnel) from closing the connection
+                yield ": keep-alive\n\n"
+                last_sent = now
+            time.sleep(JOB_POLL_SECONDS)
+
+
+def _prune_job_logs():
+    cutoff = time.time() - JOB_LOG_MAX_AGE
+    for name in os.listdir(JOBS_DIR):
+        path = os.path.join(JOBS_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # Another worker got there first
+
+
+def format_sse(data: dict, event_type: str = "message", event_id: Optional[int] = None) -> str:
+    """Format a dict as a single Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _summarize_result(result):
+    """Make a pipeline's return value JSON-friendly for the final event."""
+    if isinstance(result, dict):
+        return result
+    if isinstance(result, (list, tuple)):
+        return {"count": len(result)}
+    return {"value": result}
@@ -10,22 +10,29 @@ Generates:
 
 import os
 import json
-from typing import Optional
-import anthropic
-from .models import get_session, Student, Assignment, Submission, Evaluation, SkillAssessment
-from .analyzer import (
-    get_student_summary, get_student_progression,
-    get_student_strengths_weaknesses, identify_student_groups,
-    get_class_overview
-)
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from . import metrics, perf
+from .analyzer import AnalyticsContext
+
+if TYPE_CHECKING:
+    import anthropic
 
 # Anthropic configuration
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+# Messages API endpoint override, e.g. the local fake in bench/fake_llm.py
+LLM_BASE_URL = os.environ.get("STUDENT_TRACKER_LLM_BASE_URL", "")
 HAIKU_MODEL = "claude-3-5-haiku-20241022"
+# LLM calls in flight at once when generating class recommendations
+LLM_CONCURRENCY = int(os.environ.get("STUDENT_TRACKER_LLM_CONCURRENCY", "7"))
+
 
+def get_client() -> "anthropic.Anthropic":
+    """Get Anthropic client (pointed at LLM_BASE_URL when that is set)."""
+    import anthropic  # slow to import; only commands that call the API need it
 
-def get_client() -> anthropic.Anthropic:
-    """Get Anthropic client."""
+    if LLM_BASE_URL:
+        return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY or "local", base_url=LLM_BASE_URL)
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY environment variable not set")
     return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
@@ -208,11 +215,11 @@ def get_skill_recommendations(
     return generic.get(current_level, [])
 
 
-def generate_student_recommendations(student_id: int) -> dict:
+def generate_student_recommendations(student_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
     """Generate personalized recommendations for a student."""
-    summary = get_student_summary(student_id)
-    progression = get_student_progression(student_id)
-    strengths_weaknesses = get_student_strengths_weaknesses(student_id)
+    ctx = ctx or AnalyticsContext()
+    summary = ctx.summary(student_id)
+    strengths_weaknesses = ctx.strengths_weaknesses(student_id)
 
     if "error" in summary:
         return summary
@@ -271,11 +278,13 @@ Respond in JSON format:
 
     try:
         client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("recommendations", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=1000,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         ai_recommendations = json.loads(response.content[0].text)
     except Exception as e:
@@ -427,7 +436,11 @@ def get_intervention_strategies(group_type: str) -> dict:
     return strategies.get(group_type, strategies["solid_performers"])
 
 
-def generate_group_recommendations(group_type: str, students: list[dict]) -> dict:
+def generate_group_recommendations(
+    group_type: str,
+    students: list[dict],
+    client: Optional["anthropic.Anthropic"] = None
+) -> dict:
     """Generate recommendations for a specific student group."""
     strategies = get_intervention_strategies(group_type)
 
@@ -472,12 +485,14 @@ Respond in JSON format:
 }}"""
 
     try:
-        client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        client = client or get_client()
+        with metrics.track_llm_call("recommendations", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=500,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         ai_recommendations = json.loads(response.content[0].text)
     except Exception as e:
@@ -500,18 +515,35 @@ Respond in JSON format:
 # Class-wide recommendations
 # ============================================================================
 
-def generate_class_recommendations() -> dict:
-    """Generate recommendations for the entire class."""
-    overview = get_class_overview()
-    groups = identify_student_groups()
-
-    # Get recommendations for each group
-    group_recommendations = {}
-    for group_type, students in groups.items():
-        if students:  # Only generate for non-empty groups
-            group_recommendations[group_type] = generate_group_recommendations(
-                group_type, students
+def _class_ai_recommendations(prompt: str, client: Optional["anthropic.Anthropic"] = None) -> dict:
+    """Ask for the class-level recommendations."""
+    try:
+        client = client or get_client()
+        with metrics.track_llm_call("recommendations", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=800,
+                messages=[{"role": "user", "content": prompt}]
             )
+            call.record(response)
+
+        return json.loads(response.content[0].text)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def generate_class_recommendations(ctx: Optional[AnalyticsContext] = None) -> dict:
+    """
+    Generate recommendations for the entire class.
+
+    The per-group calls and the class-level call are independent, so they
+    run concurrently (up to LLM_CONCURRENCY at once) on one shared client.
+    A call that fails leaves an "error" entry in its place; the rest of the
+    result is still returned.
+    """
+    ctx = ctx or AnalyticsContext()
+    overview = ctx.overview()
+    groups = ctx.groups()
 
     # Identify class-wide skill gaps
     skill_distribution = overview.get("skill_distribution", {})
@@ -555,15 +587,31 @@ Provide recommendations in JSON format:
 
     try:
         client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=800,
-            messages=[{"role": "user", "content": prompt}]
-        )
+    except ValueError:
+        client = None  # each call reports the missing key in its own result
 
-        class_ai_recommendations = json.loads(response.content[0].text)
-    except Exception as e:
-        class_ai_recommendations = {"error": str(e)}
+    # Only generate for non-empty groups
+    group_jobs = [(group_type, students) for group_type, students in groups.items() if students]
+
+    with perf.span("llm"), ThreadPoolExecutor(max_workers=max(1, LLM_CONCURRENCY)) as pool:
+        class_job = pool.submit(_class_ai_recommendations, prompt, client)
+        group_futures = {
+            group_type: pool.submit(generate_group_recommendations, group_type, students, client)
+            for group_type, students in group_jobs
+        }
+
+    group_recommendations = {}
+    for group_type, future in group_futures.items():
+        try:
+            group_recommendations[group_type] = future.result()
+        except Exception as e:
+            group_recommendations[group_type] = {
+                "group_type": group_type,
+                "count": len(groups[group_type]),
+                "strategies": get_intervention_strategies(group_type),
+                "ai_recommendations": {"error": str(e)}
+            }
+    class_ai_recommendations = class_job.result()
 
     return {
         "overview": overview["summary"],
@@ -578,17 +626,16 @@ Provide recommendations in JSON format:
 # Assignment-specific recommendations
 # ============================================================================
 
-def get_assignment_recommendations(assignment_id: int) -> dict:
+def get_assignment_recommendations(assignment_id: int, ctx: Optional[AnalyticsContext] = None) -> dict:
     """Get recommendations for improving an assignment based on student performance."""
-    session = get_session()
+    ctx = ctx or AnalyticsContext()
 
-    assignment = session.query(Assignment).get(assignment_id)
+    assignment = ctx.assignment(assignment_id)
     if not assignment:
-        session.close()
         return {"error": f"Assignment {assignment_id} not found"}
 
     # Collect all evaluations for this assignment
-    submissions = session.query(Submission).filter_by(assignment_id=assignment_id).all()
+    submissions = ctx.assignment_submissions(assignment_id)
 
     scores = []
     all_strengths = []
@@ -608,8 +655,6 @@ def get_assignment_recommendations(assignment_id: int) -> dict:
                 if eval.skill_ratings:
                     skill_ratings.append(eval.skill_ratings)
 
-    session.close()
-
     if not scores:
         return {
             "assignment": {"id": assignment.id, "name": assignment.name},
@@ -665,11 +710,13 @@ Provide recommendations in JSON format:
 
     try:
         client = get_client()
-        response = client.messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=600,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with metrics.track_llm_call("recommendations", HAIKU_MODEL) as call:
+            response = client.messages.create(
+                model=HAIKU_MODEL,
+                max_tokens=600,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            call.record(response)
 
         ai_recommendations = json.loads(response.content[0].text)
     except Exception as e:
@@ -0,0 +1,128 @@
+"""
+Production serving for the dashboard.
+
+Flask's built-in server (app.run) is single-process and meant for
+development. This module runs the dashboard under:
+
+- gunicorn on Linux (the Raspberry Pi deployment): multiple preloaded
+  worker processes, each with a thread pool, graceful reload on SIGHUP
+- waitress on Windows, where gunicorn isn't available: one process with
+  a thread pool
+
+Long-running requests (evaluation and sync progress streams) hold a worker
+thread, so threaded workers are used instead of gunicorn's sync workers.
+"""
+
+import os
+import sys
+import tempfile
+
+# Defaults sized for a Raspberry Pi 4/5 serving one instructor
+DEFAULT_WORKERS = 2
+DEFAULT_THREADS = 8
+DEFAULT_TIMEOUT = 120
+DEFAULT_KEEPALIVE = 5
+
+
+def run_production(
+    host: str = "0.0.0.0",
+    port: int = 5000,
+    workers: int = DEFAULT_WORKERS,
+    threads: int = DEFAULT_THREADS,
+    timeout: int = DEFAULT_TIMEOUT
+):
+    """Serve the dashboard with a production WSGI server."""
+    if sys.platform == "win32":
+        run_waitress(host, port, threads)
+    else:
+        run_gunicorn(host, port, workers, threads, timeout)
+
+
+def run_gunicorn(
+    host: str,
+    port: int,
+    workers: int = DEFAULT_WORKERS,
+    threads: int = DEFAULT_THREADS,
+    timeout: int = DEFAULT_TIMEOUT
+):
+    """
+    Serve the dashboard with gunicorn.
+
+    The app is imported once in the master process (preload_app) and forked
+    into the workers, so startup cost is paid once. Send SIGHUP to the master
+    (systemctl reload student-tracker) to gracefully replace the workers.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("gunicorn is not installed. Install it with: pip install gunicorn")
+        sys.exit(1)
+
+    from .dashboard import app
+    from .models import engine
+    from . import metrics
+
+    # Workers share counters through snapshot files so /metrics adds them up
+    metrics.REGISTRY.enable_multiprocess(
+        os.environ.get("STUDENT_TRACKER_MULTIPROC_DIR")
+        or os.path.join(tempfile.gettempdir(), f"student-tracker-metrics-{os.getpid()}")
+    )
+
+    def post_fork(server, worker):
+        # Each worker needs its own SQLite connections, not the master's
+        engine.dispose()
+        metrics.REGISTRY.start_flusher()
+
+    class DashboardApplication(BaseApplication):
+        def __init__(self, application, options: dict):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key.lower(), value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "preload_app": True,
+        "timeout": timeout,
+        "graceful_timeout": 30,
+        "keepalive": DEFAULT_KEEPALIVE,
+        "accesslog": "-",
+        "errorlog": "-",
+        "post_fork": post_fork,
+        "proc_name": "student-tracker",
+    }
+
+    print(f"Starting Student Tracker dashboard (gunicorn, {workers} workers x {threads} threads) "
+          f"at http://{host}:{port}")
+    DashboardApplication(app, options).run()
+
+
+def run_waitress(host: str, port: int, threads: int = DEFAULT_THREADS):
+    """Serve the dashboard with waitress (Windows-friendly, single process)."""
+    try:
+        from waitress import serve
+    except ImportError:
+        print("waitress is not installed. Install it with: pip install waitress")
+        sys.exit(1)
+
+    from .dashboard import app
+
+    print(f"Starting Student Tracker dashboard (waitress, {threads} threads) at http://{host}:{port}")
+    serve(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        channel_timeout=DEFAULT_TIMEOUT,
+        ident="student-tracker"
+    )